@@ -0,0 +1 @@
+# Benchmarks executáveis via `python -m recommendationService.benchmarks.<nome>`.
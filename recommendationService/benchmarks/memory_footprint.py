@@ -0,0 +1,138 @@
+"""Mede bytes por dispositivo das representações pré-processadas (antes/depois).
+
+Uso:
+  python -m recommendationService.benchmarks.memory_footprint --devices 10000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from ..core.device_features import build_caracteristica_map, build_device_vector
+from ..core.types import DeviceVectorBatch
+from ..schemas import AspectScores, DeviceCharacteristic, DeviceInput
+
+CHARACTERISTIC_TYPES = [
+  "ram",
+  "rom",
+  "battery",
+  "main_camera",
+  "front_camera",
+  "screen_size",
+  "refresh_rate",
+  "processor",
+]
+
+
+@dataclass
+class _LegacyDeviceVector:
+  """Cópia do DeviceVector original (dataclass com __dict__ por instância)."""
+
+  device_id: str
+  camera: float = 0.5
+  bateria: float = 0.5
+  preco: float = 0.5
+  desempenho: float = 0.5
+
+
+def _legacy_caracteristica_map(device: DeviceInput) -> Dict[str, str]:
+  """Versão original de `build_caracteristica_map`, sem internar as chaves."""
+  entries: Dict[str, str] = {}
+  for caracteristica in device.caracteristicas:
+    tipo = caracteristica.tipo.strip().lower()
+    if not tipo:
+      continue
+    entries[tipo] = str(caracteristica.descricao)
+  if device.preco is not None:
+    entries["preco"] = str(device.preco)
+  return entries
+
+
+def build_payload(total: int, seed: int = 42) -> List[DeviceInput]:
+  """Gera dispositivos sintéticos com chaves em caixa mista, como chegam do backend."""
+  rng = random.Random(seed)
+  return [
+    DeviceInput(
+      id=f"device-{index:06d}",
+      preco=float(rng.randint(700, 6000)),
+      caracteristicas=[
+        DeviceCharacteristic(tipo=f" {tipo.upper()} ", descricao=str(rng.randint(4, 6000)))
+        for tipo in CHARACTERISTIC_TYPES
+      ],
+      aspect_scores=AspectScores(camera=rng.random(), bateria=rng.random()),
+    )
+    for index in range(total)
+  ]
+
+
+def _measure(build: Callable[[], object]) -> int:
+  """Bytes alocados (e mantidos vivos) pela estrutura retornada por `build`."""
+  gc.collect()
+  tracemalloc.start()
+  before, _ = tracemalloc.get_traced_memory()
+  result = build()
+  after, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del result
+  return after - before
+
+
+def run(total: int) -> Dict[str, float]:
+  """Executa as medições e devolve bytes por dispositivo de cada representação."""
+  payload = build_payload(total)
+
+  def legacy_maps():
+    return [_legacy_caracteristica_map(device) for device in payload]
+
+  def compact_maps():
+    return [build_caracteristica_map(device) for device in payload]
+
+  legacy_map_list = legacy_maps()
+  compact_map_list = compact_maps()
+
+  def legacy_vectors():
+    vectors = []
+    for device, caracteristicas_map in zip(payload, legacy_map_list):
+      vector = build_device_vector(device, caracteristicas_map)
+      vectors.append(
+        _LegacyDeviceVector(
+          vector.device_id, vector.camera, vector.bateria, vector.preco, vector.desempenho
+        )
+      )
+    return vectors
+
+  def slotted_vectors():
+    return [
+      build_device_vector(device, caracteristicas_map)
+      for device, caracteristicas_map in zip(payload, compact_map_list)
+    ]
+
+  def batch_vectors():
+    return DeviceVectorBatch.from_vectors(
+      build_device_vector(device, caracteristicas_map)
+      for device, caracteristicas_map in zip(payload, compact_map_list)
+    )
+
+  results = {
+    "caracteristica_map (original)": _measure(legacy_maps),
+    "caracteristica_map (chaves internadas)": _measure(compact_maps),
+    "DeviceVector (dataclass com __dict__)": _measure(legacy_vectors),
+    "DeviceVector (slots)": _measure(slotted_vectors),
+    "DeviceVectorBatch (colunas)": _measure(batch_vectors),
+  }
+  return {name: size / total for name, size in results.items()}
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--devices", type=int, default=10_000)
+  args = parser.parse_args()
+  for name, per_device in run(args.devices).items():
+    print(f"{name:<42} {per_device:>10.1f} bytes/dispositivo")
+
+
+if __name__ == "__main__":
+  main()
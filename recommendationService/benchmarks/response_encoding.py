@@ -0,0 +1,72 @@
+"""Tamanho e tempo de serialização da resposta padrão vs. formato compacto.
+
+Uso:
+  python -m recommendationService.benchmarks.response_encoding --devices 2000
+"""
+
+import argparse
+import gzip
+import json
+import time
+from typing import Callable, Dict, List
+
+from ..schemas import CompactScoreResponse, Criterion, ScoreResponse
+from ..services.compact import encode_compact_scores
+from ..services.scoring import score_devices
+from .memory_footprint import build_payload
+
+CRITERIOS = [
+  Criterion(tipo="ram", descricao="8"),
+  Criterion(tipo="battery", descricao="5000"),
+  Criterion(tipo="main_camera", descricao="50"),
+  Criterion(tipo="preco_intervalo", descricao="1200-2500"),
+]
+
+
+def _encode_standard(scores: List[Dict]) -> bytes:
+  return ScoreResponse(scores=scores).model_dump_json(exclude_unset=True).encode("utf-8")
+
+
+def _encode_compact(scores: List[Dict]) -> bytes:
+  response = CompactScoreResponse(**encode_compact_scores(scores))
+  return response.model_dump_json(exclude_unset=True).encode("utf-8")
+
+
+def measure(encode: Callable[[List[Dict]], bytes], scores: List[Dict], repeat: int) -> Dict[str, float]:
+  """Bytes (crus e gzip) e tempo médio de encode em ms."""
+  started = time.perf_counter()
+  for _ in range(repeat):
+    body = encode(scores)
+  elapsed = (time.perf_counter() - started) / repeat
+  return {
+    "bytes": len(body),
+    "gzip_bytes": len(gzip.compress(body)),
+    "encode_ms": elapsed * 1000,
+  }
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Compara a resposta padrão e a compacta.")
+  parser.add_argument("--devices", type=int, default=2000)
+  parser.add_argument("--repeat", type=int, default=20)
+  parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON.")
+  args = parser.parse_args()
+  scores = score_devices(CRITERIOS, build_payload(args.devices))
+
+  report = {
+    "padrao": measure(_encode_standard, scores, args.repeat),
+    "compacto": measure(_encode_compact, scores, args.repeat),
+  }
+  if args.json:
+    print(json.dumps(report, indent=2))
+    return
+  print(f"Resposta com {args.devices} dispositivos:")
+  for mode, values in report.items():
+    print(
+      f"  {mode:<9} {values['bytes']:>10,} bytes  {values['gzip_bytes']:>9,} gzip  "
+      f"{values['encode_ms']:8.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+  main()
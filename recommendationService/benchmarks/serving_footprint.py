@@ -0,0 +1,136 @@
+"""Memória residente por worker (pré-fork vs. carga por worker) e escala com threads.
+
+Uso:
+  python -m recommendationService.benchmarks.serving_footprint --workers 4 --devices 200
+
+Memória: lê `/proc/<pid>/smaps_rollup` (Linux) de cada worker após uma
+requisição de scoring. `Pss` divide as páginas compartilhadas entre os
+processos, então é a medida justa do custo de cada worker.
+
+Escala: dispara o mesmo scoring em 1, 2, 4, 8 e 16 threads (como o threadpool
+do FastAPI faria) e reporta requisições por segundo.
+"""
+
+import argparse
+import gc
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from ..core import ml_model
+from ..schemas import Criterion
+from ..services.scoring import score_devices
+from .memory_footprint import build_payload
+
+CRITERIOS = [
+  Criterion(tipo="ram", descricao="8"),
+  Criterion(tipo="battery", descricao="5000"),
+  Criterion(tipo="preco_intervalo", descricao="1200-2500"),
+]
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+
+
+def read_memory(pid: int) -> Dict[str, int]:
+  """Rss/Pss/Shared/Private (kB) do processo, via smaps_rollup."""
+  fields: Dict[str, int] = {}
+  with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as handle:
+    for line in handle:
+      parts = line.split()
+      if len(parts) == 3 and parts[2] == "kB":
+        fields[parts[0].rstrip(":")] = int(parts[1])
+  return {
+    "rss_kb": fields.get("Rss", 0),
+    "pss_kb": fields.get("Pss", 0),
+    "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    "private_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+  }
+
+
+def _reset_model_cache() -> None:
+  ml_model._MODEL_CACHE = None
+  ml_model._MODEL_CACHE_PATH = None
+
+
+def measure_workers(workers: int, preload: bool, payload) -> List[Dict[str, int]]:
+  """Faz fork de `workers` filhos, cada um pontua uma vez e fica parado para a medição."""
+  _reset_model_cache()
+  gc.collect()
+  if preload:
+    ml_model.warm_match_model()
+    gc.freeze()
+  children = []
+  for _ in range(workers):
+    ready_read, ready_write = os.pipe()
+    release_read, release_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+      os.close(ready_read)
+      os.close(release_write)
+      score_devices(CRITERIOS, payload)
+      os.write(ready_write, b"1")
+      os.read(release_read, 1)
+      os._exit(0)
+    os.close(ready_write)
+    os.close(release_read)
+    children.append((pid, ready_read, release_write))
+  for _, ready_read, _ in children:
+    os.read(ready_read, 1)
+  samples = [read_memory(pid) for pid, _, _ in children]
+  for pid, ready_read, release_write in children:
+    os.write(release_write, b"1")
+    os.waitpid(pid, 0)
+    os.close(ready_read)
+    os.close(release_write)
+  if preload:
+    gc.unfreeze()
+  return samples
+
+
+def measure_threads(payload, requests_per_thread: int) -> Dict[int, float]:
+  """Requisições/s do scoring para cada quantidade de threads."""
+  ml_model.warm_match_model()
+  results: Dict[int, float] = {}
+  for threads in THREAD_COUNTS:
+    total = threads * requests_per_thread
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+      for _ in executor.map(lambda _: score_devices(CRITERIOS, payload), range(total)):
+        pass
+    results[threads] = total / (time.perf_counter() - started)
+  return results
+
+
+def _summary(samples: List[Dict[str, int]]) -> Dict[str, float]:
+  return {key: sum(sample[key] for sample in samples) / len(samples) for key in samples[0]}
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Memória por worker e escala com threads.")
+  parser.add_argument("--workers", type=int, default=4)
+  parser.add_argument("--devices", type=int, default=200)
+  parser.add_argument("--requests-per-thread", type=int, default=4)
+  parser.add_argument("--json", action="store_true", help="Imprime o resultado em JSON.")
+  args = parser.parse_args()
+  payload = build_payload(args.devices)
+
+  report = {
+    "per_worker_load": _summary(measure_workers(args.workers, preload=False, payload=payload)),
+    "preload": _summary(measure_workers(args.workers, preload=True, payload=payload)),
+    "threads_rps": measure_threads(payload, args.requests_per_thread),
+  }
+  if args.json:
+    print(json.dumps(report, indent=2))
+    return
+  print(f"Memória média por worker ({args.workers} workers, kB):")
+  for mode in ("per_worker_load", "preload"):
+    values = "  ".join(f"{key}={value:,.0f}" for key, value in report[mode].items())
+    print(f"  {mode:<16} {values}")
+  print(f"Scoring de {args.devices} dispositivos (req/s):")
+  for threads, rps in report["threads_rps"].items():
+    print(f"  {threads:>2} threads  {rps:8.2f}")
+
+
+if __name__ == "__main__":
+  main()
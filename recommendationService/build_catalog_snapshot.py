@@ -0,0 +1,43 @@
+"""CLI para gerar o snapshot colunar (mmap) do catálogo de dispositivos.
+
+Exemplo:
+  python -m recommendationService.build_catalog_snapshot \\
+    --input data/dispositivos.json --output /var/lib/recommendation/catalog.mmcat
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from .schemas import CatalogRequest, DeviceInput
+from .services.catalog import CATALOG_SNAPSHOT_ENV, compute_catalog_version
+from .services.catalog_snapshot import write_snapshot
+
+
+def load_devices(path: Path):
+  """Lê uma lista de dispositivos ou um objeto `{ "dispositivos": [...] }`."""
+  raw = json.loads(path.read_text(encoding="utf-8"))
+  if isinstance(raw, dict):
+    return CatalogRequest.model_validate(raw).dispositivos
+  return TypeAdapter(list[DeviceInput]).validate_python(raw)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Gera o snapshot mmap do catálogo.")
+  parser.add_argument("--input", required=True, help="JSON com os dispositivos (mesmo formato do scoring).")
+  parser.add_argument(
+    "--output",
+    required=True,
+    help=f"Arquivo de saída (o mesmo apontado por {CATALOG_SNAPSHOT_ENV}).",
+  )
+  args = parser.parse_args()
+  dispositivos = load_devices(Path(args.input))
+  version = compute_catalog_version(dispositivos)
+  target = write_snapshot(dispositivos, args.output, version)
+  print(f"Snapshot gravado em {target} ({len(dispositivos)} dispositivos, versão {version}).")
+
+
+if __name__ == "__main__":
+  main()
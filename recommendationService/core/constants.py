@@ -2,6 +2,7 @@
 
 from typing import Dict
 
+from .scoring_rules import load_rules
 from .types import PreferenceAspect
 
 TARGET: Dict[str, float] = {
@@ -14,12 +15,8 @@ TARGET: Dict[str, float] = {
   "top": 0.9,
 }
 
-LEVEL_TO_SCORE: Dict[str, float] = {
-  "basica": 0.3,
-  "ok": 0.5,
-  "boa": 0.75,
-  "top": 0.9,
-}
+# Scores por nível e aspecto de cada critério vêm de `scoring_rules.json`.
+LEVEL_TO_SCORE: Dict[str, float] = dict(load_rules().level_scores)
 
 ASPECT_JUSTIFICATION_LABELS: Dict[PreferenceAspect, Dict[str, str]] = {
   "camera": {
@@ -40,22 +37,7 @@ ASPECT_JUSTIFICATION_LABELS: Dict[PreferenceAspect, Dict[str, str]] = {
   },
 }
 
-CRITERION_ASPECT_HINT: Dict[str, PreferenceAspect] = {
-  "battery": "bateria",
-  "main_camera": "camera",
-  "secondary_camera": "camera",
-  "tertiary_camera": "camera",
-  "front_camera": "camera",
-  "camera": "camera",
-  "benchmark": "desempenho",
-  "ram": "desempenho",
-  "rom": "desempenho",
-  "processor": "desempenho",
-  "preco_intervalo": "preco",
-  "preco": "preco",
-  "price": "preco",
-  "custo": "preco",
-}
+CRITERION_ASPECT_HINT: Dict[str, PreferenceAspect] = load_rules().criterion_aspects()
 
 CRITERION_FALLBACK_JUSTIFICATION: Dict[str, str] = {
   "screen_size": "Tela no tamanho que você pediu",
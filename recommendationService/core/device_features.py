@@ -1,81 +1,57 @@
 """Funções auxiliares para extrair vetores e níveis de especificações."""
 
+import sys
 from typing import Dict, Optional
 
 from ..schemas import DeviceInput
 from ..utils.numeric import clamp_score, parse_value
 from ..utils.text import normalize_text
 from .preferences import level_to_score
+from .scoring_rules import load_rules
 from .specs import get_device_price_from_map, price_level_from_value
 from .types import DeviceVector
 
 
 def build_caracteristica_map(device: DeviceInput) -> Dict[str, str]:
-  """Transforma a lista de características em um dicionário chave-valor."""
+  """Transforma a lista de características em um dicionário chave-valor.
+
+  As chaves são internadas: todos os dispositivos compartilham a mesma string
+  para cada tipo de característica.
+  """
   entries: Dict[str, str] = {}
   for caracteristica in device.caracteristicas:
     tipo = caracteristica.tipo.strip().lower()
     if not tipo:
       continue
-    entries[tipo] = str(caracteristica.descricao)
+    entries[sys.intern(tipo)] = str(caracteristica.descricao)
   if device.preco is not None:
     entries["preco"] = str(device.preco)
   return entries
 
 
 def camera_level_from_numeric(value: float) -> str:
-  """Mapeia megapixels para níveis qualitativos de câmera."""
-  if value >= 64:
-    return "top"
-  if value >= 48:
-    return "boa"
-  if value >= 20:
-    return "ok"
-  return "basica"
+  """Mapeia megapixels para níveis qualitativos de câmera (tabela `camera`)."""
+  return load_rules().level("camera", value)
 
 
 def battery_level_from_numeric(value: float) -> str:
-  """Classifica a capacidade de bateria em faixas qualitativas."""
-  if value >= 6000:
-    return "top"
-  if value >= 5000:
-    return "boa"
-  if value >= 4500:
-    return "ok"
-  return "basica"
+  """Classifica a capacidade de bateria em faixas qualitativas (tabela `battery`)."""
+  return load_rules().level("battery", value)
 
 
 def performance_level_from_ram(value: float) -> str:
-  """Infere o nível de desempenho com base em RAM disponível."""
-  if value >= 12:
-    return "top"
-  if value >= 8:
-    return "boa"
-  if value >= 6:
-    return "ok"
-  return "basica"
+  """Infere o nível de desempenho com base em RAM disponível (tabela `ram`)."""
+  return load_rules().level("ram", value)
 
 
 def performance_level_from_rom(value: float) -> str:
-  """Infere o nível de desempenho considerando armazenamento interno."""
-  if value >= 512:
-    return "top"
-  if value >= 256:
-    return "boa"
-  if value >= 128:
-    return "ok"
-  return "basica"
+  """Infere o nível de desempenho considerando armazenamento interno (tabela `rom`)."""
+  return load_rules().level("rom", value)
 
 
 def performance_level_from_benchmark(value: float) -> str:
-  """Converte pontuações de benchmark em níveis qualitativos."""
-  if value >= 1_200_000:
-    return "top"
-  if value >= 900_000:
-    return "boa"
-  if value >= 600_000:
-    return "ok"
-  return "basica"
+  """Converte pontuações de benchmark em níveis qualitativos (tabela `benchmark`)."""
+  return load_rules().level("benchmark", value)
 
 
 def performance_level_from_processor(text: str) -> Optional[str]:
@@ -0,0 +1,299 @@
+"""Extração determinística de critérios estruturados a partir de `texto_livre`.
+
+O léxico (`free_text_lexicon.json`) associa termos em português a cada tipo de
+critério, com valores para frases vagas ("dura o dia todo") e para os níveis
+básica/ok/boa/top, seguindo a mesma tabela de conversão usada no prompt do
+extrator via LLM no backend. O texto é dividido em trechos; em cada trecho,
+números com unidade (`8gb`, `5000mah`, `48mp`) têm prioridade sobre frases e
+níveis e ficam com a palavra-chave compatível mais próxima ("8gb de ram").
+A confiança é a fração das palavras relevantes do texto que foram reconhecidas
+pelo léxico, reduzida quando a atribuição de algum número é ambígua.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Set, Tuple
+
+from ..utils.numeric import parse_value
+from ..utils.text import infer_level_from_text, infer_price_range_from_text, normalize_text
+from .types import NormalizedCriterion
+
+LEXICON_PATH = Path(__file__).with_name("free_text_lexicon.json")
+CONFIDENCE_THRESHOLD = 0.6
+FREE_TEXT_CACHE_SIZE = 4096
+PRICE_TYPE = "preco_intervalo"
+RAM_MAX_GB = 24
+
+AMBIGUITY_PENALTY = 0.5
+
+_CLAUSE_WORDS = r"\s(?:e|com|mas|porem|tambem)\s"
+_CURRENCY_VALUE = re.compile(r"r\$\s*\d")
+_BARE_PRICE = re.compile(r"(?:ate|acima de|mais de|a partir de|entre|no maximo)\s+\d{3,5}(?![\d.,]*\s*(?:gb|mah|mp|hz))")
+_THOUSANDS = re.compile(r"(?<![\d.,])\d{1,3}(?:\.\d{3})+(?!\d|\.\d)")
+_PRICE_WORDS = frozenset({"ate", "acima", "entre", "partir", "maximo"})
+_WORD = re.compile(r"[a-z0-9$][a-z0-9$-]*")
+
+
+@dataclass(frozen=True)
+class _Lexicon:
+  stopwords: FrozenSet[str]
+  level_words: Dict[str, str]
+  level_pattern: Pattern[str]
+  terms: Dict[str, str]
+  term_pattern: Pattern[str]
+  phrases: Dict[str, Dict[str, float]]
+  phrase_patterns: Dict[str, Pattern[str]]
+  levels: Dict[str, Dict[str, float]]
+  unit_types: Dict[str, Tuple[str, ...]]
+  unit_pattern: Pattern[str]
+  clause_split: Pattern[str]
+
+
+@dataclass(frozen=True)
+class FreeTextExtraction:
+  """Critérios extraídos de um texto livre e a confiança da extração (0-1)."""
+
+  criterios: Tuple[Tuple[str, str, Optional[float]], ...]
+  confidence: float
+
+  @property
+  def confident(self) -> bool:
+    return bool(self.criterios) and self.confidence >= CONFIDENCE_THRESHOLD
+
+  def normalized_criteria(self) -> List[NormalizedCriterion]:
+    return [NormalizedCriterion(tipo=tipo, descricao=descricao, valor=valor) for tipo, descricao, valor in self.criterios]
+
+
+def _alternation(terms: Iterable[str]) -> Pattern[str]:
+  """Regex única com os termos inteiros, dos mais longos para os mais curtos."""
+  ordered = sorted(terms, key=len, reverse=True)
+  if not ordered:
+    return re.compile(r"(?!x)x")
+  return re.compile(r"(?<![a-z0-9])(" + "|".join(re.escape(term) for term in ordered) + r")(?![a-z0-9])")
+
+
+@lru_cache(maxsize=1)
+def load_lexicon(path: Path = LEXICON_PATH) -> _Lexicon:
+  """Lê o léxico e compila as expressões uma única vez."""
+  with open(path, encoding="utf-8") as handle:
+    raw = json.load(handle)
+  aspects = raw["aspects"]
+  level_words = {word: level for level, words in raw["levels"].items() for word in words}
+  terms = {term: tipo for tipo, spec in aspects.items() for term in spec["terms"]}
+  phrases = {tipo: spec["phrases"] for tipo, spec in aspects.items()}
+  unit_types: Dict[str, Tuple[str, ...]] = {}
+  for tipo, spec in aspects.items():
+    for unit in spec["units"]:
+      unit_types[unit] = unit_types.get(unit, ()) + (tipo,)
+  units = "|".join(re.escape(unit) for unit in sorted(unit_types, key=len, reverse=True))
+  # Conjunções só não separam trechos antes de um número sem unidade ("entre 1500 e 2500").
+  spec_units = "|".join(re.escape(unit) for unit in sorted(unit_types, key=len, reverse=True) if PRICE_TYPE not in unit_types[unit])
+  bare_number = r"\d[\d.,]*(?![\d.,])(?!\s*(?:" + spec_units + r")(?![a-z]))"
+  return _Lexicon(
+    stopwords=frozenset(raw["stopwords"]),
+    level_words=level_words,
+    level_pattern=_alternation(level_words),
+    terms=terms,
+    term_pattern=_alternation(terms),
+    phrases=phrases,
+    phrase_patterns={tipo: _alternation(entries) for tipo, entries in phrases.items()},
+    levels={tipo: spec["levels"] for tipo, spec in aspects.items()},
+    unit_types=unit_types,
+    unit_pattern=re.compile(r"(\d+(?:[.,]\d+)?)\s*(" + units + r")(?![a-z])"),
+    clause_split=re.compile(r"[;!?\n]|[.,](?!\d)|" + _CLAUSE_WORDS + r"(?!" + bare_number + r")"),
+  )
+
+
+def _format_value(value: float) -> str:
+  return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _words(text: str) -> List[str]:
+  return _WORD.findall(text)
+
+
+def _strip_thousands(text: str) -> str:
+  """"1.500" -> "1500": separadores de milhar não podem quebrar números de preço."""
+  return _THOUSANDS.sub(lambda match: _format_value(parse_value(match.group(0))), text)
+
+
+def _gap(clause: str, start: int, end: int) -> int:
+  """Palavras entre duas posições do trecho."""
+  return len(_words(clause[start:end]))
+
+
+def _fallback_unit_type(lexicon: _Lexicon, unit: str, value: float, mentioned: List[str], taken: Set[str]) -> str:
+  candidates = lexicon.unit_types[unit]
+  for tipo in candidates:
+    if tipo in mentioned and tipo not in taken:
+      return tipo
+  if unit == "gb":
+    return "ram" if value <= RAM_MAX_GB else "rom"
+  return candidates[0]
+
+
+def _attribute_quantities(
+  lexicon: _Lexicon,
+  clause: str,
+  terms: List[Tuple[int, int, str]],
+) -> Tuple[List[Tuple[str, float, str]], bool]:
+  """Associa cada número com unidade à palavra-chave compatível mais próxima.
+
+  Cada palavra-chave fica com um único número; em empate de distância vale a
+  que vem depois do número ("8gb de ram"). Devolve (tipo, valor, trecho) de
+  cada número e se alguma atribuição foi ambígua.
+  """
+  quantities = [
+    (match, float(match.group(1).replace(",", "."))) for match in lexicon.unit_pattern.finditer(clause)
+  ]
+  pairs = []
+  for q_index, (match, _) in enumerate(quantities):
+    candidates = lexicon.unit_types[match.group(2)]
+    for t_index, (start, end, tipo) in enumerate(terms):
+      if tipo not in candidates:
+        continue
+      if start >= match.end():
+        pairs.append((_gap(clause, match.end(), start), 0, q_index, t_index))
+      else:
+        pairs.append((_gap(clause, end, match.start()), 1, q_index, t_index))
+  pairs.sort()
+
+  assigned: Dict[int, str] = {}
+  used_terms: Set[int] = set()
+  ambiguous = False
+  for distance, _, q_index, t_index in pairs:
+    if q_index in assigned or t_index in used_terms:
+      continue
+    tipo = terms[t_index][2]
+    # Outra palavra-chave livre de outro tipo à mesma distância: a escolha é um palpite.
+    ambiguous = ambiguous or any(
+      other_q == q_index and other_distance == distance and other_t not in used_terms and terms[other_t][2] != tipo
+      for other_distance, _, other_q, other_t in pairs
+    )
+    assigned[q_index] = tipo
+    used_terms.add(t_index)
+
+  mentioned = [tipo for _, _, tipo in terms]
+  resolved: List[Tuple[str, float, str]] = []
+  for q_index, (match, value) in enumerate(quantities):
+    tipo = assigned.get(q_index)
+    if tipo is None:
+      tipo = _fallback_unit_type(lexicon, match.group(2), value, mentioned, set(assigned.values()))
+      shares_unit = any(
+        other is not match and lexicon.unit_types[other.group(2)] == lexicon.unit_types[match.group(2)]
+        for other, _ in quantities
+      )
+      ambiguous = ambiguous or (shares_unit and len(lexicon.unit_types[match.group(2)]) > 1)
+    resolved.append((tipo, value, match.group(0)))
+  return resolved, ambiguous
+
+
+def _parse_clause(lexicon: _Lexicon, clause: str, found: Dict[str, Tuple[str, Optional[float]]], covered: Set[str]) -> bool:
+  """Extrai critérios de um trecho, marcando em `covered` as palavras reconhecidas.
+
+  Devolve True quando a atribuição dos números do trecho foi ambígua.
+  """
+  mentioned: List[str] = []
+  terms: List[Tuple[int, int, str]] = []
+  for match in lexicon.term_pattern.finditer(clause):
+    covered.update(_words(match.group(1)))
+    tipo = lexicon.terms[match.group(1)]
+    terms.append((match.start(1), match.end(1), tipo))
+    if tipo not in mentioned:
+      mentioned.append(tipo)
+
+  quantities, ambiguous = _attribute_quantities(lexicon, clause, terms)
+  resolved: Set[str] = set()
+  for tipo, value, text in quantities:
+    covered.update(_words(text))
+    if tipo == PRICE_TYPE:
+      continue
+    resolved.add(tipo)
+    found.setdefault(tipo, (_format_value(value), value))
+
+  if PRICE_TYPE in mentioned or _CURRENCY_VALUE.search(clause) or _BARE_PRICE.search(clause):
+    price_range = infer_price_range_from_text(clause)
+    if price_range:
+      covered.update(word for word in _words(clause) if word.isdigit() or word in _PRICE_WORDS)
+      found.setdefault(PRICE_TYPE, (price_range, None))
+
+  level_match = lexicon.level_pattern.search(clause)
+  if level_match:
+    covered.update(_words(level_match.group(1)))
+  level = lexicon.level_words[level_match.group(1)] if level_match else infer_level_from_text(clause)
+  for tipo in mentioned:
+    if tipo == PRICE_TYPE or tipo in resolved or tipo in found:
+      continue
+    phrase_match = lexicon.phrase_patterns[tipo].search(clause)
+    if phrase_match:
+      covered.update(_words(phrase_match.group(1)))
+      value = lexicon.phrases[tipo][phrase_match.group(1)]
+    else:
+      value = lexicon.levels[tipo].get(level)
+    if value is not None:
+      found[tipo] = (_format_value(value), float(value))
+  return ambiguous
+
+
+@lru_cache(maxsize=FREE_TEXT_CACHE_SIZE)
+def _extract(normalized: str) -> FreeTextExtraction:
+  lexicon = load_lexicon()
+  found: Dict[str, Tuple[str, Optional[float]]] = {}
+  covered: Set[str] = set()
+  ambiguous = False
+  normalized = _strip_thousands(normalized)
+  for clause in lexicon.clause_split.split(normalized):
+    clause = clause.strip()
+    if clause:
+      ambiguous = _parse_clause(lexicon, clause, found, covered) or ambiguous
+  relevant = [word for word in _words(normalized) if word not in lexicon.stopwords]
+  if not found:
+    confidence = 0.0
+  elif not relevant:
+    confidence = 1.0
+  else:
+    confidence = sum(1 for word in relevant if word in covered) / len(relevant)
+  if ambiguous:
+    confidence *= AMBIGUITY_PENALTY
+  return FreeTextExtraction(
+    criterios=tuple((tipo, descricao, valor) for tipo, (descricao, valor) in found.items()),
+    confidence=round(confidence, 4),
+  )
+
+
+def extract_free_text_criteria(text: Optional[str]) -> FreeTextExtraction:
+  """Converte texto livre em critérios estruturados (memoizado pelo texto normalizado)."""
+  return _extract(" ".join(normalize_text(text).split()))
+
+
+def expand_free_text_criteria(criterios: List[NormalizedCriterion]) -> List[NormalizedCriterion]:
+  """Substitui `texto_livre` pelos critérios extraídos, sem sobrescrever tipos já informados.
+
+  Só extrações confiantes entram no scoring; as demais são descartadas, como o
+  `texto_livre` sempre foi, em vez de mudar o ranking com um palpite.
+  """
+  structured = [criterio for criterio in criterios if criterio.tipo != "texto_livre"]
+  explicit = {criterio.tipo for criterio in structured}
+  for criterio in criterios:
+    if criterio.tipo != "texto_livre":
+      continue
+    extraction = extract_free_text_criteria(criterio.descricao)
+    if not extraction.confident:
+      continue
+    for extracted in extraction.normalized_criteria():
+      if extracted.tipo not in explicit:
+        explicit.add(extracted.tipo)
+        structured.append(extracted)
+  return structured
+
+
+__all__ = [
+  "CONFIDENCE_THRESHOLD",
+  "FreeTextExtraction",
+  "expand_free_text_criteria",
+  "extract_free_text_criteria",
+  "load_lexicon",
+]
@@ -4,15 +4,21 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 try:
   import joblib
 except ImportError:  # pragma: no cover - handled em runtime
   joblib = None
 
+try:
+  import numpy as np
+except ImportError:  # pragma: no cover - handled em runtime
+  np = None
+
 try:
   import pandas as pd
 except ImportError:  # pragma: no cover - handled em runtime
@@ -43,10 +49,15 @@ DEFAULT_MODEL_PATH = Path(__file__).resolve().parents[1] / "models" / "device_ma
 
 @dataclass
 class MatchModelArtifact:
-  """Wrapper serializável contendo o estimador treinado."""
+  """Wrapper serializável contendo o estimador treinado.
+
+  `metadata` (data de treino, métricas, latência) só existe em artefatos
+  gerados por `train_match_model`; artefatos antigos carregam com None.
+  """
 
   feature_names: List[str]
   estimator: object
+  metadata: Optional[Dict[str, Any]] = None
 
   def predict(self, payload: Dict[str, float]) -> float:
     """Executa o `predict` sempre que possível preservando os nomes das colunas."""
@@ -61,6 +72,17 @@ class MatchModelArtifact:
 
 _MODEL_CACHE: Optional[MatchModelArtifact] = None
 _MODEL_CACHE_PATH: Optional[Path] = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _reset_lock_after_fork() -> None:
+  """Garante um lock livre no filho, mesmo se o fork ocorreu com ele adquirido."""
+  global _MODEL_LOCK
+  _MODEL_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+  os.register_at_fork(after_in_child=_reset_lock_after_fork)
 
 
 def _resolve_model_path(path: Optional[str]) -> Path:
@@ -85,17 +107,46 @@ def load_match_model(path: Optional[str] = None) -> Optional[MatchModelArtifact]
   global _MODEL_CACHE, _MODEL_CACHE_PATH
   if _MODEL_CACHE is not None and _MODEL_CACHE_PATH == resolved:
     return _MODEL_CACHE
+  with _MODEL_LOCK:
+    # Outra thread pode ter carregado o artefato enquanto esperávamos o lock.
+    if _MODEL_CACHE is not None and _MODEL_CACHE_PATH == resolved:
+      return _MODEL_CACHE
+    try:
+      artifact = joblib.load(resolved)
+    except Exception as exc:  # pragma: no cover - proteção runtime
+      logger.error("Falha ao carregar modelo de matching: %s", exc)
+      return None
+    if isinstance(artifact, MatchModelArtifact):
+      model = artifact
+    else:
+      model = MatchModelArtifact(feature_names=MATCH_FEATURE_COLUMNS.copy(), estimator=artifact)
+    _MODEL_CACHE = model
+    _MODEL_CACHE_PATH = resolved
+    return model
+
+
+def model_version(path: Optional[str] = None) -> str:
+  """Identifica o artefato em uso (caminho, mtime e tamanho) ou `heuristic` sem modelo."""
+  resolved = _resolve_model_path(path)
+  if joblib is None:
+    return "heuristic"
   try:
-    artifact = joblib.load(resolved)
-  except Exception as exc:  # pragma: no cover - proteção runtime
-    logger.error("Falha ao carregar modelo de matching: %s", exc)
+    stat = resolved.stat()
+  except OSError:
+    return "heuristic"
+  return f"{resolved}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def warm_match_model(path: Optional[str] = None) -> Optional[MatchModelArtifact]:
+  """Carrega o modelo e executa uma predição de aquecimento (imports e caches internos)."""
+  model = load_match_model(path)
+  if model is None:
     return None
-  if isinstance(artifact, MatchModelArtifact):
-    model = artifact
-  else:
-    model = MatchModelArtifact(feature_names=MATCH_FEATURE_COLUMNS.copy(), estimator=artifact)
-  _MODEL_CACHE = model
-  _MODEL_CACHE_PATH = resolved
+  payload = {column: 0.5 for column in model.feature_names}
+  try:
+    model.predict(payload)
+  except Exception as exc:  # pragma: no cover - proteção runtime
+    logger.error("Falha ao aquecer o modelo de matching: %s", exc)
   return model
 
 
@@ -125,6 +176,28 @@ def build_feature_payload(
   }
 
 
+_BOOLEAN_FEATURES = {"has_structured", "has_preference_targets", "includes_price"}
+
+
+def build_feature_matrix(columns: Mapping[str, Any], feature_names: Optional[List[str]] = None):
+  """Versão vetorizada de `build_feature_payload`: uma linha por exemplo.
+
+  `columns` mapeia cada feature para uma sequência (lista, array ou coluna de
+  DataFrame); as flags aceitam bool ou 0/1. Devolve um `float64` (n, features).
+  """
+  if np is None:
+    raise RuntimeError("numpy é necessário para montar a matriz de features")
+  names = feature_names or MATCH_FEATURE_COLUMNS
+  matrix = np.empty((len(columns[names[0]]), len(names)), dtype=np.float64)
+  for index, name in enumerate(names):
+    values = np.asarray(columns[name])
+    if name in _BOOLEAN_FEATURES:
+      matrix[:, index] = values.astype(bool)
+    else:
+      matrix[:, index] = values
+  return matrix
+
+
 def _payload_to_vector(payload: Dict[str, float], columns: List[str]) -> List[float]:
   """Converte o payload de features em vetor ordenado."""
   return [float(payload.get(column, 0.0)) for column in columns]
@@ -151,11 +224,35 @@ def predict_match_score(feature_payload: Dict[str, float], fallback: float) -> f
   return clamp_score(prediction)
 
 
+def predict_match_scores(columns: Mapping[str, Any], fallback):
+  """Versão em lote de `predict_match_score`: um único `predict` para todas as linhas.
+
+  `columns` segue o formato de `build_feature_matrix`; `fallback` é a coluna de
+  scores heurísticos usada quando não há modelo (ou ele falha).
+  """
+  heuristic = np.clip(np.asarray(fallback, dtype=np.float64), 0.0, 1.0)
+  model = load_match_model()
+  if model is None or len(heuristic) == 0:
+    return heuristic
+  try:
+    matrix = build_feature_matrix(columns, model.feature_names)
+    features = pd.DataFrame(matrix, columns=model.feature_names) if pd is not None else matrix
+    predictions = np.asarray(model.estimator.predict(features), dtype=np.float64)
+  except Exception as exc:  # pragma: no cover - proteção runtime
+    logger.error("Erro ao executar o modelo treinado: %s", exc)
+    return heuristic
+  return np.where(np.isnan(predictions), 0.5, np.clip(predictions, 0.0, 1.0))
+
+
 __all__ = [
   "MATCH_FEATURE_COLUMNS",
   "DEFAULT_MODEL_PATH",
   "MatchModelArtifact",
+  "build_feature_matrix",
   "build_feature_payload",
   "load_match_model",
+  "model_version",
   "predict_match_score",
+  "predict_match_scores",
+  "warm_match_model",
 ]
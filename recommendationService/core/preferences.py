@@ -10,6 +10,7 @@ from .constants import (
   LEVEL_TO_SCORE,
   TARGET,
 )
+from .scoring_rules import load_rules
 from .types import CriterionScoreData, DeviceVector, PreferenceAspect, PreferenceLevel
 
 
@@ -47,46 +48,40 @@ def map_criteria_to_preferences(
   battery_level_from_numeric,
   camera_level_from_numeric,
 ) -> Tuple[Dict[PreferenceAspect, PreferenceLevel], Dict[PreferenceAspect, float]]:
-  """Traduz critérios estruturados em preferências alvo e pesos respectivos."""
+  """Traduz critérios estruturados em preferências alvo e pesos respectivos.
+
+  O aspecto, a tabela numérica e as regras de texto de cada tipo vêm de
+  `scoring_rules.json`; tipos ausentes da tabela (ex.: texto_livre) são ignorados.
+  """
+  numeric_handlers = {
+    "camera": camera_level_from_numeric,
+    "battery": battery_level_from_numeric,
+    "ram": performance_level_from_ram,
+    "rom": performance_level_from_rom,
+    "benchmark": performance_level_from_benchmark,
+    "price": price_level_from_value,
+  }
+  text_handlers = {
+    "keywords": level_from_keywords,
+    "price_range": price_level_from_range,
+    "processor": performance_level_from_processor,
+  }
+  rules = load_rules().criteria
   prefs: Dict[PreferenceAspect, PreferenceLevel] = {}
   weights: Dict[PreferenceAspect, float] = {}
   for criterio in criterios:
-    tipo = criterio.tipo
-    descricao = criterio.descricao
-    valor = criterio.valor
-    if tipo == "texto_livre":
-      continue
-    if tipo == "battery":
-      level = level_from_keywords(descricao) if valor is None else battery_level_from_numeric(valor)
-      merge_preference(prefs, weights, "bateria", level)
-      continue
-    if tipo in {"main_camera", "secondary_camera", "tertiary_camera", "front_camera", "camera"}:
-      level = level_from_keywords(descricao) if valor is None else camera_level_from_numeric(valor)
-      merge_preference(prefs, weights, "camera", level)
-      continue
-    if tipo == "benchmark":
-      level = level_from_keywords(descricao) if valor is None else performance_level_from_benchmark(valor)
-      merge_preference(prefs, weights, "desempenho", level)
-      continue
-    if tipo == "preco_intervalo":
-      level = price_level_from_range(descricao)
-      merge_preference(prefs, weights, "preco", level)
+    rule = rules.get(criterio.tipo)
+    if rule is None:
       continue
-    if tipo == "ram":
-      level = level_from_keywords(descricao) if valor is None else performance_level_from_ram(valor)
-      merge_preference(prefs, weights, "desempenho", level)
-      continue
-    if tipo == "rom":
-      level = level_from_keywords(descricao) if valor is None else performance_level_from_rom(valor)
-      merge_preference(prefs, weights, "desempenho", level)
-      continue
-    if tipo == "processor":
-      level = performance_level_from_processor(descricao) or level_from_keywords(descricao)
-      merge_preference(prefs, weights, "desempenho", level)
-      continue
-    if tipo in {"preco", "price", "custo"}:
-      level = price_level_from_value(valor) if valor is not None else level_from_keywords(descricao)
-      merge_preference(prefs, weights, "preco", level)
+    level = None
+    if rule.numeric is not None and criterio.valor is not None:
+      level = numeric_handlers[rule.numeric](criterio.valor)
+    else:
+      for handler in rule.text:
+        level = text_handlers[handler](criterio.descricao)
+        if level:
+          break
+    merge_preference(prefs, weights, rule.aspect, level)
   return prefs, weights
 
 
@@ -100,6 +95,16 @@ def prefs_to_target(prefs: Dict[PreferenceAspect, PreferenceLevel]) -> Dict[Pref
   }
 
 
+def aspect_weights(weights: Dict[PreferenceAspect, float]) -> Dict[PreferenceAspect, float]:
+  """Completa os pesos por aspecto com 1.0 para os aspectos não citados."""
+  return {
+    "camera": weights.get("camera", 1.0),
+    "bateria": weights.get("bateria", 1.0),
+    "preco": weights.get("preco", 1.0),
+    "desempenho": weights.get("desempenho", 1.0),
+  }
+
+
 def compute_opinion_similarity(
   vector: DeviceVector,
   prefs: Dict[PreferenceAspect, PreferenceLevel],
@@ -107,12 +112,7 @@ def compute_opinion_similarity(
 ) -> float:
   """Calcula a similaridade entre o vetor agregado e o alvo do usuário."""
   target = prefs_to_target(prefs)
-  w = {
-    "camera": weights.get("camera", 1.0),
-    "bateria": weights.get("bateria", 1.0),
-    "preco": weights.get("preco", 1.0),
-    "desempenho": weights.get("desempenho", 1.0),
-  }
+  w = aspect_weights(weights)
   denom = sum(w.values()) or 1.0
   dist = (
     w["camera"] * abs(vector.camera - target["camera"]) +
@@ -0,0 +1,150 @@
+"""Tabelas declarativas de regras de scoring (`scoring_rules.json`).
+
+O arquivo define:
+
+  level_scores   nível qualitativo -> score (0-1)
+  level_tables   limiares ordenados de cada spec -> nível
+  criteria       tipo de critério -> aspecto, tabela numérica e regras de texto
+  spec_ramp      rampa de `score_specifications` para valores abaixo do pedido
+
+Cada tabela de níveis vira um array de limiares crescentes. `side` diz de que
+lado o limiar pertence: `right` equivale a `value >= limiar` (sobe de nível no
+próprio limiar), `left` a `value <= limiar` (o limiar ainda fica no nível de
+baixo). O mesmo array atende escalares (bisect) e colunas NumPy (searchsorted).
+"""
+
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+  import numpy as np
+except ImportError:  # pragma: no cover - handled em runtime
+  np = None
+
+RULES_PATH = Path(__file__).with_name("scoring_rules.json")
+
+
+@dataclass(frozen=True)
+class LevelTable:
+  """Limiares crescentes e o nível de cada faixa (len(levels) == len(breakpoints) + 1)."""
+
+  breakpoints: Tuple[float, ...]
+  levels: Tuple[str, ...]
+  side: str = "right"
+
+  def __post_init__(self):
+    if len(self.levels) != len(self.breakpoints) + 1:
+      raise ValueError("Uma tabela de níveis precisa de um nível a mais que limiares")
+    if list(self.breakpoints) != sorted(self.breakpoints):
+      raise ValueError("Os limiares precisam estar em ordem crescente")
+    if self.side not in ("left", "right"):
+      raise ValueError(f"side inválido: {self.side}")
+
+  def index(self, value: float) -> int:
+    """Faixa do valor; NaN cai no nível padrão do encadeamento de ifs equivalente."""
+    if value != value:
+      return 0 if self.side == "right" else len(self.breakpoints)
+    if self.side == "right":
+      return bisect_right(self.breakpoints, value)
+    return bisect_left(self.breakpoints, value)
+
+  def level(self, value: float) -> str:
+    return self.levels[self.index(value)]
+
+  def indices(self, values):
+    """Versão vetorizada de `index` para um array NumPy."""
+    array = np.asarray(values, dtype=np.float64)
+    indices = np.searchsorted(np.asarray(self.breakpoints, dtype=np.float64), array, side=self.side)
+    default = 0 if self.side == "right" else len(self.breakpoints)
+    return np.where(np.isnan(array), default, indices)
+
+
+@dataclass(frozen=True)
+class CriterionRule:
+  """Como um tipo de critério vira preferência: aspecto, tabela numérica e regras de texto."""
+
+  aspect: str
+  numeric: Optional[str]
+  text: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SpecRamp:
+  """Score parcial `(razão - start) / width` quando o dispositivo fica abaixo do pedido."""
+
+  start: float
+  width: float
+
+  def score(self, ratio: float) -> float:
+    return max(0.0, min(1.0, (ratio - self.start) / self.width))
+
+  def scores(self, ratios):
+    return np.clip((np.asarray(ratios, dtype=np.float64) - self.start) / self.width, 0.0, 1.0)
+
+
+@dataclass(frozen=True)
+class ScoringRules:
+  level_scores: Dict[str, float]
+  level_tables: Dict[str, LevelTable]
+  criteria: Dict[str, CriterionRule]
+  spec_ramp: SpecRamp
+
+  def level(self, table: str, value: float) -> str:
+    return self.level_tables[table].level(value)
+
+  def level_score_array(self, table: str, values, fallback: float = 0.5):
+    """Score do nível de cada valor de uma coluna (ex.: bateria de todo o catálogo)."""
+    level_table = self.level_tables[table]
+    scores = np.asarray([self.level_scores.get(level, fallback) for level in level_table.levels])
+    return scores[level_table.indices(values)]
+
+  def criterion_aspects(self) -> Dict[str, str]:
+    return {tipo: rule.aspect for tipo, rule in self.criteria.items()}
+
+
+def parse_rules(raw: Dict) -> ScoringRules:
+  """Valida e compila o conteúdo do arquivo de regras."""
+  level_tables = {
+    name: LevelTable(
+      breakpoints=tuple(float(value) for value in spec["breakpoints"]),
+      levels=tuple(spec["levels"]),
+      side=spec.get("side", "right"),
+    )
+    for name, spec in raw["level_tables"].items()
+  }
+  criteria = {
+    tipo: CriterionRule(aspect=spec["aspect"], numeric=spec.get("numeric"), text=tuple(spec.get("text", ())))
+    for tipo, spec in raw["criteria"].items()
+  }
+  for tipo, rule in criteria.items():
+    if rule.numeric is not None and rule.numeric not in level_tables:
+      raise ValueError(f"Critério {tipo} usa a tabela inexistente {rule.numeric}")
+  ramp = raw["spec_ramp"]
+  return ScoringRules(
+    level_scores={level: float(score) for level, score in raw["level_scores"].items()},
+    level_tables=level_tables,
+    criteria=criteria,
+    spec_ramp=SpecRamp(start=float(ramp["start"]), width=float(ramp["width"])),
+  )
+
+
+@lru_cache(maxsize=1)
+def load_rules(path: Path = RULES_PATH) -> ScoringRules:
+  """Lê e compila as regras uma única vez por processo."""
+  with open(path, encoding="utf-8") as handle:
+    return parse_rules(json.load(handle))
+
+
+__all__ = [
+  "CriterionRule",
+  "LevelTable",
+  "RULES_PATH",
+  "ScoringRules",
+  "SpecRamp",
+  "load_rules",
+  "parse_rules",
+]
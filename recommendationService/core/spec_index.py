@@ -0,0 +1,130 @@
+"""Índices ordenados por característica para podar candidatos antes do scoring."""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..utils.numeric import compute_price_score, parse_value
+from ..utils.text import normalize_text
+from .constants import NUMERIC_CRITERIA_TYPES, PRICE_CRITERION_WEIGHT
+from .scoring_rules import load_rules
+from .specs import get_device_price_from_map, parse_price_range
+from .types import NormalizedCriterion
+
+PRICE_INDEX_KEY = "preco"
+
+
+class SpecRangeIndex:
+  """Colunas numéricas ordenadas (valor, posição) sobre um conjunto de dispositivos.
+
+  Permite calcular, por bisect, o limite superior do `spec_fit` de cada
+  dispositivo sem passar pelo cálculo completo de `score_specifications`.
+  """
+
+  def __init__(self, size: int):
+    self.size = size
+    self._numeric: Dict[str, Tuple[Sequence[float], Sequence[int]]] = {}
+    # None indica que a presença de características textuais não é conhecida.
+    self._present: Optional[Dict[str, List[int]]] = {}
+
+  @classmethod
+  def from_sorted_columns(
+    cls,
+    size: int,
+    columns: Dict[str, Tuple[Sequence[float], Sequence[int]]],
+  ) -> "SpecRangeIndex":
+    """Usa colunas já ordenadas (ex.: memoryviews de um snapshot) sem copiá-las.
+
+    Sem informação de presença, critérios textuais recebem limite 1.0 para todos.
+    """
+    index = cls(size)
+    index._numeric = dict(columns)
+    index._present = None
+    return index
+
+  @classmethod
+  def from_maps(
+    cls,
+    caracteristicas_maps: Sequence[Dict[str, str]],
+    tipos: Optional[Iterable[str]] = None,
+  ) -> "SpecRangeIndex":
+    """Constrói o índice para os tipos pedidos (ou todos os presentes)."""
+    index = cls(len(caracteristicas_maps))
+    wanted = set(tipos) if tipos is not None else None
+    numeric_rows: Dict[str, List[Tuple[float, int]]] = {}
+    present_rows: Dict[str, List[int]] = {}
+    price_rows: List[Tuple[float, int]] = []
+    for position, caracteristicas_map in enumerate(caracteristicas_maps):
+      for tipo, raw in caracteristicas_map.items():
+        if wanted is not None and tipo not in wanted:
+          continue
+        if normalize_text(raw):
+          present_rows.setdefault(tipo, []).append(position)
+        if tipo in NUMERIC_CRITERIA_TYPES:
+          value = parse_value(raw)
+          if value is not None:
+            numeric_rows.setdefault(tipo, []).append((value, position))
+      price = get_device_price_from_map(caracteristicas_map)
+      if price is not None:
+        price_rows.append((price, position))
+    numeric_rows[PRICE_INDEX_KEY] = price_rows
+    for tipo, rows in numeric_rows.items():
+      rows.sort()
+      index._numeric[tipo] = ([value for value, _ in rows], [position for _, position in rows])
+    index._present = present_rows
+    return index
+
+  def column(self, tipo: str) -> Tuple[Sequence[float], Sequence[int]]:
+    """Coluna numérica ordenada `(valores, posições)` do tipo (vazia se ausente)."""
+    return self._numeric.get(tipo, ([], []))
+
+  def spec_fit_upper_bounds(self, criterios: Sequence[NormalizedCriterion]) -> List[float]:
+    """Limite superior do `spec_fit` de cada dispositivo (mesma ordem de entrada)."""
+    if not criterios:
+      return [0.5] * self.size
+    totals = [0.0] * self.size
+    total_weight = 0.0
+    for criterio in criterios:
+      weight = PRICE_CRITERION_WEIGHT if criterio.tipo == "preco_intervalo" else 1.0
+      total_weight += weight
+      for position, score in self._criterion_bounds(criterio):
+        totals[position] += score * weight
+    if total_weight <= 0:
+      return [0.0] * self.size
+    return [total / total_weight for total in totals]
+
+  def _criterion_bounds(self, criterio: NormalizedCriterion) -> Iterable[Tuple[int, float]]:
+    """Pares (posição, score máximo) dos dispositivos com score possivelmente > 0."""
+    if criterio.tipo == "preco_intervalo":
+      return self._price_bounds(criterio.descricao)
+    if criterio.tipo in NUMERIC_CRITERIA_TYPES:
+      desired = criterio.valor if criterio.valor is not None else parse_value(criterio.descricao)
+      if desired is None:
+        return []
+      return self._numeric_bounds(criterio.tipo, desired)
+    if self._present is None:
+      return ((position, 1.0) for position in range(self.size))
+    return ((position, 1.0) for position in self._present.get(criterio.tipo, []))
+
+  def _numeric_bounds(self, tipo: str, desired: float) -> Iterable[Tuple[int, float]]:
+    """Score exato da rampa de `score_specifications` para a coluna numérica."""
+    values, positions = self._numeric.get(tipo, ([], []))
+    ramp = load_rules().spec_ramp
+    start = bisect_left(values, ramp.start * desired) if desired > 0 else 0
+    for offset in range(start, len(values)):
+      value = values[offset]
+      score = 1.0 if value >= desired else ramp.score(value / max(desired, 1e-9))
+      yield positions[offset], score
+
+  def _price_bounds(self, range_text: str) -> Iterable[Tuple[int, float]]:
+    """Score de preço exato apenas para quem cai na faixa mais a tolerância."""
+    min_value, max_value = parse_price_range(range_text)
+    values, positions = self._numeric.get(PRICE_INDEX_KEY, ([], []))
+    lower = min_value - max(min_value * 0.2, 150) if min_value is not None else None
+    upper = max_value + max(max_value * 0.2, 150) if max_value is not None else None
+    start = bisect_left(values, lower) if lower is not None else 0
+    stop = bisect_right(values, upper) if upper is not None else len(values)
+    for offset in range(start, stop):
+      yield positions[offset], compute_price_score(values[offset], min_value, max_value)
+
+
+__all__ = ["PRICE_INDEX_KEY", "SpecRangeIndex"]
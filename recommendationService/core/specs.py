@@ -6,6 +6,7 @@ from ..schemas import Criterion
 from ..utils.numeric import compute_price_score, parse_value
 from ..utils.text import normalize_text
 from .constants import NUMERIC_CRITERIA_TYPES, PRICE_KEYS, PRICE_CRITERION_WEIGHT
+from .scoring_rules import load_rules
 from .types import CriterionScoreData, NormalizedCriterion
 
 
@@ -39,14 +40,8 @@ def price_level_from_range(range_text: str) -> Optional[str]:
 
 
 def price_level_from_value(value: float) -> str:
-  """Mapeia um preço isolado para o nível de custo equivalente."""
-  if value <= 1000:
-    return "basica"
-  if value <= 2000:
-    return "ok"
-  if value <= 3000:
-    return "boa"
-  return "top"
+  """Mapeia um preço isolado para o nível de custo equivalente (tabela `price`)."""
+  return load_rules().level("price", value)
 
 
 def get_device_price_from_map(caracteristicas_map: Dict[str, str]) -> Optional[float]:
@@ -79,6 +74,39 @@ def build_normalized_criteria(criterios: List[Criterion]) -> List[NormalizedCrit
   return normalized
 
 
+def criterion_weight(criterio: NormalizedCriterion) -> float:
+  """Peso do critério no spec fit (a faixa de preço pesa mais)."""
+  return PRICE_CRITERION_WEIGHT if criterio.tipo == "preco_intervalo" else 1.0
+
+
+def score_criterion(
+  criterio: NormalizedCriterion,
+  caracteristicas_map: Dict[str, str],
+) -> Tuple[float, float]:
+  """Score (0-1) e peso de um único critério estruturado para um dispositivo."""
+  if criterio.tipo == "preco_intervalo":
+    min_value, max_value = parse_price_range(criterio.descricao)
+    device_price = get_device_price_from_map(caracteristicas_map)
+    return compute_price_score(device_price, min_value, max_value), criterion_weight(criterio)
+  raw_value = caracteristicas_map.get(criterio.tipo)
+  score = 0.0
+  if criterio.tipo in NUMERIC_CRITERIA_TYPES:
+    desired = criterio.valor if criterio.valor is not None else parse_value(criterio.descricao)
+    device_value = parse_value(raw_value) if raw_value is not None else None
+    if desired is not None and device_value is not None:
+      if device_value >= desired:
+        score = 1.0
+      else:
+        ratio = device_value / max(desired, 1e-9)
+        score = load_rules().spec_ramp.score(ratio)
+  else:
+    normalized_device = normalize_text(raw_value)
+    normalized_desired = normalize_text(criterio.descricao)
+    if normalized_desired and normalized_desired in normalized_device:
+      score = 1.0
+  return score, criterion_weight(criterio)
+
+
 def score_specifications(
   criterios: List[NormalizedCriterion],
   caracteristicas_map: Dict[str, str],
@@ -90,31 +118,7 @@ def score_specifications(
   total_weight = 0.0
   per_criterion: List[CriterionScoreData] = []
   for criterio in criterios:
-    raw_value = caracteristicas_map.get(criterio.tipo)
-    score = 0.0
-    weight = PRICE_CRITERION_WEIGHT if criterio.tipo == "preco_intervalo" else 1.0
-    if criterio.tipo == "preco_intervalo":
-      min_value, max_value = parse_price_range(criterio.descricao)
-      device_price = get_device_price_from_map(caracteristicas_map)
-      score = compute_price_score(device_price, min_value, max_value)
-      weighted_sum += score * weight
-      total_weight += weight
-      per_criterion.append(CriterionScoreData(tipo=criterio.tipo, score=round(score, 4)))
-      continue
-    if criterio.tipo in NUMERIC_CRITERIA_TYPES:
-      desired = criterio.valor if criterio.valor is not None else parse_value(criterio.descricao)
-      device_value = parse_value(raw_value) if raw_value is not None else None
-      if desired is not None and device_value is not None:
-        if device_value >= desired:
-          score = 1.0
-        else:
-          ratio = device_value / max(desired, 1e-9)
-          score = max(0.0, min(1.0, (ratio - 0.7) / 0.3))
-    else:
-      normalized_device = normalize_text(raw_value)
-      normalized_desired = normalize_text(criterio.descricao)
-      if normalized_desired and normalized_desired in normalized_device:
-        score = 1.0
+    score, weight = score_criterion(criterio, caracteristicas_map)
     weighted_sum += score * weight
     total_weight += weight
     per_criterion.append(CriterionScoreData(tipo=criterio.tipo, score=round(score, 4)))
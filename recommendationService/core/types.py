@@ -1,29 +1,73 @@
 """Tipos de domínio compartilhados entre os módulos do motor de matching."""
 
+from array import array
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional
 
 PreferenceAspect = str
 PreferenceLevel = str
 
 
-@dataclass
+@dataclass(slots=True)
 class NormalizedCriterion:
   tipo: str
   descricao: str
   valor: Optional[float]
 
 
-@dataclass
+@dataclass(slots=True)
 class CriterionScoreData:
   tipo: str
   score: float
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceVector:
   device_id: str
   camera: float = 0.5
   bateria: float = 0.5
   preco: float = 0.5
   desempenho: float = 0.5
+
+
+class DeviceVectorBatch:
+  """Lote de vetores em colunas (struct-of-arrays) de floats contíguos."""
+
+  __slots__ = ("device_ids", "camera", "bateria", "preco", "desempenho")
+
+  def __init__(self) -> None:
+    self.device_ids: List[str] = []
+    self.camera = array("d")
+    self.bateria = array("d")
+    self.preco = array("d")
+    self.desempenho = array("d")
+
+  @classmethod
+  def from_vectors(cls, vectors: Iterable[DeviceVector]) -> "DeviceVectorBatch":
+    batch = cls()
+    for vector in vectors:
+      batch.append(vector)
+    return batch
+
+  def append(self, vector: DeviceVector) -> None:
+    self.device_ids.append(vector.device_id)
+    self.camera.append(vector.camera)
+    self.bateria.append(vector.bateria)
+    self.preco.append(vector.preco)
+    self.desempenho.append(vector.desempenho)
+
+  def __len__(self) -> int:
+    return len(self.device_ids)
+
+  def __getitem__(self, position: int) -> DeviceVector:
+    return DeviceVector(
+      device_id=self.device_ids[position],
+      camera=self.camera[position],
+      bateria=self.bateria[position],
+      preco=self.preco[position],
+      desempenho=self.desempenho[position],
+    )
+
+  def __iter__(self) -> Iterator[DeviceVector]:
+    for position in range(len(self.device_ids)):
+      yield self[position]
@@ -0,0 +1,115 @@
+"""Índice espacial (KD-tree) sobre os vetores de aspectos dos dispositivos."""
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .types import DeviceVector, PreferenceAspect
+
+VECTOR_ASPECTS: Tuple[PreferenceAspect, ...] = ("camera", "bateria", "preco", "desempenho")
+LEAF_SIZE = 8
+
+
+@dataclass
+class _KDNode:
+  lower: Tuple[float, ...]
+  upper: Tuple[float, ...]
+  positions: Optional[List[int]] = None
+  left: Optional["_KDNode"] = None
+  right: Optional["_KDNode"] = None
+
+
+class DeviceVectorIndex:
+  """KD-tree sobre os quatro aspectos para consultas top-K em L1 ponderada.
+
+  Os pesos chegam apenas na consulta: a poda usa a distância ponderada até a
+  caixa delimitadora de cada nó, válida para qualquer peso não negativo.
+  """
+
+  def __init__(self, vectors: Sequence[DeviceVector], leaf_size: int = LEAF_SIZE):
+    self.device_ids: List[str] = [vector.device_id for vector in vectors]
+    self.points: List[Tuple[float, ...]] = [
+      tuple(float(getattr(vector, aspect)) for aspect in VECTOR_ASPECTS) for vector in vectors
+    ]
+    self._positions: Dict[str, int] = {device_id: position for position, device_id in enumerate(self.device_ids)}
+    self._leaf_size = max(1, leaf_size)
+    self._root = self._build(list(range(len(self.points)))) if self.points else None
+
+  def __len__(self) -> int:
+    return len(self.points)
+
+  def position_of(self, device_id: str) -> Optional[int]:
+    """Posição do dispositivo no índice, ou None quando não indexado."""
+    return self._positions.get(device_id)
+
+  def _build(self, positions: List[int]) -> _KDNode:
+    """Divide recursivamente pelo eixo de maior amplitude (mediana)."""
+    columns = list(zip(*(self.points[position] for position in positions)))
+    lower = tuple(min(column) for column in columns)
+    upper = tuple(max(column) for column in columns)
+    node = _KDNode(lower=lower, upper=upper)
+    if len(positions) <= self._leaf_size:
+      node.positions = positions
+      return node
+    axis = max(range(len(VECTOR_ASPECTS)), key=lambda dim: upper[dim] - lower[dim])
+    if upper[axis] == lower[axis]:
+      node.positions = positions
+      return node
+    positions.sort(key=lambda position: self.points[position][axis])
+    middle = len(positions) // 2
+    node.left = self._build(positions[:middle])
+    node.right = self._build(positions[middle:])
+    return node
+
+  def query(
+    self,
+    target: Sequence[float],
+    weights: Sequence[float],
+    k: int,
+    exclude: Optional[int] = None,
+  ) -> List[Tuple[float, int]]:
+    """Retorna até k pares (distância L1 ponderada, posição), do mais próximo ao mais distante."""
+    if self._root is None or k <= 0:
+      return []
+    # Max-heap (distância negativa) com os k melhores até o momento.
+    best: List[Tuple[float, int]] = []
+    frontier: List[Tuple[float, int, _KDNode]] = [(0.0, 0, self._root)]
+    counter = 1
+    while frontier:
+      bound, _, node = heapq.heappop(frontier)
+      if len(best) == k and bound > -best[0][0]:
+        break
+      if node.positions is not None:
+        for position in node.positions:
+          if position == exclude:
+            continue
+          point = self.points[position]
+          distance = sum(w * abs(p - t) for w, p, t in zip(weights, point, target))
+          entry = (-distance, -position)
+          if len(best) < k:
+            heapq.heappush(best, entry)
+          elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+        continue
+      for child in (node.left, node.right):
+        if child is None:
+          continue
+        child_bound = _box_distance(child, target, weights)
+        if len(best) < k or child_bound <= -best[0][0]:
+          heapq.heappush(frontier, (child_bound, counter, child))
+          counter += 1
+    return sorted((-distance, -negative_position) for distance, negative_position in best)
+
+
+def _box_distance(node: _KDNode, target: Sequence[float], weights: Sequence[float]) -> float:
+  """Menor distância L1 ponderada entre o alvo e a caixa do nó."""
+  total = 0.0
+  for w, low, high, t in zip(weights, node.lower, node.upper, target):
+    if t < low:
+      total += w * (low - t)
+    elif t > high:
+      total += w * (t - high)
+  return total
+
+
+__all__ = ["DeviceVectorIndex", "VECTOR_ASPECTS"]
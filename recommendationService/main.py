@@ -1,9 +1,66 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Literal, Optional, Union
 
-from .matching import score_devices
-from .schemas import ScoreRequest, ScoreResponse
+from fastapi import FastAPI, HTTPException, Query
 
-app = FastAPI(title="Recommendation Service", version="1.0.0")
+from .core.free_text import extract_free_text_criteria
+from .core.ml_model import model_version
+from .matching import (
+    ScoringOutcome,
+    explain_device,
+    page_ranking_session,
+    rescore_ranking_session,
+    score_catalog_devices,
+    score_devices_with_outcome,
+)
+from .schemas import (
+    CatalogRequest,
+    CatalogResponse,
+    CoalescingStats,
+    CompactScoreResponse,
+    ExplainRequest,
+    ExplainResponse,
+    FreeTextRequest,
+    FreeTextResponse,
+    PreferenceTopKRequest,
+    PresetStats,
+    ReviewMetricBatch,
+    ReviewMetricBatchResponse,
+    ScoreRequest,
+    ScoreResponse,
+    SensitivityRequest,
+    SessionRescoreRequest,
+    SensitivityResponse,
+    ShadowReport,
+    SimilarDevicesResponse,
+)
+from .services.aspect_aggregates import close_aspect_store, get_aspect_store
+from .services.catalog import Catalog, get_catalog, load_catalog
+from .services.coalescing import SingleFlight, request_fingerprint
+from .services.compact import COMPACT_FORMAT, encode_compact_scores
+from .services.presets import PresetQuery, close_preset_cache, get_preset_cache
+from .services.scoring import RequestDeviceSource
+from .services.scoring_log import close_scoring_logger
+from .services.sensitivity import evaluate_sensitivity
+from .services.sessions import RankingSession, RankingSessionStore, get_session_store
+from .services.shadow import close_shadow_evaluator, get_shadow_evaluator
+from .services.similarity import similar_devices, top_k_by_preferences
+from .utils.deadline import Deadline
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Abre o snapshot do catálogo (quando configurado) antes da primeira requisição.
+    get_catalog()
+    yield
+    close_scoring_logger()
+    close_shadow_evaluator()
+    close_preset_cache()
+    close_aspect_store()
+
+
+app = FastAPI(title="Recommendation Service", version="1.0.0", lifespan=lifespan)
+_score_flights = SingleFlight()
 
 
 @app.get("/")
@@ -11,12 +68,266 @@ def read_root():
     return {"message": "Recommendation service is running"}
 
 
-@app.post("/ml/score-dispositivos", response_model=ScoreResponse)
+@app.post(
+    "/ml/score-dispositivos",
+    response_model=Union[ScoreResponse, CompactScoreResponse],
+    response_model_exclude_unset=True,
+)
 def score_dispositivos(payload: ScoreRequest):
+    deadline = Deadline.from_millis(payload.deadline_ms)
+    if not payload.criterios:
+        raise HTTPException(status_code=400, detail="Nenhum critério informado")
+    session_store = get_session_store() if payload.sessao else None
+
+    if payload.usar_catalogo:
+        catalog = _require_catalog()
+        source_version = catalog.version
+        preset = _preset_ranking(payload)
+        if preset is not None:
+            return _score_response(page_ranking_session(preset, payload.offset, payload.limit), payload.formato)
+
+        def compute():
+            return score_catalog_devices(
+                payload.criterios,
+                catalog,
+                payload.dispositivo_ids,
+                deadline,
+                payload.min_score,
+                payload.fields,
+                session_store,
+                payload.offset,
+                payload.limit,
+                payload.facetas,
+            )
+    else:
+        if not payload.dispositivos:
+            raise HTTPException(status_code=400, detail="Nenhum dispositivo informado")
+        source_version = ""
+
+        def compute():
+            return score_devices_with_outcome(
+                payload.criterios,
+                payload.dispositivos,
+                deadline,
+                payload.min_score,
+                payload.fields,
+                session_store,
+                payload.offset,
+                payload.limit,
+                payload.facetas,
+            )
+
+    # O formato da resposta não altera o cálculo; requisições compacta e padrão
+    # compartilham o mesmo resultado.
+    fingerprint = request_fingerprint(
+        (
+            payload.model_dump_json(exclude={"formato"}),
+            source_version,
+            model_version(),
+        )
+    )
+    outcome, _ = _score_flights.do(fingerprint, compute)
+    return _score_response(outcome, payload.formato)
+
+
+@app.get(
+    "/ml/sessoes/{token}",
+    response_model=Union[ScoreResponse, CompactScoreResponse],
+    response_model_exclude_unset=True,
+)
+def pagina_sessao(
+    token: str,
+    offset: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+    formato: Literal["padrao", "compacto"] = "padrao",
+):
+    session_store = get_session_store()
+    session = session_store.get(token)
+    if session is None:
+        raise HTTPException(status_code=404, detail=_missing_session_detail(session_store, token))
+    return _score_response(page_ranking_session(session, offset, limit), formato)
+
+
+@app.post(
+    "/ml/sessoes/{token}/criterios",
+    response_model=Union[ScoreResponse, CompactScoreResponse],
+    response_model_exclude_unset=True,
+)
+def repontuar_sessao(token: str, payload: SessionRescoreRequest):
     if not payload.criterios:
         raise HTTPException(status_code=400, detail="Nenhum critério informado")
+    session_store = get_session_store()
+    session = session_store.get(token)
+    if session is None:
+        raise HTTPException(status_code=404, detail=_missing_session_detail(session_store, token))
+    outcome = rescore_ranking_session(
+        session, payload.criterios, session_store, payload.offset, payload.limit
+    )
+    return _score_response(outcome, payload.formato)
+
+
+def _missing_session_detail(session_store: RankingSessionStore, token: str) -> str:
+    """Diferencia sessão expirada de sessão guardada em outro worker (memória por processo)."""
+    if session_store.owns(token):
+        return "Sessão não encontrada ou expirada"
+    return "Sessão criada em outro worker; refaça a busca completa"
+
+
+def _preset_ranking(payload: ScoreRequest) -> Optional[RankingSession]:
+    """Conta o acesso ao conjunto de critérios e devolve o ranking pré-calculado, se houver."""
+    presets = get_preset_cache()
+    # Sessões e facetas precisam do cálculo completo; o resto pagina o preset.
+    if presets is None or payload.sessao or payload.facetas:
+        return None
+    key = request_fingerprint(
+        (payload.model_dump_json(include={"criterios", "dispositivo_ids", "min_score", "fields"}),)
+    )
+    presets.record(
+        key,
+        PresetQuery(
+            criterios=payload.criterios,
+            dispositivo_ids=payload.dispositivo_ids,
+            min_score=payload.min_score,
+            fields=payload.fields,
+        ),
+    )
+    return presets.lookup(key)
+
+
+def _score_response(outcome: ScoringOutcome, formato: str):
+    summary = {
+        "degradacoes": outcome.degradations,
+        "podados": outcome.pruned,
+        "pontuados": outcome.scored,
+        "total": outcome.total,
+    }
+    if outcome.session is not None:
+        summary["sessao"] = outcome.session
+    if outcome.facets is not None:
+        summary["facetas"] = outcome.facets
+        summary["histograma"] = outcome.histogram
+    if formato == COMPACT_FORMAT:
+        return CompactScoreResponse(**encode_compact_scores(outcome.scores), **summary)
+    return ScoreResponse(scores=outcome.scores, **summary)
+
+
+@app.post("/ml/sensitivity", response_model=SensitivityResponse, response_model_exclude_none=True)
+def sensibilidade(payload: SensitivityRequest):
+    request = payload.requisicao
+    if not request.criterios:
+        raise HTTPException(status_code=400, detail="Nenhum critério informado")
+    if request.usar_catalogo:
+        source = _require_catalog()
+        if request.dispositivo_ids is None:
+            positions = range(len(source))
+        else:
+            resolved = (source.position_of(device_id) for device_id in request.dispositivo_ids)
+            positions = [position for position in resolved if position is not None]
+    else:
+        if not request.dispositivos:
+            raise HTTPException(status_code=400, detail="Nenhum dispositivo informado")
+        source = RequestDeviceSource(request.dispositivos)
+        positions = range(len(request.dispositivos))
+    try:
+        return evaluate_sensitivity(
+            request.criterios,
+            source,
+            positions,
+            payload.perturbacoes,
+            payload.k,
+            request.min_score,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.post("/ml/explain", response_model=ExplainResponse)
+def explicar_dispositivo(payload: ExplainRequest):
+    if not payload.criterios:
+        raise HTTPException(status_code=400, detail="Nenhum critério informado")
+    if payload.dispositivo is not None:
+        return explain_device(payload.criterios, RequestDeviceSource([payload.dispositivo]), 0)
+    if payload.dispositivo_id is None:
+        raise HTTPException(status_code=400, detail="Nenhum dispositivo informado")
+    catalog = _require_catalog()
+    position = catalog.position_of(payload.dispositivo_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Dispositivo não encontrado no catálogo")
+    return explain_device(payload.criterios, catalog, position)
+
+
+@app.post("/ml/criterios/texto-livre", response_model=FreeTextResponse)
+def extrair_criterios_texto_livre(payload: FreeTextRequest):
+    extraction = extract_free_text_criteria(payload.texto)
+    return FreeTextResponse(
+        criterios=[
+            {"tipo": criterio.tipo, "descricao": criterio.descricao}
+            for criterio in extraction.normalized_criteria()
+        ],
+        confianca=extraction.confidence,
+        confiante=extraction.confident,
+    )
+
+
+@app.post("/ml/aspectos/avaliacoes", response_model=ReviewMetricBatchResponse)
+def agregar_avaliacoes(payload: ReviewMetricBatch):
+    if not payload.avaliacoes:
+        raise HTTPException(status_code=400, detail="Nenhuma avaliação informada")
+    aggregates, ignored = get_aspect_store().ingest(payload.avaliacoes)
+    return ReviewMetricBatchResponse(dispositivos=list(aggregates.values()), ignorados=ignored)
+
+
+@app.get("/ml/coalescencia", response_model=CoalescingStats)
+def estatisticas_coalescencia():
+    return _score_flights.stats()
+
+
+@app.get("/ml/presets", response_model=PresetStats)
+def estatisticas_presets():
+    presets = get_preset_cache()
+    if presets is None:
+        raise HTTPException(status_code=404, detail="Presets pré-calculados desativados")
+    return presets.stats()
+
+
+@app.get("/ml/shadow", response_model=ShadowReport)
+def relatorio_shadow():
+    evaluator = get_shadow_evaluator()
+    if evaluator is None:
+        raise HTTPException(status_code=404, detail="Avaliação em sombra desativada")
+    return evaluator.report()
+
+
+def _require_catalog() -> Catalog:
+    catalog = get_catalog()
+    if catalog is None:
+        raise HTTPException(status_code=404, detail="Catálogo não carregado")
+    return catalog
+
+
+@app.put("/ml/catalogo", response_model=CatalogResponse)
+def carregar_catalogo(payload: CatalogRequest):
     if not payload.dispositivos:
         raise HTTPException(status_code=400, detail="Nenhum dispositivo informado")
+    catalog = load_catalog(payload.dispositivos)
+    return CatalogResponse(versao=catalog.version, total=len(catalog))
+
+
+@app.post("/ml/catalogo/top-k", response_model=SimilarDevicesResponse)
+def top_k_preferencias(payload: PreferenceTopKRequest):
+    if not payload.criterios:
+        raise HTTPException(status_code=400, detail="Nenhum critério informado")
+    catalog = _require_catalog()
+    return SimilarDevicesResponse(
+        dispositivos=top_k_by_preferences(catalog, payload.criterios, payload.k)
+    )
+
 
-    scores = score_devices(payload.criterios, payload.dispositivos)
-    return ScoreResponse(scores=scores)
+@app.get("/ml/catalogo/{device_id}/similares", response_model=SimilarDevicesResponse)
+def dispositivos_similares(device_id: str, k: int = Query(default=10, ge=1, le=500)):
+    catalog = _require_catalog()
+    try:
+        vizinhos = similar_devices(catalog, device_id, k)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Dispositivo não encontrado no catálogo")
+    return SimilarDevicesResponse(dispositivos=vizinhos)
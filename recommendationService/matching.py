@@ -1,5 +1,21 @@
 """Interface pública do motor de matching, reexportando score_devices."""
 
-from .services.scoring import score_devices
+from .services.scoring import (
+  ScoringOutcome,
+  explain_device,
+  page_ranking_session,
+  rescore_ranking_session,
+  score_catalog_devices,
+  score_devices,
+  score_devices_with_outcome,
+)
 
-__all__ = ["score_devices"]
+__all__ = [
+  "ScoringOutcome",
+  "explain_device",
+  "page_ranking_session",
+  "rescore_ranking_session",
+  "score_catalog_devices",
+  "score_devices",
+  "score_devices_with_outcome",
+]
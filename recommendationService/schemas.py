@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -27,9 +27,38 @@ class DeviceInput(BaseModel):
   aspect_scores: Optional[AspectScores] = None
 
 
+ScoreField = Literal[
+  "finalScore",
+  "matchScore",
+  "perfilMatchPercent",
+  "criteriosMatchPercent",
+  "specFit",
+  "opinionSim",
+  "justificativas",
+  "matchExplanation",
+]
+
+
 class ScoreRequest(BaseModel):
   criterios: List[Criterion] = Field(default_factory=list)
   dispositivos: List[DeviceInput] = Field(default_factory=list)
+  deadline_ms: Optional[float] = Field(default=None, gt=0)
+  min_score: Optional[float] = Field(default=None, ge=0, le=1)
+  usar_catalogo: bool = False
+  dispositivo_ids: Optional[List[str]] = None
+  fields: Optional[List[ScoreField]] = None
+  formato: Literal["padrao", "compacto"] = "padrao"
+  sessao: bool = False
+  offset: int = Field(default=0, ge=0)
+  limit: Optional[int] = Field(default=None, ge=1)
+  facetas: bool = False
+
+
+class SessionRescoreRequest(BaseModel):
+  criterios: List[Criterion] = Field(default_factory=list)
+  formato: Literal["padrao", "compacto"] = "padrao"
+  offset: int = Field(default=0, ge=0)
+  limit: Optional[int] = Field(default=None, ge=1)
 
 
 class CriterionScore(BaseModel):
@@ -46,15 +75,215 @@ class MatchExplanation(BaseModel):
 
 class DeviceScoreResponse(BaseModel):
   id: str
-  finalScore: float
-  matchScore: int
-  perfilMatchPercent: int
+  finalScore: Optional[float] = None
+  matchScore: Optional[int] = None
+  perfilMatchPercent: Optional[int] = None
   criteriosMatchPercent: Optional[int] = None
-  specFit: float
+  specFit: Optional[float] = None
+  opinionSim: Optional[float] = None
+  justificativas: Optional[List[str]] = None
+  matchExplanation: Optional[MatchExplanation] = None
+
+
+class ScoreHistogram(BaseModel):
+  limites: List[float]
+  contagens: List[int]
+
+
+class ScoreResponse(BaseModel):
+  scores: List[DeviceScoreResponse]
+  degradacoes: List[str] = Field(default_factory=list)
+  podados: int = 0
+  pontuados: int = 0
+  total: int = 0
+  sessao: Optional[str] = None
+  facetas: Optional[Dict[str, Dict[str, int]]] = None
+  histograma: Optional[ScoreHistogram] = None
+
+
+class CompactExplanation(BaseModel):
+  weights: Dict[str, float]
+  criterios: List[str]
+
+
+class CompactScoreResponse(BaseModel):
+  formato: Literal["compacto"] = "compacto"
+  justificativas: List[str]
+  explicacoes: List[CompactExplanation]
+  colunas: List[str]
+  linhas: List[List[Any]]
+  degradacoes: List[str] = Field(default_factory=list)
+  podados: int = 0
+  pontuados: int = 0
+  total: int = 0
+  sessao: Optional[str] = None
+  facetas: Optional[Dict[str, Dict[str, int]]] = None
+  histograma: Optional[ScoreHistogram] = None
+
+
+class CatalogRequest(BaseModel):
+  dispositivos: List[DeviceInput] = Field(default_factory=list)
+
+
+class CatalogResponse(BaseModel):
+  versao: str
+  total: int
+
+
+class PreferenceTopKRequest(BaseModel):
+  criterios: List[Criterion] = Field(default_factory=list)
+  k: int = Field(default=10, ge=1, le=500)
+
+
+class SimilarDevice(BaseModel):
+  id: str
   opinionSim: float
+
+
+class SimilarDevicesResponse(BaseModel):
+  dispositivos: List[SimilarDevice]
+
+
+class ExplainRequest(BaseModel):
+  criterios: List[Criterion] = Field(default_factory=list)
+  dispositivo: Optional[DeviceInput] = None
+  dispositivo_id: Optional[str] = None
+
+
+class FreeTextRequest(BaseModel):
+  texto: str
+
+
+class FreeTextResponse(BaseModel):
+  criterios: List[Criterion]
+  confianca: float
+  confiante: bool
+
+
+class ExplainResponse(BaseModel):
+  id: str
   justificativas: List[str]
   matchExplanation: MatchExplanation
 
 
-class ScoreResponse(BaseModel):
-  scores: List[DeviceScoreResponse]
+class LatencyPercentiles(BaseModel):
+  p50: Optional[float] = None
+  p95: Optional[float] = None
+
+
+class ShadowReport(BaseModel):
+  candidato: str
+  k: int
+  enfileiradas: int
+  avaliadas: int
+  descartadas: int
+  falhas: int
+  spearmanMedio: Optional[float] = None
+  topKOverlapMedio: Optional[float] = None
+  diferencaMediaAbsoluta: Optional[float] = None
+  latenciaCandidatoMs: LatencyPercentiles
+  latenciaAtualMs: LatencyPercentiles
+
+
+class CoalescingStats(BaseModel):
+  executadas: int
+  coalescidas: int
+  emAndamento: int
+
+
+class Perturbation(BaseModel):
+  acao: Literal["ampliar_preco", "deslocar_preco", "remover_criterio", "reduzir_alvo"]
+  tipo: Optional[str] = None
+  valor: float = 0.0
+
+
+class SensitivityRequest(BaseModel):
+  requisicao: ScoreRequest
+  perturbacoes: List[Perturbation] = Field(default_factory=list, max_length=32)
+  k: int = Field(default=10, ge=1, le=500)
+
+
+class SensitivityDevice(BaseModel):
+  id: str
+  finalScore: float
+  delta: float
+  posicaoBase: int
+
+
+class SensitivityBase(BaseModel):
+  criterios: List[Criterion]
+  topK: List[SensitivityDevice]
+
+
+class SensitivityVariant(BaseModel):
+  perturbacao: Perturbation
+  criterios: List[Criterion]
+  topK: List[SensitivityDevice]
+  novosNoTopK: List[str]
+  melhoram: int
+  pioram: int
+  deltaMedio: float
+  novosAcimaDoMinimo: Optional[int] = None
+
+
+class SensitivityResponse(BaseModel):
+  base: SensitivityBase
+  variantes: List[SensitivityVariant]
+  dispositivos: int
+  colunasCalculadas: int
+
+
+class PresetRefreshCost(BaseModel):
+  total: float
+  ultimo: float
+  medio: Optional[float] = None
+
+
+class PresetSummary(BaseModel):
+  chave: str
+  frequencia: float
+  idadeSegundos: float
+  dispositivos: int
+
+
+class PresetStats(BaseModel):
+  worker: int
+  ativos: int
+  consultas: int
+  acertos: int
+  taxaAcerto: Optional[float] = None
+  atualizacoes: int
+  falhas: int
+  custoAtualizacaoMs: PresetRefreshCost
+  presets: List[PresetSummary]
+
+
+class ReviewMetricScore(BaseModel):
+  dispositivo_id: str
+  metrica: str
+  score: float
+  # Segundos desde epoch (como `time.time()`), não milissegundos de `Date.now()`.
+  timestamp: Optional[float] = Field(default=None, ge=0, le=1e11)
+
+
+class ReviewMetricBatch(BaseModel):
+  avaliacoes: List[ReviewMetricScore] = Field(default_factory=list, max_length=50_000)
+
+
+class AspectCounts(BaseModel):
+  camera: int = 0
+  bateria: int = 0
+  preco: int = 0
+  desempenho: int = 0
+
+
+class DeviceAspectAggregate(BaseModel):
+  id: str
+  aspect_scores: AspectScores
+  medias: AspectScores
+  contagens: AspectCounts
+
+
+class ReviewMetricBatchResponse(BaseModel):
+  dispositivos: List[DeviceAspectAggregate]
+  ignorados: int
@@ -0,0 +1,136 @@
+"""Modo de produção pré-fork: carrega e aquece o modelo uma vez antes dos workers.
+
+O processo pai importa a aplicação, carrega o modelo (e o catálogo, quando
+configurado), consolida os snapshots de agregados de aspectos, congela os
+objetos no GC e só então faz `fork` dos workers. As páginas do modelo ficam
+compartilhadas em copy-on-write entre os filhos, que atendem o mesmo socket já
+aberto pelo pai.
+
+Exemplo:
+  python -m recommendationService.serve --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from .core.ml_model import MATCHING_MODEL_ENV, warm_match_model
+from .services.aspect_aggregates import consolidate_aspect_store
+from .services.catalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+def preload(model_path: Optional[str] = None) -> None:
+  """Carrega/aquece modelo e catálogo e congela o heap para reduzir cópias após o fork."""
+  if model_path:
+    # O caminho de requisição resolve o modelo por MATCHING_MODEL_PATH: sem isso os
+    # workers carregariam o artefato padrão após o fork.
+    os.environ[MATCHING_MODEL_ENV] = model_path
+  warm_match_model(model_path)
+  get_catalog()
+  # Funde os fragmentos de agregados da execução anterior antes que os workers gravem os seus.
+  consolidate_aspect_store()
+  gc.collect()
+  # Objetos congelados não são visitados pelo GC, evitando que a coleta nos
+  # filhos toque (e copie) as páginas herdadas do pai.
+  gc.freeze()
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+  """Abre o socket de escuta compartilhado por todos os workers."""
+  family = socket.AF_INET6 if ":" in host else socket.AF_INET
+  sock = socket.socket(family, socket.SOCK_STREAM)
+  sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+  sock.bind((host, port))
+  sock.listen(backlog)
+  sock.set_inheritable(True)
+  return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+  for signum in (signal.SIGTERM, signal.SIGINT):
+    signal.signal(signum, signal.SIG_DFL)
+  config = uvicorn.Config(app, log_level=log_level)
+  uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(app, sock: socket.socket, log_level: str) -> int:
+  pid = os.fork()
+  if pid == 0:
+    exit_code = 0
+    try:
+      _run_worker(app, sock, log_level)
+    except BaseException:  # pragma: no cover - processo filho
+      logger.exception("Worker encerrado com erro")
+      exit_code = 1
+    finally:
+      os._exit(exit_code)
+  return pid
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info", model_path: Optional[str] = None) -> None:
+  """Executa o supervisor pré-fork até receber SIGTERM/SIGINT."""
+  from .main import app
+
+  preload(model_path)
+  sock = bind_socket(host, port)
+  children: Dict[int, int] = {}
+  stopping = False
+
+  def stop(signum, _frame):
+    nonlocal stopping
+    stopping = True
+    for pid in list(children):
+      try:
+        os.kill(pid, signal.SIGTERM)
+      except ProcessLookupError:
+        pass
+
+  signal.signal(signal.SIGTERM, stop)
+  signal.signal(signal.SIGINT, stop)
+
+  for slot in range(workers):
+    children[_spawn(app, sock, log_level)] = slot
+  logger.info("Servindo em %s:%s com %s workers (pid %s)", host, port, workers, os.getpid())
+
+  while children:
+    try:
+      pid, status = os.wait()
+    except ChildProcessError:
+      break
+    except InterruptedError:  # pragma: no cover - depende do sinal
+      continue
+    slot = children.pop(pid, None)
+    if stopping or slot is None:
+      continue
+    logger.warning("Worker %s saiu (status %s); iniciando outro.", pid, status)
+    time.sleep(RESPAWN_BACKOFF_SECONDS)
+    children[_spawn(app, sock, log_level)] = slot
+  sock.close()
+
+
+def main(argv=None) -> None:
+  parser = argparse.ArgumentParser(description="Servidor pré-fork do recommendation service.")
+  parser.add_argument("--host", default="0.0.0.0")
+  parser.add_argument("--port", type=int, default=8000)
+  parser.add_argument("--workers", type=int, default=max(1, os.cpu_count() or 1))
+  parser.add_argument("--log-level", default="info")
+  parser.add_argument("--model-path", default=None)
+  args = parser.parse_args(argv)
+  logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr)
+  serve(args.host, args.port, max(1, args.workers), args.log_level, args.model_path)
+
+
+if __name__ == "__main__":
+  main()
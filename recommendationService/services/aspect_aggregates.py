@@ -0,0 +1,359 @@
+"""Agregação incremental das notas por avaliação em `AspectScores`.
+
+O backend envia lotes de notas por avaliação (uma métrica de um comentário de
+um dispositivo); cada nota atualiza em O(1) os agregados do aspecto
+correspondente: contagem, média simples e média ponderada pela recência
+(decaimento exponencial com meia-vida configurável). Nada de reler todas as
+avaliações de um dispositivo: o custo de um lote é proporcional ao lote.
+
+Os agregados ficam em colunas `array("d")` (uma linha por dispositivo, uma
+célula por aspecto). Como contagem, média e soma ponderada se combinam sem
+perda, o estado de cada processo é a base carregada do disco mais o delta dos
+lotes que ele mesmo recebeu. Com `ASPECT_STORE_PATH`, cada processo grava só o
+seu delta num fragmento próprio (`<arquivo>.<pid>-<id>`); na inicialização a
+base junta o snapshot consolidado e todos os fragmentos, e `consolidate_snapshots`
+(chamado pelo supervisor pré-fork antes de criar os workers) os funde de volta
+num único arquivo. Com vários workers, a resposta de um lote reflete a base e
+os lotes daquele worker, não os recebidos pelos outros desde a inicialização.
+"""
+
+import gzip
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..schemas import ReviewMetricScore
+
+logger = logging.getLogger(__name__)
+
+ASPECT_STORE_PATH_ENV = "ASPECT_STORE_PATH"
+ASPECT_SNAPSHOT_SECONDS_ENV = "ASPECT_SNAPSHOT_SECONDS"
+ASPECT_HALF_LIFE_DAYS_ENV = "ASPECT_HALF_LIFE_DAYS"
+DEFAULT_SNAPSHOT_SECONDS = 60.0
+DEFAULT_HALF_LIFE_DAYS = 90.0
+SNAPSHOT_FORMAT_VERSION = 1
+
+ASPECTS = ("camera", "bateria", "preco", "desempenho")
+
+# Chaves de métrica do backend (`commentProcessing.ts`) e nomes de aspecto aceitos.
+METRIC_ASPECTS: Dict[str, str] = {
+  "qualidade-camera": "camera",
+  "duracao-bateria": "bateria",
+  "custo-beneficio": "preco",
+  "desempenho": "desempenho",
+  **{aspect: aspect for aspect in ASPECTS},
+}
+
+_FIELDS = ("count", "mean", "weight", "weighted_sum", "reference")
+
+Cell = Tuple[float, float, float, float, float]
+
+
+def normalize_review_score(value: float) -> Optional[float]:
+  """Mesma regra do backend: notas acima de 1 estão na escala 0-5."""
+  if value is None or not math.isfinite(value):
+    return None
+  numeric = value / 5 if value > 1 else value
+  return max(0.0, min(1.0, numeric))
+
+
+def combine_cells(first: Cell, second: Cell, half_life_seconds: float) -> Cell:
+  """Junta dois agregados (contagem, média, peso, soma ponderada, referência) da mesma célula."""
+  if first[0] == 0:
+    return second
+  if second[0] == 0:
+    return first
+  count = first[0] + second[0]
+  mean = (first[0] * first[1] + second[0] * second[1]) / count
+  reference = max(first[4], second[4])
+  weight = 0.0
+  weighted_sum = 0.0
+  for cell in (first, second):
+    decay = 0.5 ** ((reference - cell[4]) / half_life_seconds)
+    weight += cell[2] * decay
+    weighted_sum += cell[3] * decay
+  return (count, mean, weight, weighted_sum, reference)
+
+
+class AspectAggregateStore:
+  """Contagem, média e média por recência de cada (dispositivo, aspecto)."""
+
+  def __init__(
+    self,
+    half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+    snapshot_path: Optional[Union[str, Path]] = None,
+    snapshot_seconds: float = DEFAULT_SNAPSHOT_SECONDS,
+    clock: Callable[[], float] = time.time,
+  ):
+    self.half_life_seconds = half_life_days * 86400
+    self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+    self.shard_path = (
+      self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}-{uuid.uuid4().hex[:8]}")
+      if self.snapshot_path is not None
+      else None
+    )
+    self.snapshot_seconds = snapshot_seconds
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._snapshot_lock = threading.Lock()
+    self._rows: Dict[str, int] = {}
+    self._ids: List[str] = []
+    # `_base` vem do disco e nunca é regravado por este processo; `_columns` é o delta local.
+    self._base: Dict[str, array] = {name: array("d") for name in _FIELDS}
+    self._columns: Dict[str, array] = {name: array("d") for name in _FIELDS}
+    self._dirty = False
+    self._snapshot_at = clock()
+    self.loaded_files: List[Path] = []
+    if self.snapshot_path is not None:
+      for path in snapshot_files(self.snapshot_path):
+        if self._load(path):
+          self.loaded_files.append(path)
+
+  def __len__(self) -> int:
+    return len(self._ids)
+
+  @property
+  def dirty(self) -> bool:
+    """Há agregados ainda não gravados no snapshot."""
+    return self._dirty
+
+  def ingest(self, reviews: Iterable[ReviewMetricScore]) -> Tuple[Dict[str, Dict[str, object]], int]:
+    """Aplica um lote; devolve os agregados dos dispositivos tocados e quantas notas foram ignoradas."""
+    now = self._clock()
+    touched: Dict[str, int] = {}
+    ignored = 0
+    with self._lock:
+      for review in reviews:
+        aspect = METRIC_ASPECTS.get(review.metrica.strip().lower())
+        score = normalize_review_score(review.score)
+        if aspect is None or score is None:
+          ignored += 1
+          continue
+        row = self._row(review.dispositivo_id)
+        self._update(row * len(ASPECTS) + ASPECTS.index(aspect), score, review.timestamp or now)
+        touched[review.dispositivo_id] = row
+      if touched:
+        self._dirty = True
+      aggregates = {device_id: self._aggregate(row) for device_id, row in touched.items()}
+    self.maybe_snapshot()
+    return aggregates, ignored
+
+  def get(self, device_id: str) -> Optional[Dict[str, object]]:
+    with self._lock:
+      row = self._rows.get(device_id)
+      return self._aggregate(row) if row is not None else None
+
+  def _row(self, device_id: str) -> int:
+    row = self._rows.get(device_id)
+    if row is None:
+      row = len(self._ids)
+      self._rows[device_id] = row
+      self._ids.append(device_id)
+      for columns in (self._base, self._columns):
+        for column in columns.values():
+          column.extend([0.0] * len(ASPECTS))
+    return row
+
+  def _update(self, cell: int, score: float, timestamp: float) -> None:
+    count = self._columns["count"]
+    mean = self._columns["mean"]
+    weight = self._columns["weight"]
+    weighted_sum = self._columns["weighted_sum"]
+    reference = self._columns["reference"]
+    count[cell] += 1
+    mean[cell] += (score - mean[cell]) / count[cell]
+    if count[cell] == 1:
+      weight[cell] = 1.0
+      weighted_sum[cell] = score
+      reference[cell] = timestamp
+    elif timestamp >= reference[cell]:
+      # Envelhece o acumulado até a nota mais recente, que entra com peso 1.
+      decay = 0.5 ** ((timestamp - reference[cell]) / self.half_life_seconds)
+      weight[cell] = weight[cell] * decay + 1.0
+      weighted_sum[cell] = weighted_sum[cell] * decay + score
+      reference[cell] = timestamp
+    else:
+      # Nota fora de ordem: entra já com o peso da sua idade.
+      decayed = 0.5 ** ((reference[cell] - timestamp) / self.half_life_seconds)
+      weight[cell] += decayed
+      weighted_sum[cell] += decayed * score
+
+  def _cell(self, cell: int) -> Cell:
+    base = tuple(self._base[name][cell] for name in _FIELDS)
+    delta = tuple(self._columns[name][cell] for name in _FIELDS)
+    return combine_cells(base, delta, self.half_life_seconds)
+
+  def _aggregate(self, row: int) -> Dict[str, object]:
+    aspect_scores: Dict[str, Optional[float]] = {}
+    means: Dict[str, Optional[float]] = {}
+    counts: Dict[str, int] = {}
+    for offset, aspect in enumerate(ASPECTS):
+      count, mean, weight, weighted_sum, _ = self._cell(row * len(ASPECTS) + offset)
+      counts[aspect] = int(count)
+      if count == 0:
+        aspect_scores[aspect] = None
+        means[aspect] = None
+        continue
+      aspect_scores[aspect] = round(weighted_sum / weight, 4)
+      means[aspect] = round(mean, 4)
+    return {"id": self._ids[row], "aspect_scores": aspect_scores, "medias": means, "contagens": counts}
+
+  def maybe_snapshot(self) -> bool:
+    """Grava o fragmento quando há mudanças e o intervalo já passou."""
+    if self.snapshot_path is None or not self._dirty:
+      return False
+    if self._clock() - self._snapshot_at < self.snapshot_seconds:
+      return False
+    self.snapshot()
+    return True
+
+  def snapshot(self) -> None:
+    """Grava o delta deste processo no seu fragmento (arquivo temporário + rename atômico)."""
+    if self.shard_path is None:
+      return
+    with self._snapshot_lock:
+      with self._lock:
+        payload = self._payload(self._columns)
+        self._dirty = False
+        self._snapshot_at = self._clock()
+      _write_snapshot(self.shard_path, payload)
+
+  def consolidated_payload(self) -> Dict[str, object]:
+    """Base e delta combinados, no formato do snapshot."""
+    with self._lock:
+      merged = {name: array("d") for name in _FIELDS}
+      for cell in range(len(self._ids) * len(ASPECTS)):
+        for name, value in zip(_FIELDS, self._cell(cell)):
+          merged[name].append(value)
+      return self._payload(merged)
+
+  def _payload(self, columns: Dict[str, array]) -> Dict[str, object]:
+    return {
+      "version": SNAPSHOT_FORMAT_VERSION,
+      "aspects": list(ASPECTS),
+      "ids": list(self._ids),
+      "columns": {name: column.tolist() for name, column in columns.items()},
+    }
+
+  def _load(self, path: Path) -> bool:
+    """Soma um snapshot (consolidado ou fragmento) à base; False se o arquivo for inválido."""
+    try:
+      with gzip.open(path, "rt", encoding="utf-8") as handle:
+        payload = json.load(handle)
+      if payload.get("version") != SNAPSHOT_FORMAT_VERSION or payload.get("aspects") != list(ASPECTS):
+        raise ValueError("formato de snapshot incompatível")
+      ids = payload["ids"]
+      columns = [payload["columns"][name] for name in _FIELDS]
+      if any(len(column) != len(ids) * len(ASPECTS) for column in columns):
+        raise ValueError("colunas com tamanho inconsistente")
+    except (OSError, ValueError, KeyError) as exc:
+      logger.error("Snapshot de aspectos ignorado (%s): %s", path, exc)
+      return False
+    for index, device_id in enumerate(ids):
+      row = self._row(device_id)
+      for offset in range(len(ASPECTS)):
+        source = index * len(ASPECTS) + offset
+        cell = row * len(ASPECTS) + offset
+        current = tuple(self._base[name][cell] for name in _FIELDS)
+        merged = combine_cells(current, tuple(column[source] for column in columns), self.half_life_seconds)
+        for name, value in zip(_FIELDS, merged):
+          self._base[name][cell] = value
+    return True
+
+
+def snapshot_files(path: Path) -> List[Path]:
+  """Snapshot consolidado (se existir) e os fragmentos gravados pelos processos."""
+  if not path.parent.exists():
+    return []
+  shards = sorted(candidate for candidate in path.parent.glob(f"{path.name}.*") if not candidate.name.endswith(".part"))
+  return ([path] if path.exists() else []) + shards
+
+
+def _write_snapshot(path: Path, payload: Dict[str, object]) -> None:
+  path.parent.mkdir(parents=True, exist_ok=True)
+  # Nome temporário único: processos diferentes nunca escrevem no mesmo arquivo.
+  descriptor, temporary = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".part")
+  try:
+    with os.fdopen(descriptor, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as handle:
+      json.dump(payload, handle, separators=(",", ":"))
+    os.replace(temporary, path)
+  except BaseException:
+    os.unlink(temporary)
+    raise
+
+
+def consolidate_snapshots(path: Union[str, Path], half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> int:
+  """Funde o snapshot consolidado e os fragmentos num único arquivo; devolve quantos dispositivos ficaram.
+
+  Deve rodar sem workers gravando (ex.: no supervisor pré-fork, antes do fork).
+  """
+  path = Path(path)
+  store = AspectAggregateStore(half_life_days=half_life_days, snapshot_path=path)
+  if not store.loaded_files:
+    return 0
+  _write_snapshot(path, store.consolidated_payload())
+  for loaded in store.loaded_files:
+    if loaded != path:
+      loaded.unlink(missing_ok=True)
+  return len(store)
+
+
+_STORE: Optional[AspectAggregateStore] = None
+_STORE_PID: Optional[int] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_aspect_store() -> AspectAggregateStore:
+  """Armazenamento de agregados do processo atual (snapshot opcional via `ASPECT_STORE_PATH`)."""
+  global _STORE, _STORE_PID
+  pid = os.getpid()
+  if _STORE is not None and _STORE_PID == pid:
+    return _STORE
+  with _STORE_LOCK:
+    if _STORE is None or _STORE_PID != pid:
+      _STORE = AspectAggregateStore(
+        half_life_days=float(os.getenv(ASPECT_HALF_LIFE_DAYS_ENV) or DEFAULT_HALF_LIFE_DAYS),
+        snapshot_path=os.getenv(ASPECT_STORE_PATH_ENV) or None,
+        snapshot_seconds=float(os.getenv(ASPECT_SNAPSHOT_SECONDS_ENV) or DEFAULT_SNAPSHOT_SECONDS),
+      )
+      _STORE_PID = pid
+  return _STORE
+
+
+def consolidate_aspect_store() -> int:
+  """`consolidate_snapshots` sobre `ASPECT_STORE_PATH` (nada a fazer sem a variável)."""
+  path = os.getenv(ASPECT_STORE_PATH_ENV)
+  if not path:
+    return 0
+  return consolidate_snapshots(path, float(os.getenv(ASPECT_HALF_LIFE_DAYS_ENV) or DEFAULT_HALF_LIFE_DAYS))
+
+
+def close_aspect_store() -> None:
+  """Grava o fragmento pendente ao encerrar o worker."""
+  global _STORE, _STORE_PID
+  if _STORE is not None and _STORE_PID == os.getpid() and _STORE.dirty:
+    _STORE.snapshot()
+  _STORE = None
+  _STORE_PID = None
+
+
+__all__ = [
+  "ASPECT_STORE_PATH_ENV",
+  "METRIC_ASPECTS",
+  "AspectAggregateStore",
+  "close_aspect_store",
+  "combine_cells",
+  "consolidate_aspect_store",
+  "consolidate_snapshots",
+  "get_aspect_store",
+  "normalize_review_score",
+  "snapshot_files",
+]
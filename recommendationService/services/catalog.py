@@ -0,0 +1,170 @@
+"""Catálogo de dispositivos pré-processados mantido em memória pelo serviço."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+
+from ..core.device_features import build_caracteristica_map, build_device_vector
+from ..core.spec_index import SpecRangeIndex
+from ..core.types import DeviceVector, DeviceVectorBatch
+from ..core.vector_index import DeviceVectorIndex
+from ..schemas import DeviceInput
+from .catalog_snapshot import CatalogSnapshot, SnapshotFormatError, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+  """Dispositivo do catálogo com o mapa de características já calculado."""
+
+  device: DeviceInput
+  caracteristicas_map: Dict[str, str]
+
+
+class DeviceCatalog:
+  """Conjunto imutável de dispositivos pré-processados e seus índices."""
+
+  def __init__(self, dispositivos: List[DeviceInput]):
+    self.entries: List[CatalogEntry] = []
+    self.vectors = DeviceVectorBatch()
+    for dispositivo in dispositivos:
+      caracteristicas_map = build_caracteristica_map(dispositivo)
+      self.entries.append(CatalogEntry(device=dispositivo, caracteristicas_map=caracteristicas_map))
+      self.vectors.append(build_device_vector(dispositivo, caracteristicas_map))
+    self._by_id: Dict[str, int] = {entry.device.id: position for position, entry in enumerate(self.entries)}
+    self.version = compute_catalog_version(dispositivos)
+    self.vector_index = DeviceVectorIndex(self.vectors)
+    self._spec_index: Optional[SpecRangeIndex] = None
+
+  def __len__(self) -> int:
+    return len(self.entries)
+
+  def device_id(self, position: int) -> str:
+    return self.entries[position].device.id
+
+  def caracteristicas_map(self, position: int) -> Dict[str, str]:
+    return self.entries[position].caracteristicas_map
+
+  def vector(self, position: int) -> DeviceVector:
+    return self.vectors[position]
+
+  def spec_index(self, tipos: Optional[Set[str]] = None) -> SpecRangeIndex:
+    """Índice de specs de todo o catálogo, construído uma única vez."""
+    if self._spec_index is None:
+      self._spec_index = SpecRangeIndex.from_maps([entry.caracteristicas_map for entry in self.entries])
+    return self._spec_index
+
+  def position_of(self, device_id: str) -> Optional[int]:
+    """Posição do dispositivo no catálogo (mesma ordem de `entries` e `vectors`)."""
+    return self._by_id.get(device_id)
+
+  def get(self, device_id: str) -> Optional[CatalogEntry]:
+    """Busca um dispositivo do catálogo pelo id."""
+    position = self._by_id.get(device_id)
+    return self.entries[position] if position is not None else None
+
+
+def compute_catalog_version(dispositivos: List[DeviceInput]) -> str:
+  """Gera uma versão determinística a partir do conteúdo dos dispositivos."""
+  digest = hashlib.sha1()
+  for dispositivo in dispositivos:
+    digest.update(json.dumps(dispositivo.model_dump(), sort_keys=True).encode("utf-8"))
+  return digest.hexdigest()[:16]
+
+
+CATALOG_SNAPSHOT_ENV = "CATALOG_SNAPSHOT_PATH"
+SNAPSHOT_REFRESH_INTERVAL = 1.0
+
+Catalog = Union[DeviceCatalog, CatalogSnapshot]
+
+_CATALOG: Optional[Catalog] = None
+_CATALOG_LOCK = threading.Lock()
+_LAST_SNAPSHOT_CHECK = 0.0
+
+
+def _snapshot_path() -> Optional[Path]:
+  """Caminho do snapshot compartilhado, quando configurado via ambiente."""
+  env_path = os.getenv(CATALOG_SNAPSHOT_ENV)
+  return Path(env_path).expanduser() if env_path else None
+
+
+def _refresh_snapshot(path: Path, force: bool = False) -> Optional[Catalog]:
+  """Reabre o snapshot quando o arquivo foi trocado (novo inode) desde a última abertura."""
+  global _CATALOG, _LAST_SNAPSHOT_CHECK
+  now = time.monotonic()
+  if not force and now - _LAST_SNAPSHOT_CHECK < SNAPSHOT_REFRESH_INTERVAL:
+    return _CATALOG
+  with _CATALOG_LOCK:
+    _LAST_SNAPSHOT_CHECK = now
+    try:
+      stat = path.stat()
+    except FileNotFoundError:
+      return _CATALOG
+    identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    current = _CATALOG
+    if isinstance(current, CatalogSnapshot) and current.identity == identity:
+      return current
+    try:
+      _CATALOG = CatalogSnapshot(path)
+    except (OSError, SnapshotFormatError) as exc:
+      logger.error("Falha ao abrir snapshot do catálogo em %s: %s", path, exc)
+    return _CATALOG
+
+
+def get_catalog() -> Optional[Catalog]:
+  """Retorna o catálogo carregado (ou None quando ainda não houve carga).
+
+  Com `CATALOG_SNAPSHOT_PATH` definido, o catálogo é o snapshot mapeado em
+  memória, recarregado automaticamente quando o arquivo é substituído.
+  """
+  path = _snapshot_path()
+  if path is not None:
+    return _refresh_snapshot(path)
+  return _CATALOG
+
+
+def load_catalog(dispositivos: List[DeviceInput]) -> Catalog:
+  """Pré-processa os dispositivos e substitui o catálogo atual de forma atômica.
+
+  Com snapshot configurado, grava um novo arquivo (visível para todos os
+  workers); caso contrário, mantém o catálogo apenas neste processo.
+  """
+  path = _snapshot_path()
+  if path is not None:
+    write_snapshot(dispositivos, path, compute_catalog_version(dispositivos))
+    catalog = _refresh_snapshot(path, force=True)
+    if catalog is None:
+      raise SnapshotFormatError(f"Snapshot não pôde ser aberto: {path}")
+    return catalog
+  catalog = DeviceCatalog(dispositivos)
+  global _CATALOG
+  with _CATALOG_LOCK:
+    _CATALOG = catalog
+  return catalog
+
+
+def reset_catalog() -> None:
+  """Descarta o catálogo em memória."""
+  global _CATALOG, _LAST_SNAPSHOT_CHECK
+  with _CATALOG_LOCK:
+    _CATALOG = None
+    _LAST_SNAPSHOT_CHECK = 0.0
+
+
+__all__ = [
+  "CATALOG_SNAPSHOT_ENV",
+  "Catalog",
+  "CatalogEntry",
+  "DeviceCatalog",
+  "compute_catalog_version",
+  "get_catalog",
+  "load_catalog",
+  "reset_catalog",
+]
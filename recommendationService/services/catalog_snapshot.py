@@ -0,0 +1,233 @@
+"""Snapshot binário colunar do catálogo, aberto via mmap e compartilhado entre workers.
+
+Layout (little-endian, seções alinhadas em 8 bytes):
+
+  cabeçalho   magic(8s) | dispositivos(u32) | seções(u32) | offset do índice(u64)
+  seções      colunas float64 (`d`), uint32 (`I`) ou bytes (`B`)
+  índice      por seção: tamanho do nome(u16) | nome | tipo(1s) | offset(u64) | bytes(u64)
+
+Seções gravadas:
+
+  vector.<aspecto>          float64[n]  vetor de aspectos já calculado
+  spec.<tipo>               float64[n]  valor numérico da característica (NaN quando ausente)
+  sorted.<tipo>             float64[m]  valores presentes, em ordem crescente
+  order.<tipo>              uint32[m]   posição do dispositivo de cada valor ordenado
+  ids.offsets / ids.data    tabela de offsets (n+1) e bytes UTF-8 dos ids
+  chars.offsets / chars.data  características serializadas como `tipo\\x1fvalor\\x1e...`
+  meta.version              versão do catálogo (UTF-8)
+
+O arquivo é substituído por rename atômico; leitores detectam a troca pelo
+inode e reabrem, enquanto requisições em andamento seguem no mapeamento antigo.
+"""
+
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from ..core.constants import NUMERIC_CRITERIA_TYPES
+from ..core.device_features import build_caracteristica_map, build_device_vector
+from ..core.spec_index import PRICE_INDEX_KEY, SpecRangeIndex
+from ..core.specs import get_device_price_from_map
+from ..core.types import DeviceVector
+from ..core.vector_index import VECTOR_ASPECTS, DeviceVectorIndex
+from ..schemas import DeviceInput
+from ..utils.numeric import parse_value
+
+SNAPSHOT_MAGIC = b"MMCAT001"
+SNAPSHOT_SPEC_COLUMNS: Tuple[str, ...] = tuple(sorted(NUMERIC_CRITERIA_TYPES)) + (PRICE_INDEX_KEY,)
+
+_HEADER = struct.Struct("<8sIIQ")
+_TOC_ENTRY = struct.Struct("<cQQ")
+_KEY_SEPARATOR = "\x1f"
+_ENTRY_SEPARATOR = "\x1e"
+
+SectionData = Union[array, bytes]
+
+
+class SnapshotFormatError(ValueError):
+  """Arquivo de snapshot inválido ou de versão de formato desconhecida."""
+
+
+def _encode_strings(values: Iterable[str]) -> Tuple[array, bytes]:
+  """Concatena strings UTF-8 e devolve a tabela de offsets (n+1) correspondente."""
+  offsets = array("I", [0])
+  chunks: List[bytes] = []
+  total = 0
+  for value in values:
+    encoded = value.encode("utf-8")
+    chunks.append(encoded)
+    total += len(encoded)
+    offsets.append(total)
+  return offsets, b"".join(chunks)
+
+
+def _encode_caracteristicas(caracteristicas_map: Dict[str, str]) -> str:
+  return "".join(f"{tipo}{_KEY_SEPARATOR}{valor}{_ENTRY_SEPARATOR}" for tipo, valor in caracteristicas_map.items())
+
+
+def build_snapshot_sections(dispositivos: List[DeviceInput], version: str) -> Dict[str, SectionData]:
+  """Pré-processa os dispositivos e monta as seções colunares do snapshot."""
+  maps = [build_caracteristica_map(dispositivo) for dispositivo in dispositivos]
+  vectors = [build_device_vector(dispositivo, caracteristicas_map) for dispositivo, caracteristicas_map in zip(dispositivos, maps)]
+  sections: Dict[str, SectionData] = {}
+  for aspect in VECTOR_ASPECTS:
+    sections[f"vector.{aspect}"] = array("d", (getattr(vector, aspect) for vector in vectors))
+  for tipo in SNAPSHOT_SPEC_COLUMNS:
+    column = array("d")
+    present: List[Tuple[float, int]] = []
+    for position, caracteristicas_map in enumerate(maps):
+      if tipo == PRICE_INDEX_KEY:
+        value = get_device_price_from_map(caracteristicas_map)
+      else:
+        raw = caracteristicas_map.get(tipo)
+        value = parse_value(raw) if raw is not None else None
+      column.append(math.nan if value is None else value)
+      if value is not None:
+        present.append((value, position))
+    present.sort()
+    sections[f"spec.{tipo}"] = column
+    sections[f"sorted.{tipo}"] = array("d", (value for value, _ in present))
+    sections[f"order.{tipo}"] = array("I", (position for _, position in present))
+  sections["ids.offsets"], sections["ids.data"] = _encode_strings(dispositivo.id for dispositivo in dispositivos)
+  sections["chars.offsets"], sections["chars.data"] = _encode_strings(_encode_caracteristicas(m) for m in maps)
+  sections["meta.version"] = version.encode("utf-8")
+  return sections
+
+
+def write_snapshot(dispositivos: List[DeviceInput], path: Union[str, Path], version: str) -> Path:
+  """Grava o snapshot em arquivo temporário e publica com `os.replace` (atômico)."""
+  target = Path(path)
+  target.parent.mkdir(parents=True, exist_ok=True)
+  sections = build_snapshot_sections(dispositivos, version)
+  temporary = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+  with open(temporary, "wb") as handle:
+    handle.write(b"\0" * _HEADER.size)
+    toc: List[Tuple[str, bytes, int, int]] = []
+    for name, data in sections.items():
+      _pad_to_alignment(handle)
+      offset = handle.tell()
+      payload = data.tobytes() if isinstance(data, array) else data
+      handle.write(payload)
+      kind = data.typecode.encode("ascii") if isinstance(data, array) else b"B"
+      toc.append((name, kind, offset, len(payload)))
+    _pad_to_alignment(handle)
+    toc_offset = handle.tell()
+    for name, kind, offset, size in toc:
+      encoded_name = name.encode("utf-8")
+      handle.write(struct.pack("<H", len(encoded_name)))
+      handle.write(encoded_name)
+      handle.write(_TOC_ENTRY.pack(kind, offset, size))
+    handle.seek(0)
+    handle.write(_HEADER.pack(SNAPSHOT_MAGIC, len(dispositivos), len(toc), toc_offset))
+    handle.flush()
+    os.fsync(handle.fileno())
+  os.replace(temporary, target)
+  return target
+
+
+def _pad_to_alignment(handle, alignment: int = 8) -> None:
+  remainder = handle.tell() % alignment
+  if remainder:
+    handle.write(b"\0" * (alignment - remainder))
+
+
+class CatalogSnapshot:
+  """Catálogo somente leitura apoiado em mmap; as colunas são memoryviews sem cópia."""
+
+  def __init__(self, path: Union[str, Path]):
+    self.path = Path(path)
+    with open(self.path, "rb") as handle:
+      stat = os.fstat(handle.fileno())
+      self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+      self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(self._mmap)
+    if len(buffer) < _HEADER.size:
+      raise SnapshotFormatError(f"Snapshot truncado: {self.path}")
+    magic, self._size, section_count, toc_offset = _HEADER.unpack_from(buffer, 0)
+    if magic != SNAPSHOT_MAGIC:
+      raise SnapshotFormatError(f"Formato de snapshot desconhecido: {self.path}")
+    self._sections: Dict[str, memoryview] = {}
+    cursor = toc_offset
+    for _ in range(section_count):
+      (name_length,) = struct.unpack_from("<H", buffer, cursor)
+      cursor += 2
+      name = bytes(buffer[cursor:cursor + name_length]).decode("utf-8")
+      cursor += name_length
+      kind, offset, size = _TOC_ENTRY.unpack_from(buffer, cursor)
+      cursor += _TOC_ENTRY.size
+      view = buffer[offset:offset + size]
+      self._sections[name] = view if kind == b"B" else view.cast(kind.decode("ascii"))
+    self.version = bytes(self._sections["meta.version"]).decode("utf-8")
+    self._ids = self._sections["ids.data"]
+    self._id_offsets = self._sections["ids.offsets"]
+    self._chars = self._sections["chars.data"]
+    self._char_offsets = self._sections["chars.offsets"]
+    self._positions: Optional[Dict[str, int]] = None
+    self._spec_index: Optional[SpecRangeIndex] = None
+    self._vector_index: Optional[DeviceVectorIndex] = None
+
+  def __len__(self) -> int:
+    return self._size
+
+  def column(self, name: str) -> memoryview:
+    """Seção bruta do snapshot (ex.: `spec.ram`, `vector.camera`)."""
+    return self._sections[name]
+
+  def device_id(self, position: int) -> str:
+    start, stop = self._id_offsets[position], self._id_offsets[position + 1]
+    return bytes(self._ids[start:stop]).decode("utf-8")
+
+  def position_of(self, device_id: str) -> Optional[int]:
+    if self._positions is None:
+      self._positions = {self.device_id(position): position for position in range(self._size)}
+    return self._positions.get(device_id)
+
+  def caracteristicas_map(self, position: int) -> Dict[str, str]:
+    start, stop = self._char_offsets[position], self._char_offsets[position + 1]
+    encoded = bytes(self._chars[start:stop]).decode("utf-8")
+    entries: Dict[str, str] = {}
+    for item in encoded.split(_ENTRY_SEPARATOR):
+      if not item:
+        continue
+      tipo, _, valor = item.partition(_KEY_SEPARATOR)
+      entries[sys.intern(tipo)] = valor
+    return entries
+
+  def vector(self, position: int) -> DeviceVector:
+    return DeviceVector(
+      self.device_id(position),
+      *(self._sections[f"vector.{aspect}"][position] for aspect in VECTOR_ASPECTS),
+    )
+
+  def spec_index(self, tipos: Optional[Set[str]] = None) -> SpecRangeIndex:
+    """Índice de specs apoiado diretamente nas colunas ordenadas do snapshot."""
+    if self._spec_index is None:
+      self._spec_index = SpecRangeIndex.from_sorted_columns(
+        self._size,
+        {
+          tipo: (self._sections[f"sorted.{tipo}"], self._sections[f"order.{tipo}"])
+          for tipo in SNAPSHOT_SPEC_COLUMNS
+        },
+      )
+    return self._spec_index
+
+  @property
+  def vector_index(self) -> DeviceVectorIndex:
+    """KD-tree dos vetores, construída no processo na primeira consulta."""
+    if self._vector_index is None:
+      self._vector_index = DeviceVectorIndex([self.vector(position) for position in range(self._size)])
+    return self._vector_index
+
+
+__all__ = [
+  "CatalogSnapshot",
+  "SNAPSHOT_MAGIC",
+  "SnapshotFormatError",
+  "build_snapshot_sections",
+  "write_snapshot",
+]
@@ -0,0 +1,82 @@
+"""Coalescência (single-flight) de requisições idênticas em andamento.
+
+A primeira requisição com uma dada impressão digital executa o cálculo; as que
+chegam enquanto ele está em andamento esperam e recebem o mesmo resultado (ou
+a mesma exceção). Depois que o cálculo termina a chave é liberada: nada fica
+em cache.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+  __slots__ = ("done", "result", "error", "waiters")
+
+  def __init__(self) -> None:
+    self.done = threading.Event()
+    self.result: Any = None
+    self.error: Optional[BaseException] = None
+    self.waiters = 0
+
+
+class SingleFlight:
+  """Executa no máximo um cálculo por chave ao mesmo tempo."""
+
+  def __init__(self) -> None:
+    self._lock = threading.Lock()
+    self._flights: Dict[str, _Flight] = {}
+    self.executed = 0
+    self.coalesced = 0
+
+  def do(self, key: str, compute: Callable[[], T]) -> Tuple[T, bool]:
+    """Devolve `(resultado, compartilhado)`; `compartilhado` indica que outra requisição calculou."""
+    with self._lock:
+      flight = self._flights.get(key)
+      if flight is not None:
+        flight.waiters += 1
+        self.coalesced += 1
+        leader = False
+      else:
+        flight = _Flight()
+        self._flights[key] = flight
+        self.executed += 1
+        leader = True
+    if not leader:
+      flight.done.wait()
+      if flight.error is not None:
+        raise flight.error
+      return flight.result, True
+    try:
+      flight.result = compute()
+    except BaseException as exc:
+      flight.error = exc
+      raise
+    finally:
+      with self._lock:
+        del self._flights[key]
+      flight.done.set()
+    return flight.result, False
+
+  def stats(self) -> Dict[str, int]:
+    with self._lock:
+      return {
+        "executadas": self.executed,
+        "coalescidas": self.coalesced,
+        "emAndamento": len(self._flights),
+      }
+
+
+def request_fingerprint(parts: Iterable[str]) -> str:
+  """Hash das partes canônicas da requisição (payload serializado, versões)."""
+  digest = hashlib.sha1()
+  for part in parts:
+    digest.update(part.encode("utf-8"))
+    digest.update(b"\0")
+  return digest.hexdigest()
+
+
+__all__ = ["SingleFlight", "request_fingerprint"]
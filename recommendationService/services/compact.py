@@ -0,0 +1,113 @@
+"""Formato compacto da resposta: tabelas de dicionário no cabeçalho e linhas com códigos.
+
+Cada justificativa distinta aparece uma única vez em `justificativas`, e cada
+combinação distinta de pesos e tipos de critério do `matchExplanation`
+aparece uma vez em `explicacoes`. As linhas seguem a ordem de `colunas`:
+
+  justificativas     lista de códigos (índices em `justificativas`)
+  matchExplanation   [código em `explicacoes`, specFit, opinionSim, [score por critério]]
+  demais campos      valor escalar, como na resposta padrão
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+COMPACT_FORMAT = "compacto"
+SCALAR_COLUMNS = (
+  "finalScore",
+  "matchScore",
+  "perfilMatchPercent",
+  "criteriosMatchPercent",
+  "specFit",
+  "opinionSim",
+)
+
+
+def _columns_for(item: Dict[str, Any]) -> List[str]:
+  """Colunas presentes no item, na ordem canônica da resposta padrão."""
+  columns = ["id"]
+  columns.extend(column for column in SCALAR_COLUMNS if column in item)
+  columns.extend(column for column in ("justificativas", "matchExplanation") if column in item)
+  return columns
+
+
+def encode_compact_scores(scores: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+  """Converte os itens da resposta padrão no formato compacto."""
+  justificativas: List[str] = []
+  justificativa_codes: Dict[str, int] = {}
+  explicacoes: List[Dict[str, Any]] = []
+  explicacao_codes: Dict[Tuple[Tuple[Tuple[str, float], ...], Tuple[str, ...]], int] = {}
+  columns = _columns_for(scores[0]) if scores else ["id"]
+  linhas: List[List[Any]] = []
+  for item in scores:
+    row: List[Any] = []
+    for column in columns:
+      value = item[column]
+      if column == "justificativas":
+        codes = []
+        for text in value:
+          code = justificativa_codes.get(text)
+          if code is None:
+            code = len(justificativas)
+            justificativa_codes[text] = code
+            justificativas.append(text)
+          codes.append(code)
+        row.append(codes)
+      elif column == "matchExplanation":
+        weights = value["weights"]
+        per_criterion = value["perCriterion"]
+        key = (tuple(weights.items()), tuple(entry["tipo"] for entry in per_criterion))
+        code = explicacao_codes.get(key)
+        if code is None:
+          code = len(explicacoes)
+          explicacao_codes[key] = code
+          explicacoes.append({"weights": dict(weights), "criterios": list(key[1])})
+        row.append(
+          [
+            code,
+            value["specFit"],
+            value["opinionSim"],
+            [entry["score"] for entry in per_criterion],
+          ]
+        )
+      else:
+        row.append(value)
+    linhas.append(row)
+  return {
+    "formato": COMPACT_FORMAT,
+    "justificativas": justificativas,
+    "explicacoes": explicacoes,
+    "colunas": columns,
+    "linhas": linhas,
+  }
+
+
+def expand_compact_scores(compact: Dict[str, Any]) -> List[Dict[str, Any]]:
+  """Restaura a lista `scores` no formato padrão a partir da resposta compacta."""
+  justificativas: List[str] = compact["justificativas"]
+  explicacoes: List[Dict[str, Any]] = compact["explicacoes"]
+  columns: List[str] = compact["colunas"]
+  scores: List[Dict[str, Any]] = []
+  for row in compact["linhas"]:
+    item: Dict[str, Any] = {}
+    for column, value in zip(columns, row):
+      if column == "justificativas":
+        item[column] = [justificativas[code] for code in value]
+      elif column == "matchExplanation":
+        code, spec_fit, opinion_sim, criterion_scores = value
+        header = explicacoes[code]
+        item[column] = {
+          "specFit": spec_fit,
+          "opinionSim": opinion_sim,
+          "weights": dict(header["weights"]),
+          "perCriterion": [
+            {"tipo": tipo, "score": score}
+            for tipo, score in zip(header["criterios"], criterion_scores)
+          ],
+        }
+      else:
+        item[column] = value
+    scores.append(item)
+  return scores
+
+
+__all__ = ["COMPACT_FORMAT", "encode_compact_scores", "expand_compact_scores"]
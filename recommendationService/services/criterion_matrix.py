@@ -0,0 +1,177 @@
+"""Matriz de scores por critério sobre um conjunto fixo de dispositivos.
+
+Cada coluna guarda o score (sem arredondamento) de um critério normalizado em
+todos os dispositivos e é identificada pelo próprio critério (tipo, descrição,
+valor): critérios que não mudam entre pedidos reaproveitam a coluna. Células
+ainda não calculadas ficam como NaN e são preenchidas sob demanda. Vetores de
+opinião e features do dispositivo são montados uma única vez. A matriz guarda
+só os mapas de características das suas linhas, não a origem inteira dos
+dispositivos.
+
+`evaluate` reproduz, em colunas, exatamente as contas de `score_device` e do
+modelo (`predict_match_score`), na mesma ordem de operações.
+"""
+
+import copy
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+  import numpy as np
+except ImportError:  # pragma: no cover - handled em runtime
+  np = None
+
+from ..core.ml_model import MATCH_FEATURE_COLUMNS, predict_match_scores
+from ..core.preferences import compute_opinion_similarity
+from ..core.specs import criterion_weight, score_criterion
+from ..core.types import CriterionScoreData, DeviceVector, NormalizedCriterion
+
+CriterionKey = Tuple[str, str, Optional[float]]
+
+VECTOR_ASPECTS = ("camera", "bateria", "preco", "desempenho")
+
+
+def criterion_key(criterio: NormalizedCriterion) -> CriterionKey:
+  return (criterio.tipo, criterio.descricao, criterio.valor)
+
+
+@dataclass
+class MatrixScores:
+  """Colunas de uma avaliação completa (uma linha por dispositivo da matriz)."""
+
+  spec_fit: Any
+  opinion_sim: Any
+  heuristic: Any
+  final: Any
+
+
+class CriterionMatrix:
+  """Colunas de score por critério e vetores dos dispositivos de `positions`.
+
+  `source` segue o protocolo `DeviceSource` de `services.scoring` e só é lido
+  na construção.
+  """
+
+  def __init__(self, source: Any, positions: Sequence[int]):
+    if np is None:
+      raise RuntimeError("numpy é necessário para a matriz de critérios")
+    self.positions = list(positions)
+    self.row_of: Dict[int, int] = {position: row for row, position in enumerate(self.positions)}
+    self.device_ids = [source.device_id(position) for position in self.positions]
+    self.maps: List[Dict[str, str]] = [source.caracteristicas_map(position) for position in self.positions]
+    self.vectors: List[DeviceVector] = [source.vector(position) for position in self.positions]
+    self.aspects = {
+      aspect: np.asarray([getattr(vector, aspect) for vector in self.vectors], dtype=np.float64)
+      for aspect in VECTOR_ASPECTS
+    }
+    self._columns: Dict[CriterionKey, Any] = {}
+    self._opinions: Dict[Tuple, Any] = {}
+
+  def __len__(self) -> int:
+    return len(self.positions)
+
+  @property
+  def columns_computed(self) -> int:
+    return len(self._columns)
+
+  def _raw_column(self, criterio: NormalizedCriterion):
+    key = criterion_key(criterio)
+    column = self._columns.get(key)
+    if column is None:
+      column = np.full(len(self.positions), np.nan, dtype=np.float64)
+      self._columns[key] = column
+    return column
+
+  def score(self, criterio: NormalizedCriterion, row: int) -> float:
+    """Score de um critério numa linha, calculado só se ainda não estiver na coluna."""
+    column = self._raw_column(criterio)
+    value = float(column[row])
+    if value != value:
+      value, _ = score_criterion(criterio, self.maps[row])
+      column[row] = value
+    return value
+
+  def column(self, criterio: NormalizedCriterion):
+    """Coluna completa do critério (preenche as células que faltam)."""
+    column = self._raw_column(criterio)
+    for row in np.flatnonzero(np.isnan(column)).tolist():
+      column[row], _ = score_criterion(criterio, self.maps[row])
+    return column
+
+  def score_specifications(
+    self,
+    criterios: List[NormalizedCriterion],
+    row: int,
+  ) -> Tuple[float, List[CriterionScoreData]]:
+    """Mesmo resultado de `score_specifications`, gravando cada score na coluna."""
+    if not criterios:
+      return 0.5, []
+    weighted_sum = 0.0
+    total_weight = 0.0
+    per_criterion: List[CriterionScoreData] = []
+    for criterio in criterios:
+      score = self.score(criterio, row)
+      weight = criterion_weight(criterio)
+      weighted_sum += score * weight
+      total_weight += weight
+      per_criterion.append(CriterionScoreData(tipo=criterio.tipo, score=round(score, 4)))
+    spec_fit = weighted_sum / total_weight if total_weight > 0 else 0.0
+    return round(spec_fit, 4), per_criterion
+
+  def derive(self, criterios: List[NormalizedCriterion]) -> "CriterionMatrix":
+    """Nova matriz com só as colunas que `criterios` reaproveitam; esta não muda.
+
+    Dispositivos, vetores e as colunas mantidas são compartilhados (uma célula
+    NaN preenchida por qualquer das duas recebe sempre o mesmo valor); o
+    dicionário de colunas e o cache de similaridades são próprios, então
+    sessões derivadas da mesma matriz podem ser re-pontuadas em paralelo.
+    """
+    keep = {criterion_key(criterio) for criterio in criterios}
+    derived = copy.copy(self)
+    derived._columns = {key: column for key, column in self._columns.items() if key in keep}
+    derived._opinions = {}
+    return derived
+
+  def opinion_sims(self, context: Any):
+    key = (tuple(sorted(context.prefs.items())), tuple(sorted(context.weights.items())))
+    cached = self._opinions.get(key)
+    if cached is None:
+      cached = np.asarray(
+        [compute_opinion_similarity(vector, context.prefs, context.weights) for vector in self.vectors],
+        dtype=np.float64,
+      )
+      self._opinions[key] = cached
+    return cached
+
+  def evaluate(self, context: Any) -> MatrixScores:
+    """Spec fit, similaridade, score heurístico e final de todas as linhas para um `ScoringContext`."""
+    size = len(self.positions)
+    if context.has_structured:
+      weighted_sum = np.zeros(size, dtype=np.float64)
+      total_weight = 0.0
+      for criterio in context.structured_criteria:
+        weight = criterion_weight(criterio)
+        weighted_sum += self.column(criterio) * weight
+        total_weight += weight
+      spec_fit = weighted_sum / total_weight if total_weight > 0 else np.zeros(size, dtype=np.float64)
+      # Mesmo arredondamento de `score_specifications` (round do Python, não np.round).
+      spec_fit = np.asarray([round(value, 4) for value in spec_fit.tolist()], dtype=np.float64)
+    else:
+      spec_fit = np.full(size, 0.5, dtype=np.float64)
+    opinion_sim = self.opinion_sims(context)
+    heuristic = (spec_fit * context.spec_weight + opinion_sim * context.reviews_weight) / context.total_weight
+    features = {
+      "spec_fit": spec_fit,
+      "opinion_sim": opinion_sim,
+      "has_structured": np.full(size, context.has_structured),
+      "has_preference_targets": np.full(size, context.has_preference_targets),
+      "includes_price": np.full(size, context.includes_price),
+      "spec_weight": np.full(size, context.spec_weight),
+      "reviews_weight": np.full(size, context.reviews_weight),
+      **self.aspects,
+    }
+    final = predict_match_scores({name: features[name] for name in MATCH_FEATURE_COLUMNS}, heuristic)
+    return MatrixScores(spec_fit=spec_fit, opinion_sim=opinion_sim, heuristic=heuristic, final=final)
+
+
+__all__ = ["CriterionMatrix", "MatrixScores", "criterion_key"]
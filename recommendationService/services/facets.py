@@ -0,0 +1,68 @@
+"""Contagens de facetas e histograma de scores sobre o conjunto ranqueado.
+
+As facetas usam as colunas numéricas já parseadas do `SpecRangeIndex` (as
+mesmas da poda por `min_score`; no catálogo, construídas uma única vez) e as
+tabelas de níveis de `scoring_rules.json`: cada coluna vira contagens por
+nível com um único `searchsorted`, equivalente a aplicar
+`*_level_from_numeric`/`price_level_from_value` dispositivo a dispositivo.
+"""
+
+from typing import Dict, List, Sequence
+
+try:
+  import numpy as np
+except ImportError:  # pragma: no cover - handled em runtime
+  np = None
+
+from ..core.scoring_rules import load_rules
+from ..core.spec_index import PRICE_INDEX_KEY, SpecRangeIndex
+
+# Coluna do índice -> tabela de níveis usada para agrupá-la.
+FACET_LEVEL_TABLES: Dict[str, str] = {
+  "ram": "ram",
+  "rom": "rom",
+  "battery": "battery",
+  "benchmark": "benchmark",
+  "main_camera": "camera",
+  "front_camera": "camera",
+  PRICE_INDEX_KEY: "price",
+}
+HISTOGRAM_BINS = 10
+
+
+def compute_facets(index: SpecRangeIndex, positions: Sequence[int]) -> Dict[str, Dict[str, int]]:
+  """Quantos dispositivos de `positions` caem em cada nível, por coluna.
+
+  Dispositivos sem valor na coluna não entram na contagem; colunas sem nenhum
+  valor entre os candidatos são omitidas.
+  """
+  rules = load_rules()
+  selected = np.zeros(index.size, dtype=bool)
+  selected[np.asarray(positions, dtype=np.int64)] = True
+  facets: Dict[str, Dict[str, int]] = {}
+  for tipo, table_name in FACET_LEVEL_TABLES.items():
+    values, column_positions = index.column(tipo)
+    if len(values) == 0:
+      continue
+    mask = selected[np.asarray(column_positions, dtype=np.int64)]
+    if not mask.any():
+      continue
+    table = rules.level_tables[table_name]
+    counts = np.bincount(
+      table.indices(np.asarray(values, dtype=np.float64)[mask]),
+      minlength=len(table.levels),
+    )
+    facets[tipo] = {level: int(count) for level, count in zip(table.levels, counts)}
+  return facets
+
+
+def score_histogram(scores: Sequence[float], bins: int = HISTOGRAM_BINS) -> Dict[str, List]:
+  """Histograma dos scores finais em `bins` faixas iguais de [0, 1]."""
+  counts, edges = np.histogram(np.asarray(scores, dtype=np.float64), bins=bins, range=(0.0, 1.0))
+  return {
+    "limites": [round(float(edge), 4) for edge in edges],
+    "contagens": [int(count) for count in counts],
+  }
+
+
+__all__ = ["FACET_LEVEL_TABLES", "HISTOGRAM_BINS", "compute_facets", "score_histogram"]
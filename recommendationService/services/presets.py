@@ -0,0 +1,293 @@
+"""Rankings pré-calculados para os conjuntos de critérios mais populares.
+
+Cada pedido sobre o catálogo conta como um acesso à sua impressão digital
+(critérios, ids, `min_score` e campos); as contagens decaem com meia-vida de
+`half_life_seconds`. Uma thread em segundo plano mantém o ranking completo dos
+`top_n` conjuntos mais frequentes (com pelo menos `min_requests` acessos),
+recalculando-os quando a versão do catálogo ou do modelo muda ou quando passam
+de metade da idade máxima. Um pedido que coincide com um preset da versão atual e com idade até
+`max_age_seconds` é servido direto do ranking guardado, sem pontuar de novo.
+
+Contagens, presets e estatísticas são do processo: com vários workers, cada
+um mantém os seus (e `stats` informa o pid em `worker`).
+
+Opt-in via `PRESET_CACHE_SIZE` (top-N; 0 ou ausente desativa).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.ml_model import model_version
+from ..schemas import Criterion
+from .catalog import get_catalog
+from .scoring import score_catalog_devices
+from .sessions import RankingSession
+
+logger = logging.getLogger(__name__)
+
+PRESET_CACHE_SIZE_ENV = "PRESET_CACHE_SIZE"
+PRESET_MAX_AGE_ENV = "PRESET_MAX_AGE_SECONDS"
+PRESET_REFRESH_ENV = "PRESET_REFRESH_SECONDS"
+DEFAULT_PRESET_MAX_AGE = 300.0
+DEFAULT_PRESET_REFRESH = 30.0
+PRESET_MIN_REQUESTS = 3
+# As contagens caem pela metade a cada meia-vida: a popularidade reflete o tráfego recente.
+DEFAULT_PRESET_HALF_LIFE = 600.0
+PRESET_MAX_TRACKED = 1024
+
+
+@dataclass(frozen=True)
+class PresetQuery:
+  """Parte do pedido que determina o ranking completo."""
+
+  criterios: List[Criterion]
+  dispositivo_ids: Optional[List[str]] = None
+  min_score: Optional[float] = None
+  fields: Optional[List[str]] = None
+
+
+@dataclass
+class PresetEntry:
+  session: RankingSession
+  version: str
+  computed_at: float
+
+
+class _SessionCapture:
+  """Faz o papel de `RankingSessionStore.put` só para receber a sessão montada por `score_source`."""
+
+  def __init__(self) -> None:
+    self.session: Optional[RankingSession] = None
+
+  def put(self, session: RankingSession) -> Optional[str]:
+    self.session = session
+    return None
+
+
+def current_version(catalog: Any) -> str:
+  """Versão que um preset precisa ter para ser servido: catálogo + artefato do modelo."""
+  return f"{catalog.version}:{model_version()}"
+
+
+class PresetCache:
+  """Frequência por impressão digital e rankings pré-calculados dos mais populares."""
+
+  def __init__(
+    self,
+    top_n: int,
+    max_age_seconds: float = DEFAULT_PRESET_MAX_AGE,
+    refresh_seconds: float = DEFAULT_PRESET_REFRESH,
+    min_requests: int = PRESET_MIN_REQUESTS,
+    half_life_seconds: float = DEFAULT_PRESET_HALF_LIFE,
+    catalog_provider: Callable[[], Any] = get_catalog,
+    clock: Callable[[], float] = time.monotonic,
+  ):
+    self.top_n = top_n
+    self.max_age_seconds = max_age_seconds
+    self.refresh_seconds = refresh_seconds
+    self.min_requests = min_requests
+    self.half_life_seconds = half_life_seconds
+    self._catalog_provider = catalog_provider
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._counts: Counter = Counter()
+    self._decayed_at = clock()
+    self._queries: Dict[str, PresetQuery] = {}
+    self._entries: Dict[str, PresetEntry] = {}
+    self._stop = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+    self.lookups = 0
+    self.hits = 0
+    self.refreshes = 0
+    self.refresh_failures = 0
+    self.refresh_seconds_total = 0.0
+    self.last_refresh_seconds = 0.0
+
+  def record(self, key: str, query: PresetQuery) -> None:
+    """Conta um acesso ao conjunto de critérios (e inicia a thread de atualização)."""
+    with self._lock:
+      self._counts[key] += 1
+      self._queries[key] = query
+    self._ensure_started()
+
+  def lookup(self, key: str) -> Optional[RankingSession]:
+    """Ranking pré-calculado da versão atual dentro da idade máxima, ou None."""
+    with self._lock:
+      self.lookups += 1
+      entry = self._entries.get(key)
+    if entry is None:
+      return None
+    catalog = self._catalog_provider()
+    if catalog is None or entry.version != current_version(catalog):
+      return None
+    if self._clock() - entry.computed_at > self.max_age_seconds:
+      return None
+    with self._lock:
+      self.hits += 1
+    return entry.session
+
+  def popular(self) -> List[str]:
+    with self._lock:
+      return [key for key, count in self._counts.most_common(self.top_n) if count >= self.min_requests]
+
+  def refresh(self) -> int:
+    """Um ciclo: recalcula os presets desatualizados e aplica o decaimento; devolve quantos recalculou."""
+    catalog = self._catalog_provider()
+    refreshed = 0
+    popular = self.popular()
+    if catalog is not None:
+      version = current_version(catalog)
+      for key in popular:
+        with self._lock:
+          entry = self._entries.get(key)
+          query = self._queries[key]
+        if (
+          entry is not None
+          and entry.version == version
+          and self._clock() - entry.computed_at <= self.max_age_seconds / 2
+        ):
+          continue
+        if self._compute(key, query, catalog, version):
+          refreshed += 1
+    with self._lock:
+      keep = set(popular)
+      for key in [key for key in self._entries if key not in keep]:
+        del self._entries[key]
+      now = self._clock()
+      decay = 0.5 ** ((now - self._decayed_at) / self.half_life_seconds)
+      self._decayed_at = now
+      for key in list(self._counts):
+        self._counts[key] *= decay
+      for key, _ in self._counts.most_common()[PRESET_MAX_TRACKED:]:
+        del self._counts[key]
+      for key in [key for key in self._queries if key not in self._counts]:
+        del self._queries[key]
+    return refreshed
+
+  def _compute(self, key: str, query: PresetQuery, catalog: Any, version: str) -> bool:
+    capture = _SessionCapture()
+    started = time.perf_counter()
+    try:
+      score_catalog_devices(
+        query.criterios,
+        catalog,
+        query.dispositivo_ids,
+        min_score=query.min_score,
+        fields=query.fields,
+        session_store=capture,
+        limit=0,
+      )
+    except Exception as exc:  # pragma: no cover - proteção runtime
+      with self._lock:
+        self.refresh_failures += 1
+      logger.error("Falha ao pré-calcular preset: %s", exc)
+      return False
+    elapsed = time.perf_counter() - started
+    session = capture.session
+    if session is None:
+      return False
+    # A matriz de critérios só serve para re-pontuação incremental; presets não precisam dela.
+    session.matrix = None
+    with self._lock:
+      self._entries[key] = PresetEntry(session=session, version=version, computed_at=self._clock())
+      self.refreshes += 1
+      self.refresh_seconds_total += elapsed
+      self.last_refresh_seconds = elapsed
+    return True
+
+  def stats(self) -> Dict[str, Any]:
+    now = self._clock()
+    with self._lock:
+      return {
+        "worker": os.getpid(),
+        "ativos": len(self._entries),
+        "consultas": self.lookups,
+        "acertos": self.hits,
+        "taxaAcerto": self.hits / self.lookups if self.lookups else None,
+        "atualizacoes": self.refreshes,
+        "falhas": self.refresh_failures,
+        "custoAtualizacaoMs": {
+          "total": self.refresh_seconds_total * 1000,
+          "ultimo": self.last_refresh_seconds * 1000,
+          "medio": self.refresh_seconds_total * 1000 / self.refreshes if self.refreshes else None,
+        },
+        "presets": [
+          {
+            "chave": key[:12],
+            "frequencia": round(self._counts.get(key, 0.0), 2),
+            "idadeSegundos": round(now - entry.computed_at, 1),
+            "dispositivos": len(entry.session.entries),
+          }
+          for key, entry in self._entries.items()
+        ],
+      }
+
+  def close(self, timeout: Optional[float] = 5.0) -> None:
+    if self._thread is None:
+      return
+    self._stop.set()
+    self._thread.join(timeout)
+    self._thread = None
+
+  def _ensure_started(self) -> None:
+    if self._thread is not None or self.refresh_seconds <= 0:
+      return
+    with self._lock:
+      if self._thread is None:
+        self._thread = threading.Thread(target=self._run, name="preset-refresh", daemon=True)
+        self._thread.start()
+
+  def _run(self) -> None:
+    while not self._stop.wait(self.refresh_seconds):
+      try:
+        self.refresh()
+      except Exception as exc:  # pragma: no cover - proteção runtime
+        logger.error("Falha no ciclo de presets: %s", exc)
+
+
+_CACHE: Optional[PresetCache] = None
+_CACHE_PID: Optional[int] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_preset_cache() -> Optional[PresetCache]:
+  """Cache de presets do processo atual, ou None quando `PRESET_CACHE_SIZE` não está definido."""
+  global _CACHE, _CACHE_PID
+  top_n = int(os.getenv(PRESET_CACHE_SIZE_ENV) or 0)
+  if top_n <= 0:
+    return None
+  pid = os.getpid()
+  if _CACHE is not None and _CACHE_PID == pid:
+    return _CACHE
+  with _CACHE_LOCK:
+    if _CACHE is None or _CACHE_PID != pid:
+      _CACHE = PresetCache(
+        top_n,
+        max_age_seconds=float(os.getenv(PRESET_MAX_AGE_ENV) or DEFAULT_PRESET_MAX_AGE),
+        refresh_seconds=float(os.getenv(PRESET_REFRESH_ENV) or DEFAULT_PRESET_REFRESH),
+      )
+      _CACHE_PID = pid
+  return _CACHE
+
+
+def close_preset_cache() -> None:
+  global _CACHE, _CACHE_PID
+  if _CACHE is not None and _CACHE_PID == os.getpid():
+    _CACHE.close()
+  _CACHE = None
+  _CACHE_PID = None
+
+
+__all__ = [
+  "PRESET_CACHE_SIZE_ENV",
+  "PresetCache",
+  "PresetQuery",
+  "close_preset_cache",
+  "current_version",
+  "get_preset_cache",
+]
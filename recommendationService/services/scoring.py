@@ -1,6 +1,7 @@
 """Serviço responsável pelo cálculo final de matching (score_devices)."""
 
-from typing import Dict, List
+from dataclasses import dataclass, field, replace
+from typing import Dict, FrozenSet, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
 
 from ..schemas import Criterion, DeviceInput
 from ..core.constants import CRITERION_ASPECT_HINT, PRICE_TYPE_SET
@@ -25,23 +26,131 @@ from ..core.specs import (
   price_level_from_value,
   score_specifications,
 )
-from ..core.ml_model import build_feature_payload, predict_match_score
+from ..core.free_text import expand_free_text_criteria
+from ..core.ml_model import build_feature_payload, load_match_model, predict_match_score
+from ..core.spec_index import SpecRangeIndex
+from ..core.types import (
+  CriterionScoreData,
+  DeviceVector,
+  NormalizedCriterion,
+  PreferenceAspect,
+  PreferenceLevel,
+)
+from ..utils.deadline import Deadline
+from ..utils.numeric import clamp_score
 from ..utils.text import level_from_keywords
+from .criterion_matrix import CriterionMatrix
+from .facets import FACET_LEVEL_TABLES, compute_facets, score_histogram
+from .scoring_log import compute_criteria_hash, get_scoring_logger
+from .sessions import RankingSession, RankingSessionStore
+from .shadow import get_shadow_evaluator
 
+DEGRADATION_HEURISTIC_SCORE = "heuristic_score"
+DEGRADATION_SKIPPED_JUSTIFICATIVAS = "skipped_justificativas"
+DEGRADATION_PARTIAL_RANKING = "partial_ranking"
 
-def score_devices(
-  criterios: List[Criterion],
-  dispositivos: List[DeviceInput],
-) -> List[Dict[str, object]]:
-  """Pontua os dispositivos candidatos de acordo com critérios e preferências."""
-  if not criterios or not dispositivos:
-    return []
+RESPONSE_FIELDS: FrozenSet[str] = frozenset(
+  {
+    "finalScore",
+    "matchScore",
+    "perfilMatchPercent",
+    "criteriosMatchPercent",
+    "specFit",
+    "opinionSim",
+    "justificativas",
+    "matchExplanation",
+  }
+)
 
-  criterios_normalizados = build_normalized_criteria(criterios)
-  structured_criteria = [c for c in criterios_normalizados if c.tipo != "texto_livre"]
-  has_structured = len(structured_criteria) > 0
+# Folga para o arredondamento de 4 casas aplicado ao spec_fit.
+PRUNING_TOLERANCE = 1e-4
+
+
+@dataclass
+class ScoringOutcome:
+  """Resultado do ranqueamento com as degradações aplicadas (se houver)."""
+
+  scores: List[Dict[str, object]]
+  degradations: List[str] = field(default_factory=list)
+  pruned: int = 0
+  scored: int = 0
+  total: int = 0
+  session: Optional[str] = None
+  facets: Optional[Dict[str, Dict[str, int]]] = None
+  histogram: Optional[Dict[str, List]] = None
+
+
+@dataclass(slots=True)
+class ScoredDevice:
+  """Estado intermediário de um dispositivo entre as etapas do cálculo."""
+
+  device_id: str
+  effective_spec_fit: float
+  opinion_sim: float
+  heuristic_score: float
+  feature_payload: Dict[str, float]
+  per_criterion: List[CriterionScoreData]
+  device_vector: DeviceVector
+  final_score: float = 0.0
+  justificativas: List[str] = field(default_factory=list)
+  position: int = -1
+
+
+class DeviceSource(Protocol):
+  """Origem dos dispositivos pontuados: corpo da requisição ou catálogo."""
+
+  def __len__(self) -> int: ...
+
+  def position_of(self, device_id: str) -> Optional[int]: ...
+
+  def device_id(self, position: int) -> str: ...
+
+  def caracteristicas_map(self, position: int) -> Dict[str, str]: ...
+
+  def vector(self, position: int) -> DeviceVector: ...
+
+  def spec_index(self, tipos: Set[str]) -> SpecRangeIndex: ...
+
+
+class RequestDeviceSource:
+  """Dispositivos enviados no payload, com mapas de características sob demanda."""
+
+  def __init__(self, dispositivos: List[DeviceInput]):
+    self.dispositivos = dispositivos
+    self._maps: List[Optional[Dict[str, str]]] = [None] * len(dispositivos)
+
+  def __len__(self) -> int:
+    return len(self.dispositivos)
+
+  def position_of(self, device_id: str) -> Optional[int]:
+    for position, dispositivo in enumerate(self.dispositivos):
+      if dispositivo.id == device_id:
+        return position
+    return None
+
+  def device_id(self, position: int) -> str:
+    return self.dispositivos[position].id
 
-  prefs, weights = map_criteria_to_preferences(
+  def caracteristicas_map(self, position: int) -> Dict[str, str]:
+    caracteristicas_map = self._maps[position]
+    if caracteristicas_map is None:
+      caracteristicas_map = build_caracteristica_map(self.dispositivos[position])
+      self._maps[position] = caracteristicas_map
+    return caracteristicas_map
+
+  def vector(self, position: int) -> DeviceVector:
+    return build_device_vector(self.dispositivos[position], self.caracteristicas_map(position))
+
+  def spec_index(self, tipos: Set[str]) -> SpecRangeIndex:
+    maps = [self.caracteristicas_map(position) for position in range(len(self.dispositivos))]
+    return SpecRangeIndex.from_maps(maps, tipos)
+
+
+def derive_preferences(
+  structured_criteria: List[NormalizedCriterion],
+) -> Tuple[Dict[PreferenceAspect, PreferenceLevel], Dict[PreferenceAspect, float]]:
+  """Aplica `map_criteria_to_preferences` com os classificadores de nível do motor."""
+  return map_criteria_to_preferences(
     structured_criteria,
     level_from_keywords,
     price_level_from_range,
@@ -53,6 +162,34 @@ def score_devices(
     battery_level_from_numeric,
     camera_level_from_numeric,
   )
+
+
+@dataclass(slots=True)
+class ScoringContext:
+  """Tudo o que depende apenas dos critérios (e não do dispositivo)."""
+
+  structured_criteria: List[NormalizedCriterion]
+  prefs: Dict[PreferenceAspect, PreferenceLevel]
+  weights: Dict[PreferenceAspect, float]
+  has_structured: bool
+  has_preference_targets: bool
+  includes_price: bool
+  spec_weight: float
+  reviews_weight: float
+  total_weight: float
+  normalized_weights: Dict[str, float]
+
+
+def build_scoring_context(criterios: List[Criterion]) -> ScoringContext:
+  """Normaliza os critérios e deriva preferências e pesos de specs/reviews."""
+  return build_context_from_normalized(expand_free_text_criteria(build_normalized_criteria(criterios)))
+
+
+def build_context_from_normalized(structured_criteria: List[NormalizedCriterion]) -> ScoringContext:
+  """Contexto de scoring para critérios já normalizados (e expandidos)."""
+  has_structured = len(structured_criteria) > 0
+
+  prefs, weights = derive_preferences(structured_criteria)
   has_preference_targets = len(prefs) > 0
   includes_price = any(c.tipo in PRICE_TYPE_SET for c in structured_criteria)
 
@@ -70,54 +207,473 @@ def score_devices(
     reviews_weight = 0.0
 
   total_weight = spec_weight + reviews_weight or 1.0
-  normalized_weights = {
-    "specs": round(spec_weight / total_weight, 2),
-    "reviews": round(reviews_weight / total_weight, 2),
+  return ScoringContext(
+    structured_criteria=structured_criteria,
+    prefs=prefs,
+    weights=weights,
+    has_structured=has_structured,
+    has_preference_targets=has_preference_targets,
+    includes_price=includes_price,
+    spec_weight=spec_weight,
+    reviews_weight=reviews_weight,
+    total_weight=total_weight,
+    normalized_weights={
+      "specs": round(spec_weight / total_weight, 2),
+      "reviews": round(reviews_weight / total_weight, 2),
+    },
+  )
+
+
+def score_device(
+  context: ScoringContext,
+  source: DeviceSource,
+  position: int,
+  matrix: Optional[CriterionMatrix] = None,
+) -> ScoredDevice:
+  """Calcula spec fit, similaridade, score heurístico e features de um dispositivo.
+
+  Com `matrix`, os scores por critério ficam gravados nas colunas dela (para
+  re-pontuação incremental) e o vetor do dispositivo vem da própria matriz.
+  """
+  if matrix is None:
+    spec_fit, per_criterion = score_specifications(
+      context.structured_criteria, source.caracteristicas_map(position)
+    )
+    device_vector = source.vector(position)
+  else:
+    row = matrix.row_of[position]
+    spec_fit, per_criterion = matrix.score_specifications(context.structured_criteria, row)
+    device_vector = matrix.vectors[row]
+  opinion_sim = compute_opinion_similarity(device_vector, context.prefs, context.weights)
+  effective_spec_fit = spec_fit if context.has_structured else 0.5
+  heuristic_score = (
+    (effective_spec_fit * context.spec_weight) + (opinion_sim * context.reviews_weight)
+  ) / context.total_weight
+  feature_payload = build_feature_payload(
+    spec_fit=effective_spec_fit,
+    opinion_sim=opinion_sim,
+    device_vector=device_vector,
+    has_structured=context.has_structured,
+    has_preference_targets=context.has_preference_targets,
+    includes_price=context.includes_price,
+    spec_weight=context.spec_weight,
+    reviews_weight=context.reviews_weight,
+  )
+  return ScoredDevice(
+    device_id=source.device_id(position),
+    effective_spec_fit=effective_spec_fit,
+    opinion_sim=opinion_sim,
+    heuristic_score=heuristic_score,
+    feature_payload=feature_payload,
+    per_criterion=per_criterion,
+    device_vector=device_vector,
+    position=position,
+  )
+
+
+def resolve_fields(fields: Optional[Iterable[str]]) -> FrozenSet[str]:
+  """Campos pedidos em cada item da resposta (todos quando não informado)."""
+  if fields is None:
+    return RESPONSE_FIELDS
+  return frozenset(fields) & RESPONSE_FIELDS
+
+
+def build_device_response(
+  context: ScoringContext,
+  entry: ScoredDevice,
+  wanted: FrozenSet[str] = RESPONSE_FIELDS,
+) -> Dict[str, object]:
+  """Monta o item da resposta apenas com os campos pedidos."""
+  item: Dict[str, object] = {"id": entry.device_id}
+  if "finalScore" in wanted:
+    item["finalScore"] = round(entry.final_score, 4)
+  if "matchScore" in wanted:
+    item["matchScore"] = int(round(entry.final_score * 100))
+  if "perfilMatchPercent" in wanted:
+    item["perfilMatchPercent"] = int(round(entry.opinion_sim * 100))
+  if "criteriosMatchPercent" in wanted:
+    item["criteriosMatchPercent"] = (
+      int(round(entry.effective_spec_fit * 100)) if context.has_structured else None
+    )
+  if "specFit" in wanted:
+    item["specFit"] = round(entry.effective_spec_fit, 4)
+  if "opinionSim" in wanted:
+    item["opinionSim"] = round(entry.opinion_sim, 4)
+  if "justificativas" in wanted:
+    item["justificativas"] = entry.justificativas
+  if "matchExplanation" in wanted:
+    item["matchExplanation"] = build_match_explanation(context, entry)
+  return item
+
+
+def build_match_explanation(context: ScoringContext, entry: ScoredDevice) -> Dict[str, object]:
+  """Detalha specFit, opinionSim, pesos e o score de cada critério."""
+  return {
+    "specFit": round(entry.effective_spec_fit, 4),
+    "opinionSim": round(entry.opinion_sim, 4),
+    "weights": context.normalized_weights.copy(),
+    "perCriterion": [
+      {"tipo": criterio.tipo, "score": round(criterio.score, 4)}
+      for criterio in entry.per_criterion
+    ],
+  }
+
+
+def explain_device(
+  criterios: List[Criterion],
+  source: DeviceSource,
+  position: int,
+) -> Dict[str, object]:
+  """Justificativas e `matchExplanation` de um único dispositivo (sem inferência do modelo)."""
+  context = build_scoring_context(criterios)
+  entry = score_device(context, source, position)
+  return {
+    "id": entry.device_id,
+    "justificativas": build_justificativas(entry.per_criterion, entry.device_vector, context.weights),
+    "matchExplanation": build_match_explanation(context, entry),
   }
 
-  resultados: List[Dict[str, object]] = []
-  for dispositivo in dispositivos:
-    caracteristicas_map = build_caracteristica_map(dispositivo)
-    spec_fit, per_criterion = score_specifications(structured_criteria, caracteristicas_map)
-    device_vector = build_device_vector(dispositivo, caracteristicas_map)
-    opinion_sim = compute_opinion_similarity(device_vector, prefs, weights)
-    effective_spec_fit = spec_fit if has_structured else 0.5
-    heuristic_score = (
-      (effective_spec_fit * spec_weight) + (opinion_sim * reviews_weight)
-    ) / total_weight
-    feature_payload = build_feature_payload(
-      spec_fit=effective_spec_fit,
-      opinion_sim=opinion_sim,
-      device_vector=device_vector,
-      has_structured=has_structured,
-      has_preference_targets=has_preference_targets,
-      includes_price=includes_price,
-      spec_weight=spec_weight,
-      reviews_weight=reviews_weight,
+
+def score_devices(
+  criterios: List[Criterion],
+  dispositivos: List[DeviceInput],
+  deadline: Optional[Deadline] = None,
+  min_score: Optional[float] = None,
+  fields: Optional[Iterable[str]] = None,
+) -> List[Dict[str, object]]:
+  """Pontua os dispositivos candidatos de acordo com critérios e preferências."""
+  return score_devices_with_outcome(criterios, dispositivos, deadline, min_score, fields).scores
+
+
+def score_devices_with_outcome(
+  criterios: List[Criterion],
+  dispositivos: List[DeviceInput],
+  deadline: Optional[Deadline] = None,
+  min_score: Optional[float] = None,
+  fields: Optional[Iterable[str]] = None,
+  session_store: Optional[RankingSessionStore] = None,
+  offset: int = 0,
+  limit: Optional[int] = None,
+  facets: bool = False,
+) -> ScoringOutcome:
+  """Pontua os dispositivos enviados na requisição (ver `score_source`)."""
+  if not criterios or not dispositivos:
+    return ScoringOutcome(scores=[])
+  return score_source(
+    criterios,
+    RequestDeviceSource(dispositivos),
+    range(len(dispositivos)),
+    deadline,
+    min_score,
+    fields,
+    session_store,
+    offset,
+    limit,
+    facets,
+  )
+
+
+def score_catalog_devices(
+  criterios: List[Criterion],
+  catalog: DeviceSource,
+  device_ids: Optional[List[str]] = None,
+  deadline: Optional[Deadline] = None,
+  min_score: Optional[float] = None,
+  fields: Optional[Iterable[str]] = None,
+  session_store: Optional[RankingSessionStore] = None,
+  offset: int = 0,
+  limit: Optional[int] = None,
+  facets: bool = False,
+) -> ScoringOutcome:
+  """Pontua dispositivos do catálogo (todos, ou apenas os ids informados)."""
+  if device_ids is None:
+    positions: Sequence[int] = range(len(catalog))
+  else:
+    resolved = (catalog.position_of(device_id) for device_id in device_ids)
+    positions = [position for position in resolved if position is not None]
+  if not criterios or not positions:
+    return ScoringOutcome(scores=[])
+  return score_source(
+    criterios, catalog, positions, deadline, min_score, fields, session_store, offset, limit, facets
+  )
+
+
+def score_source(
+  criterios: List[Criterion],
+  source: DeviceSource,
+  positions: Sequence[int],
+  deadline: Optional[Deadline] = None,
+  min_score: Optional[float] = None,
+  fields: Optional[Iterable[str]] = None,
+  session_store: Optional[RankingSessionStore] = None,
+  offset: int = 0,
+  limit: Optional[int] = None,
+  facets: bool = False,
+) -> ScoringOutcome:
+  """Pontua os dispositivos e informa quais degradações o deadline exigiu.
+
+  Sem tempo suficiente, o cálculo degrada em etapas: usa o score heurístico no
+  lugar do modelo, deixa de montar justificativas e, em último caso, devolve
+  apenas os dispositivos pontuados até o estouro do prazo.
+
+  Com `min_score`, dispositivos cujo score heurístico não alcança o limite são
+  descartados; os que comprovadamente não alcançam (pelo limite superior do
+  `spec_fit`) nem chegam a ser pontuados.
+
+  `fields` restringe as partes de cada item da resposta; justificativas e
+  `matchExplanation` fora da seleção nem chegam a ser calculadas.
+
+  Com `session_store`, o ranking completo fica guardado numa sessão (token em
+  `ScoringOutcome.session`) para `page_ranking_session`, junto com a matriz de
+  scores por critério usada por `rescore_ranking_session`; `offset`/`limit`
+  recortam a página devolvida, e só ela recebe justificativas.
+
+  Com `facets`, a resposta traz contagens por nível das colunas numéricas e o
+  histograma dos scores finais de todo o conjunto ranqueado (não só da página),
+  a partir do mesmo índice de specs usado na poda.
+  """
+  context = build_scoring_context(criterios)
+  wanted = resolve_fields(fields)
+
+  index = None
+  if facets or (min_score is not None and context.has_structured):
+    tipos = {criterio.tipo for criterio in context.structured_criteria}
+    index = source.spec_index(tipos | set(FACET_LEVEL_TABLES) if facets else tipos)
+
+  candidates = list(positions)
+  if min_score is not None:
+    if context.has_structured:
+      spec_bounds = index.spec_fit_upper_bounds(context.structured_criteria)
+    else:
+      spec_bounds = [0.5] * len(source)
+    candidates = [
+      position
+      for position in candidates
+      if (spec_bounds[position] * context.spec_weight + context.reviews_weight) / context.total_weight
+      + PRUNING_TOLERANCE
+      >= min_score
+    ]
+  pruned = len(positions) - len(candidates)
+
+  # Só as linhas que passaram pela poda entram na matriz da sessão.
+  matrix = CriterionMatrix(source, candidates) if session_store is not None else None
+  partial_ranking = False
+  scored: List[ScoredDevice] = []
+  for position in candidates:
+    scored.append(score_device(context, source, position, matrix))
+    if deadline is not None and deadline.expired() and len(scored) < len(candidates):
+      partial_ranking = True
+      break
+
+  scored_count = len(scored)
+  if min_score is not None:
+    scored = [entry for entry in scored if entry.heuristic_score >= min_score]
+
+  used_model = _apply_model_scores(scored, deadline)
+  if not used_model:
+    for entry in scored:
+      entry.final_score = clamp_score(entry.heuristic_score)
+  # Sem artefato, `predict_match_score` devolve o heurístico: não é score de modelo.
+  model_ran = used_model and load_match_model() is not None
+
+  scoring_logger = get_scoring_logger()
+  if scoring_logger is not None:
+    scoring_logger.log(
+      compute_criteria_hash(criterios),
+      [
+        (entry.device_id, entry.feature_payload, entry.heuristic_score, entry.final_score if model_ran else None)
+        for entry in scored
+      ],
+    )
+
+  shadow = get_shadow_evaluator()
+  if shadow is not None and model_ran:
+    shadow.submit([entry.feature_payload for entry in scored], [entry.final_score for entry in scored])
+
+  scored.sort(key=lambda entry: round(entry.final_score, 4), reverse=True)
+
+  session_token = None
+  if session_store is not None:
+    session_token = session_store.put(
+      RankingSession(
+        context=context,
+        entries=scored,
+        wanted=wanted,
+        degradations=_degradations(not used_model, False, partial_ranking),
+        pruned=pruned,
+        scored=scored_count,
+        matrix=matrix,
+        min_score=min_score,
+      )
+    )
+
+  page = _page(scored, offset, limit)
+  skipped_justificativas = _fill_justificativas(context, page, wanted, deadline)
+  return ScoringOutcome(
+    scores=[build_device_response(context, entry, wanted) for entry in page],
+    degradations=_degradations(not used_model, skipped_justificativas, partial_ranking),
+    pruned=pruned,
+    scored=scored_count,
+    total=len(scored),
+    session=session_token,
+    facets=compute_facets(index, [entry.position for entry in scored]) if facets else None,
+    histogram=score_histogram([entry.final_score for entry in scored]) if facets else None,
+  )
+
+
+def page_ranking_session(session: RankingSession, offset: int = 0, limit: Optional[int] = None) -> ScoringOutcome:
+  """Página de um ranking já guardado: só monta justificativas das linhas devolvidas.
+
+  A sessão pode ser lida por vários pedidos ao mesmo tempo (páginas paralelas,
+  presets compartilhados), então as justificativas vão para cópias das linhas
+  da página e as entradas guardadas nunca são alteradas.
+  """
+  page = [replace(entry) for entry in _page(session.entries, offset, limit)]
+  _fill_justificativas(session.context, page, session.wanted, None)
+  return ScoringOutcome(
+    scores=[build_device_response(session.context, entry, session.wanted) for entry in page],
+    degradations=list(session.degradations),
+    pruned=session.pruned,
+    scored=session.scored,
+    total=len(session.entries),
+  )
+
+
+def rescore_ranking_session(
+  session: RankingSession,
+  criterios: List[Criterion],
+  session_store: RankingSessionStore,
+  offset: int = 0,
+  limit: Optional[int] = None,
+) -> ScoringOutcome:
+  """Re-pontua uma sessão com critérios editados, recalculando só o que mudou.
+
+  Colunas de critérios que não mudaram (mesmo tipo e descrição) vêm da matriz da
+  sessão; só as colunas novas, os pesos e a similaridade de opinião (quando as
+  preferências mudam) são recalculados, e o modelo roda em lote. O ranking e os
+  itens são idênticos aos de um `score_source` completo (sem deadline) com os
+  novos critérios e o mesmo `min_score` sobre os dispositivos da matriz, isto
+  é, os que passaram pela poda do pedido original. O resultado vira uma nova sessão com
+  uma matriz derivada da anterior (`CriterionMatrix.derive`): a sessão original
+  continua intacta e pode ser editada de novo ou em paralelo.
+  """
+  context = build_scoring_context(criterios)
+  matrix = session.matrix.derive(context.structured_criteria)
+  evaluated = matrix.evaluate(context)
+  columns = [matrix.column(criterio) for criterio in context.structured_criteria]
+  spec_fits = evaluated.spec_fit.tolist()
+  opinion_sims = evaluated.opinion_sim.tolist()
+  heuristics = evaluated.heuristic.tolist()
+  finals = evaluated.final.tolist()
+
+  scored: List[ScoredDevice] = []
+  for row, position in enumerate(matrix.positions):
+    if session.min_score is not None and heuristics[row] < session.min_score:
+      continue
+    device_vector = matrix.vectors[row]
+    scored.append(
+      ScoredDevice(
+        device_id=matrix.device_ids[row],
+        effective_spec_fit=spec_fits[row],
+        opinion_sim=opinion_sims[row],
+        heuristic_score=heuristics[row],
+        feature_payload=build_feature_payload(
+          spec_fit=spec_fits[row],
+          opinion_sim=opinion_sims[row],
+          device_vector=device_vector,
+          has_structured=context.has_structured,
+          has_preference_targets=context.has_preference_targets,
+          includes_price=context.includes_price,
+          spec_weight=context.spec_weight,
+          reviews_weight=context.reviews_weight,
+        ),
+        per_criterion=[
+          CriterionScoreData(tipo=criterio.tipo, score=round(float(column[row]), 4))
+          for criterio, column in zip(context.structured_criteria, columns)
+        ],
+        device_vector=device_vector,
+        final_score=finals[row],
+        position=position,
+      )
     )
-    final_score = predict_match_score(feature_payload, heuristic_score)
-    justificativas = build_justificativas(per_criterion, device_vector, weights)
-    resultados.append(
-      {
-        "id": dispositivo.id,
-        "finalScore": round(final_score, 4),
-        "matchScore": int(round(final_score * 100)),
-        "perfilMatchPercent": int(round(opinion_sim * 100)),
-        "criteriosMatchPercent": int(round(effective_spec_fit * 100)) if has_structured else None,
-        "specFit": round(effective_spec_fit, 4),
-        "opinionSim": round(opinion_sim, 4),
-        "justificativas": justificativas,
-        "matchExplanation": {
-          "specFit": round(effective_spec_fit, 4),
-          "opinionSim": round(opinion_sim, 4),
-          "weights": normalized_weights.copy(),
-          "perCriterion": [
-            {"tipo": criterio.tipo, "score": round(criterio.score, 4)}
-            for criterio in per_criterion
-          ],
-        },
-      }
+  scored.sort(key=lambda entry: round(entry.final_score, 4), reverse=True)
+
+  session_token = session_store.put(
+    RankingSession(
+      context=context,
+      entries=scored,
+      wanted=session.wanted,
+      pruned=session.pruned,
+      scored=len(matrix),
+      matrix=matrix,
+      min_score=session.min_score,
     )
+  )
+  page = _page(scored, offset, limit)
+  _fill_justificativas(context, page, session.wanted, None)
+  return ScoringOutcome(
+    scores=[build_device_response(context, entry, session.wanted) for entry in page],
+    pruned=session.pruned,
+    scored=len(matrix),
+    total=len(scored),
+    session=session_token,
+  )
+
+
+def _page(entries: List[ScoredDevice], offset: int, limit: Optional[int]) -> List[ScoredDevice]:
+  if offset == 0 and limit is None:
+    return entries
+  return entries[offset:None if limit is None else offset + limit]
+
+
+def _fill_justificativas(
+  context: ScoringContext,
+  entries: List[ScoredDevice],
+  wanted: FrozenSet[str],
+  deadline: Optional[Deadline],
+) -> bool:
+  """Monta as justificativas que faltam; devolve True se o prazo obrigou a pular alguma."""
+  if "justificativas" not in wanted:
+    return False
+  for entry in entries:
+    if entry.justificativas:
+      continue
+    if deadline is not None and deadline.expired():
+      return True
+    entry.justificativas = build_justificativas(entry.per_criterion, entry.device_vector, context.weights)
+  return False
+
+
+def _degradations(heuristic_score: bool, skipped_justificativas: bool, partial_ranking: bool) -> List[str]:
+  return [
+    name
+    for name, applied in (
+      (DEGRADATION_HEURISTIC_SCORE, heuristic_score),
+      (DEGRADATION_SKIPPED_JUSTIFICATIVAS, skipped_justificativas),
+      (DEGRADATION_PARTIAL_RANKING, partial_ranking),
+    )
+    if applied
+  ]
+
+
+def _apply_model_scores(scored: List[ScoredDevice], deadline: Optional[Deadline]) -> bool:
+  """Aplica o modelo enquanto o custo projetado couber no prazo restante.
 
-  resultados.sort(key=lambda item: item["finalScore"], reverse=True)
-  return resultados
+  Retorna False quando a inferência precisou ser abandonada; nesse caso todos
+  os dispositivos voltam para o score heurístico para manter o ranking coerente.
+  """
+  if deadline is None:
+    for entry in scored:
+      entry.final_score = predict_match_score(entry.feature_payload, entry.heuristic_score)
+    return True
+  # Mesmo relógio do deadline, para a estimativa concordar com `remaining()`.
+  started_at = deadline.elapsed()
+  for index, entry in enumerate(scored):
+    if deadline.expired():
+      return False
+    if index > 0:
+      average_cost = (deadline.elapsed() - started_at) / index
+      if deadline.remaining() < average_cost * (len(scored) - index):
+        return False
+    entry.final_score = predict_match_score(entry.feature_payload, entry.heuristic_score)
+  return True
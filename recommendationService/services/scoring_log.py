@@ -0,0 +1,230 @@
+"""Log assíncrono do scoring para montar dados de treino do modelo de matching.
+
+Opt-in via `SCORING_LOG_DIR`. Cada requisição pontuada vira um único item numa
+fila limitada; quando a fila está cheia o registro é descartado (e contado em
+`dropped`) em vez de bloquear a requisição. Uma thread em segundo plano grava
+uma linha JSON por dispositivo em arquivos gzip somente de acréscimo:
+
+  scoring-<inicio>-<pid>-<seq>.jsonl.gz.part   arquivo em escrita
+  scoring-<inicio>-<pid>-<seq>.jsonl.gz        arquivo fechado (rotacionado)
+
+A rotação acontece por tamanho (bytes antes da compressão) ou por tempo, e o
+arquivo só recebe o nome final depois de fechado, então qualquer `*.jsonl.gz`
+pode ser lido direto com `pandas.read_json(path, lines=True)`. As colunas são
+as de `MATCH_FEATURE_COLUMNS` mais `criteria_hash`, `device_id`,
+`heuristic_score`, `model_score` e `logged_at`.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+  import pandas as pd
+except ImportError:  # pragma: no cover - handled em runtime
+  pd = None
+
+from ..schemas import Criterion
+
+logger = logging.getLogger(__name__)
+
+SCORING_LOG_DIR_ENV = "SCORING_LOG_DIR"
+SCORING_LOG_QUEUE_ENV = "SCORING_LOG_QUEUE_SIZE"
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_MAX_FILE_BYTES = 64 * 1024 * 1024
+DEFAULT_ROTATE_SECONDS = 300.0
+PART_SUFFIX = ".part"
+
+# (device_id, feature_payload, heuristic_score, model_score)
+ScoringLogRow = Tuple[str, Dict[str, float], float, Optional[float]]
+
+_STOP = object()
+
+
+def compute_criteria_hash(criterios: Sequence[Criterion]) -> str:
+  """Hash estável dos critérios (independe da ordem) para agrupar linhas por consulta."""
+  payload = sorted((criterio.tipo.strip().lower(), criterio.descricao.strip().lower()) for criterio in criterios)
+  encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+  return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class ScoringLogger:
+  """Fila limitada + thread escritora de arquivos JSONL gzip rotacionados."""
+
+  def __init__(
+    self,
+    directory: Union[str, Path],
+    max_queue: int = DEFAULT_QUEUE_SIZE,
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    rotate_seconds: float = DEFAULT_ROTATE_SECONDS,
+  ):
+    self.directory = Path(directory)
+    self.max_file_bytes = max_file_bytes
+    self.rotate_seconds = rotate_seconds
+    self.dropped = 0
+    self.written = 0
+    self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+    self._thread: Optional[threading.Thread] = None
+    self._start_lock = threading.Lock()
+    self._handle = None
+    self._path: Optional[Path] = None
+    self._opened_at = 0.0
+    self._bytes = 0
+    self._sequence = 0
+
+  def log(self, criteria_hash: str, rows: List[ScoringLogRow]) -> bool:
+    """Enfileira as linhas de uma requisição; devolve False se precisou descartar."""
+    if not rows:
+      return True
+    self._ensure_started()
+    try:
+      self._queue.put_nowait((criteria_hash, time.time(), rows))
+    except queue.Full:
+      self.dropped += 1
+      return False
+    return True
+
+  def close(self, timeout: Optional[float] = 5.0) -> None:
+    """Esvazia a fila, fecha o arquivo atual e encerra a thread escritora."""
+    if self._thread is None:
+      return
+    self._queue.put(_STOP)
+    self._thread.join(timeout)
+    self._thread = None
+
+  def _ensure_started(self) -> None:
+    if self._thread is not None:
+      return
+    with self._start_lock:
+      if self._thread is None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="scoring-log-writer", daemon=True)
+        self._thread.start()
+
+  def _run(self) -> None:
+    while True:
+      try:
+        item = self._queue.get(timeout=self.rotate_seconds)
+      except queue.Empty:
+        self._rotate_if_stale()
+        continue
+      if item is _STOP:
+        self._close_file()
+        return
+      try:
+        self._write(*item)
+      except Exception as exc:  # pragma: no cover - proteção runtime
+        logger.error("Falha ao gravar log de scoring: %s", exc)
+
+  def _write(self, criteria_hash: str, logged_at: float, rows: List[ScoringLogRow]) -> None:
+    self._rotate_if_stale()
+    if self._handle is None:
+      self._open_file()
+    lines = []
+    for device_id, features, heuristic_score, model_score in rows:
+      record = dict(features)
+      record["criteria_hash"] = criteria_hash
+      record["device_id"] = device_id
+      record["heuristic_score"] = heuristic_score
+      record["model_score"] = model_score
+      record["logged_at"] = logged_at
+      lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+    data = ("\n".join(lines) + "\n").encode("utf-8")
+    self._handle.write(data)
+    self._bytes += len(data)
+    self.written += len(rows)
+    if self._bytes >= self.max_file_bytes:
+      self._close_file()
+
+  def _rotate_if_stale(self) -> None:
+    if self._handle is not None and time.monotonic() - self._opened_at >= self.rotate_seconds:
+      self._close_file()
+
+  def _open_file(self) -> None:
+    self._sequence += 1
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    name = f"scoring-{stamp}-{os.getpid()}-{self._sequence:04d}.jsonl.gz"
+    self._path = self.directory / name
+    self._handle = gzip.open(self._path.with_name(name + PART_SUFFIX), "ab")
+    self._opened_at = time.monotonic()
+    self._bytes = 0
+
+  def _close_file(self) -> None:
+    if self._handle is None:
+      return
+    self._handle.close()
+    os.replace(self._path.with_name(self._path.name + PART_SUFFIX), self._path)
+    self._handle = None
+    self._path = None
+
+
+_LOGGER: Optional[ScoringLogger] = None
+_LOGGER_PID: Optional[int] = None
+_LOGGER_LOCK = threading.Lock()
+
+
+def get_scoring_logger() -> Optional[ScoringLogger]:
+  """Logger do processo atual, ou None quando `SCORING_LOG_DIR` não está definido.
+
+  A instância é criada por processo (pid), então workers pré-fork não herdam a
+  fila nem a thread do pai.
+  """
+  global _LOGGER, _LOGGER_PID
+  directory = os.getenv(SCORING_LOG_DIR_ENV)
+  if not directory:
+    return None
+  pid = os.getpid()
+  if _LOGGER is not None and _LOGGER_PID == pid:
+    return _LOGGER
+  with _LOGGER_LOCK:
+    if _LOGGER is None or _LOGGER_PID != pid:
+      max_queue = int(os.getenv(SCORING_LOG_QUEUE_ENV) or DEFAULT_QUEUE_SIZE)
+      _LOGGER = ScoringLogger(directory, max_queue=max_queue)
+      _LOGGER_PID = pid
+  return _LOGGER
+
+
+def close_scoring_logger() -> None:
+  """Grava o que estiver na fila e fecha o arquivo atual (shutdown do app)."""
+  global _LOGGER, _LOGGER_PID
+  if _LOGGER is not None and _LOGGER_PID == os.getpid():
+    _LOGGER.close()
+  _LOGGER = None
+  _LOGGER_PID = None
+
+
+def scoring_log_files(directory: Union[str, Path]) -> List[Path]:
+  """Arquivos já rotacionados (completos), em ordem de nome."""
+  return sorted(Path(directory).glob("scoring-*.jsonl.gz"))
+
+
+def load_scoring_log(paths: Union[str, Path, Iterable[Union[str, Path]]]):
+  """Carrega um diretório (ou lista de arquivos) do log num único DataFrame."""
+  if pd is None:
+    raise RuntimeError("pandas é necessário para carregar o log de scoring")
+  if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+    paths = scoring_log_files(paths)
+  elif isinstance(paths, (str, Path)):
+    paths = [paths]
+  frames = [pd.read_json(path, lines=True, compression="gzip") for path in paths]
+  if not frames:
+    return pd.DataFrame()
+  return pd.concat(frames, ignore_index=True)
+
+
+__all__ = [
+  "SCORING_LOG_DIR_ENV",
+  "ScoringLogger",
+  "close_scoring_logger",
+  "compute_criteria_hash",
+  "get_scoring_logger",
+  "load_scoring_log",
+  "scoring_log_files",
+]
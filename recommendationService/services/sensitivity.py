@@ -0,0 +1,182 @@
+"""Análise de sensibilidade ("e se?") de um pedido de scoring.
+
+Cada perturbação altera os critérios de um pedido: amplia ou desloca a faixa de
+`preco_intervalo`, remove um critério ou reduz um alvo numérico. Todas as
+variantes são avaliadas numa única passada sobre os dispositivos: mapas de
+características e vetores de opinião são montados uma vez, cada coluna de
+critério (score de um critério em todos os dispositivos) é calculada uma vez e
+reaproveitada pelas variantes que não a alteram, e o modelo roda em lote, um
+`predict` por variante.
+
+Os scores de cada variante são os mesmos que `score_source` produziria para os
+critérios perturbados sem deadline e sem `min_score`.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+try:
+  import numpy as np
+except ImportError:  # pragma: no cover - handled em runtime
+  np = None
+
+from ..core.constants import PRICE_TYPE_SET
+from ..core.free_text import expand_free_text_criteria
+from ..core.specs import build_normalized_criteria, parse_price_range
+from ..core.types import NormalizedCriterion
+from ..schemas import Criterion, Perturbation
+from .criterion_matrix import CriterionMatrix
+from .scoring import DeviceSource, build_context_from_normalized
+
+WIDEN_PRICE = "ampliar_preco"
+SHIFT_PRICE = "deslocar_preco"
+DROP_CRITERION = "remover_criterio"
+LOWER_TARGET = "reduzir_alvo"
+NON_NEGATIVE_ACTIONS = (WIDEN_PRICE, LOWER_TARGET)
+
+# Diferença mínima de score para contar um dispositivo como melhor/pior.
+DELTA_TOLERANCE = 1e-4
+
+
+def _format_number(value: float) -> str:
+  return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _price_range_text(min_value: Optional[float], max_value: Optional[float]) -> str:
+  low = _format_number(min_value) if min_value is not None else ""
+  high = _format_number(max_value) if max_value is not None else ""
+  return f"{low}-{high}"
+
+
+def apply_perturbation(
+  criteria: List[NormalizedCriterion],
+  perturbation: Perturbation,
+) -> List[NormalizedCriterion]:
+  """Critérios normalizados com a perturbação aplicada (a lista original não muda).
+
+  Levanta ValueError quando a perturbação não se aplica aos critérios do pedido
+  ou quando `valor` é negativo numa ação que só faz sentido num sentido
+  (ampliar a faixa, reduzir o alvo); `deslocar_preco` aceita os dois sinais.
+  """
+  if perturbation.acao in NON_NEGATIVE_ACTIONS and perturbation.valor < 0:
+    raise ValueError(f"{perturbation.acao} exige valor >= 0")
+  if perturbation.acao in (WIDEN_PRICE, SHIFT_PRICE):
+    if not any(criterio.tipo == "preco_intervalo" for criterio in criteria):
+      raise ValueError("Perturbação de preço exige um critério preco_intervalo")
+    perturbed = []
+    for criterio in criteria:
+      if criterio.tipo != "preco_intervalo":
+        perturbed.append(criterio)
+        continue
+      min_value, max_value = parse_price_range(criterio.descricao)
+      if perturbation.acao == WIDEN_PRICE:
+        min_value = max(0.0, min_value - perturbation.valor) if min_value is not None else None
+        max_value = max_value + perturbation.valor if max_value is not None else None
+      else:
+        min_value = max(0.0, min_value + perturbation.valor) if min_value is not None else None
+        max_value = max(0.0, max_value + perturbation.valor) if max_value is not None else None
+      perturbed.append(
+        NormalizedCriterion(tipo=criterio.tipo, descricao=_price_range_text(min_value, max_value), valor=None)
+      )
+    return perturbed
+
+  tipo = (perturbation.tipo or "").strip().lower()
+  if not any(criterio.tipo == tipo for criterio in criteria):
+    raise ValueError(f"Critério {tipo or '(vazio)'} não existe no pedido")
+  if perturbation.acao == DROP_CRITERION:
+    return [criterio for criterio in criteria if criterio.tipo != tipo]
+
+  perturbed = []
+  for criterio in criteria:
+    if criterio.tipo != tipo:
+      perturbed.append(criterio)
+      continue
+    if criterio.valor is None:
+      raise ValueError(f"Critério {tipo} não tem alvo numérico")
+    # Alvos de preço sobem (orçamento maior); os demais descem.
+    step = perturbation.valor if tipo in PRICE_TYPE_SET else -perturbation.valor
+    target = max(0.0, criterio.valor + step)
+    perturbed.append(NormalizedCriterion(tipo=tipo, descricao=_format_number(target), valor=target))
+  return perturbed
+
+
+def _ranking(scores) -> List[int]:
+  """Ordem do ranking com o mesmo desempate (estável, score com 4 casas) de `score_source`."""
+  rounded = [round(value, 4) for value in scores.tolist()]
+  return sorted(range(len(rounded)), key=rounded.__getitem__, reverse=True)
+
+
+def _describe_criteria(criteria: List[NormalizedCriterion]) -> List[Dict[str, str]]:
+  return [{"tipo": criterio.tipo, "descricao": criterio.descricao} for criterio in criteria]
+
+
+def evaluate_sensitivity(
+  criterios: List[Criterion],
+  source: DeviceSource,
+  positions: Sequence[int],
+  perturbations: List[Perturbation],
+  k: int = 10,
+  min_score: Optional[float] = None,
+) -> Dict[str, object]:
+  """Avalia o pedido original e cada perturbação numa única passada.
+
+  Para cada variante devolve o top-k (com o delta de score e a posição no
+  ranking original), quantos dispositivos melhoram ou pioram e, com
+  `min_score`, quantos passam a alcançar o limite.
+  """
+  if np is None:
+    raise RuntimeError("numpy é necessário para a análise de sensibilidade")
+  base_criteria = expand_free_text_criteria(build_normalized_criteria(criterios))
+  variant_criteria = [apply_perturbation(base_criteria, perturbation) for perturbation in perturbations]
+
+  matrix = CriterionMatrix(source, positions)
+  base_scores = matrix.evaluate(build_context_from_normalized(base_criteria)).final
+  base_order = _ranking(base_scores)
+  base_rank = {index: rank for rank, index in enumerate(base_order)}
+  base_top = set(base_order[:k])
+  base_qualified = base_scores >= min_score if min_score is not None else None
+
+  def top_items(order: List[int], scores) -> List[Dict[str, object]]:
+    return [
+      {
+        "id": matrix.device_ids[index],
+        "finalScore": round(float(scores[index]), 4),
+        "delta": round(float(scores[index] - base_scores[index]), 4),
+        "posicaoBase": base_rank[index] + 1,
+      }
+      for index in order[:k]
+    ]
+
+  variants = []
+  for perturbation, criteria in zip(perturbations, variant_criteria):
+    scores = matrix.evaluate(build_context_from_normalized(criteria)).final
+    order = _ranking(scores)
+    deltas = scores - base_scores
+    variant: Dict[str, object] = {
+      "perturbacao": perturbation.model_dump(),
+      "criterios": _describe_criteria(criteria),
+      "topK": top_items(order, scores),
+      "novosNoTopK": [matrix.device_ids[index] for index in order[:k] if index not in base_top],
+      "melhoram": int(np.count_nonzero(deltas > DELTA_TOLERANCE)),
+      "pioram": int(np.count_nonzero(deltas < -DELTA_TOLERANCE)),
+      "deltaMedio": round(float(deltas.mean()), 4) if len(deltas) else 0.0,
+    }
+    if base_qualified is not None:
+      variant["novosAcimaDoMinimo"] = int(np.count_nonzero((scores >= min_score) & ~base_qualified))
+    variants.append(variant)
+
+  return {
+    "base": {"criterios": _describe_criteria(base_criteria), "topK": top_items(base_order, base_scores)},
+    "variantes": variants,
+    "dispositivos": len(matrix.device_ids),
+    "colunasCalculadas": matrix.columns_computed,
+  }
+
+
+__all__ = [
+  "DROP_CRITERION",
+  "LOWER_TARGET",
+  "SHIFT_PRICE",
+  "WIDEN_PRICE",
+  "apply_perturbation",
+  "evaluate_sensitivity",
+]
@@ -0,0 +1,132 @@
+"""Sessões de ranking para paginar resultados sem pontuar tudo de novo.
+
+Uma sessão guarda o ranking já ordenado (estado intermediário de cada
+dispositivo), o contexto dos critérios e os campos pedidos, sob um token opaco.
+O armazenamento é por processo (cada worker do `serve` tem o seu), com TTL e limite de dispositivos em memória
+(linhas do ranking mais linhas da matriz de critérios); ao estourar o limite,
+as sessões usadas há mais tempo são descartadas. O token começa pelo pid do
+worker dono, para distinguir uma sessão expirada de uma criada em outro worker.
+"""
+
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, FrozenSet, List, Optional
+
+SESSION_TTL_ENV = "RANKING_SESSION_TTL_SECONDS"
+SESSION_MAX_ENTRIES_ENV = "RANKING_SESSION_MAX_ENTRIES"
+DEFAULT_SESSION_TTL = 300.0
+DEFAULT_SESSION_MAX_ENTRIES = 50_000
+
+
+@dataclass(slots=True)
+class RankingSession:
+  """Ranking ordenado (`ScoredDevice`) e o `ScoringContext` que o produziu.
+
+  `matrix` (`CriterionMatrix`) guarda os scores por critério e os vetores dos
+  dispositivos para re-pontuar a sessão quando os critérios mudam.
+  """
+
+  context: Any
+  entries: List[Any]
+  wanted: FrozenSet[str]
+  degradations: List[str] = field(default_factory=list)
+  pruned: int = 0
+  scored: int = 0
+  expires_at: float = 0.0
+  matrix: Any = None
+  min_score: Optional[float] = None
+
+
+def session_size(session: RankingSession) -> int:
+  """Dispositivos que a sessão mantém em memória: ranking e linhas da matriz."""
+  return len(session.entries) + (len(session.matrix) if session.matrix is not None else 0)
+
+
+class RankingSessionStore:
+  """Sessões em LRU com expiração; `max_entries` limita o total de dispositivos guardados."""
+
+  def __init__(
+    self,
+    ttl_seconds: float = DEFAULT_SESSION_TTL,
+    max_entries: int = DEFAULT_SESSION_MAX_ENTRIES,
+    clock: Callable[[], float] = time.monotonic,
+    owner: Optional[str] = None,
+  ):
+    self.ttl_seconds = ttl_seconds
+    self.max_entries = max_entries
+    self.owner = owner or str(os.getpid())
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._sessions: "OrderedDict[str, RankingSession]" = OrderedDict()
+    self._entry_count = 0
+
+  def __len__(self) -> int:
+    return len(self._sessions)
+
+  def put(self, session: RankingSession) -> Optional[str]:
+    """Guarda a sessão e devolve o token; None se o ranking sozinho excede o limite."""
+    size = session_size(session)
+    if size > self.max_entries:
+      return None
+    token = f"{self.owner}.{secrets.token_urlsafe(16)}"
+    with self._lock:
+      now = self._clock()
+      self._expire(now)
+      session.expires_at = now + self.ttl_seconds
+      self._sessions[token] = session
+      self._entry_count += size
+      while self._entry_count > self.max_entries:
+        _, evicted = self._sessions.popitem(last=False)
+        self._entry_count -= session_size(evicted)
+    return token
+
+  def get(self, token: str) -> Optional[RankingSession]:
+    """Sessão ainda válida (renova o TTL e a posição no LRU) ou None."""
+    with self._lock:
+      now = self._clock()
+      session = self._sessions.get(token)
+      if session is None:
+        return None
+      if session.expires_at <= now:
+        self._drop(token)
+        return None
+      session.expires_at = now + self.ttl_seconds
+      self._sessions.move_to_end(token)
+      return session
+
+  def owns(self, token: str) -> bool:
+    """Se o token foi emitido por este armazenamento (mesmo que já tenha expirado)."""
+    return token.partition(".")[0] == self.owner
+
+  def _drop(self, token: str) -> None:
+    session = self._sessions.pop(token)
+    self._entry_count -= session_size(session)
+
+  def _expire(self, now: float) -> None:
+    expired = [token for token, session in self._sessions.items() if session.expires_at <= now]
+    for token in expired:
+      self._drop(token)
+
+
+_STORE: Optional[RankingSessionStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_session_store() -> RankingSessionStore:
+  """Armazenamento de sessões do processo (configurável por variáveis de ambiente)."""
+  global _STORE
+  if _STORE is None:
+    with _STORE_LOCK:
+      if _STORE is None:
+        _STORE = RankingSessionStore(
+          ttl_seconds=float(os.getenv(SESSION_TTL_ENV) or DEFAULT_SESSION_TTL),
+          max_entries=int(os.getenv(SESSION_MAX_ENTRIES_ENV) or DEFAULT_SESSION_MAX_ENTRIES),
+        )
+  return _STORE
+
+
+__all__ = ["RankingSession", "RankingSessionStore", "get_session_store", "session_size"]
@@ -0,0 +1,238 @@
+"""Avaliação em sombra de um modelo candidato, fora do caminho da requisição.
+
+Opt-in via `SHADOW_MODEL_PATH`. O modelo atual continua respondendo; depois do
+scoring, as features já calculadas e os scores do modelo atual entram numa
+fila limitada (descartados quando ela está cheia). Uma thread monta a matriz
+de features, pontua tudo com o candidato num único `predict` em lote e acumula
+correlação de Spearman, sobreposição do top-K e latências numa janela recente.
+A latência do modelo atual é medida da mesma forma, com um `predict` em lote do
+artefato atual sobre a mesma matriz, para que as duas sejam comparáveis.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+try:
+  import joblib
+except ImportError:  # pragma: no cover - handled em runtime
+  joblib = None
+
+try:
+  import numpy as np
+  import pandas as pd
+except ImportError:  # pragma: no cover - handled em runtime
+  np = None
+  pd = None
+
+from ..core.ml_model import MATCH_FEATURE_COLUMNS, MatchModelArtifact, load_match_model
+
+logger = logging.getLogger(__name__)
+
+SHADOW_MODEL_ENV = "SHADOW_MODEL_PATH"
+SHADOW_QUEUE_SIZE = 256
+SHADOW_TOP_K = 10
+SHADOW_WINDOW = 1000
+
+_STOP = object()
+
+
+def rank_correlation(live: Sequence[float], candidate: Sequence[float]) -> Optional[float]:
+  """Correlação de Spearman (postos médios para empates); None sem variação."""
+  if len(live) < 2:
+    return None
+  live_ranks = pd.Series(live).rank()
+  candidate_ranks = pd.Series(candidate).rank()
+  if live_ranks.nunique() < 2 or candidate_ranks.nunique() < 2:
+    return None
+  return float(live_ranks.corr(candidate_ranks))
+
+
+def top_k_overlap(live: Sequence[float], candidate: Sequence[float], k: int) -> float:
+  """Fração dos k primeiros do modelo atual que também estão no top-k do candidato."""
+  size = min(k, len(live))
+  if size == 0:
+    return 1.0
+  live_top = set(np.argsort(-np.asarray(live), kind="stable")[:size].tolist())
+  candidate_top = set(np.argsort(-np.asarray(candidate), kind="stable")[:size].tolist())
+  return len(live_top & candidate_top) / size
+
+
+def _percentiles(values: Deque[float]) -> Dict[str, Optional[float]]:
+  if not values:
+    return {"p50": None, "p95": None}
+  array = np.asarray(values)
+  return {"p50": float(np.percentile(array, 50)), "p95": float(np.percentile(array, 95))}
+
+
+def _mean(values: Deque[float]) -> Optional[float]:
+  return float(sum(values) / len(values)) if values else None
+
+
+def _timed_batch_predict(model: MatchModelArtifact, payloads: List[Dict[str, float]]):
+  """Scores de um único `predict` em lote e o tempo gasto só nele."""
+  names = model.feature_names
+  matrix = np.array([[payload.get(name, 0.0) for name in names] for payload in payloads], dtype=np.float64)
+  frame = pd.DataFrame(matrix, columns=names)
+  started = time.perf_counter()
+  scores = model.estimator.predict(frame)
+  return np.asarray(scores, dtype=np.float64), time.perf_counter() - started
+
+
+class ShadowEvaluator:
+  """Fila limitada + thread que compara o candidato com o modelo atual."""
+
+  def __init__(
+    self,
+    model_path: Union[str, Path],
+    max_queue: int = SHADOW_QUEUE_SIZE,
+    top_k: int = SHADOW_TOP_K,
+    window: int = SHADOW_WINDOW,
+    live_model_provider: Callable[[], Optional[MatchModelArtifact]] = load_match_model,
+  ):
+    self.model_path = Path(model_path)
+    self._live_model_provider = live_model_provider
+    self.top_k = top_k
+    self.submitted = 0
+    self.dropped = 0
+    self.evaluated = 0
+    self.failures = 0
+    self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+    self._thread: Optional[threading.Thread] = None
+    self._start_lock = threading.Lock()
+    self._stats_lock = threading.Lock()
+    self._model: Optional[MatchModelArtifact] = None
+    self._correlations: Deque[float] = deque(maxlen=window)
+    self._overlaps: Deque[float] = deque(maxlen=window)
+    self._abs_diffs: Deque[float] = deque(maxlen=window)
+    self._candidate_ms: Deque[float] = deque(maxlen=window)
+    self._live_ms: Deque[float] = deque(maxlen=window)
+
+  def submit(self, payloads: List[Dict[str, float]], live_scores: List[float]) -> bool:
+    """Enfileira um ranking já pontuado; devolve False se precisou descartar."""
+    if not payloads:
+      return True
+    self._ensure_started()
+    try:
+      self._queue.put_nowait((payloads, live_scores))
+    except queue.Full:
+      with self._stats_lock:
+        self.dropped += 1
+      return False
+    with self._stats_lock:
+      self.submitted += 1
+    return True
+
+  def close(self, timeout: Optional[float] = 5.0) -> None:
+    """Processa o que estiver na fila e encerra a thread."""
+    if self._thread is None:
+      return
+    self._queue.put(_STOP)
+    self._thread.join(timeout)
+    self._thread = None
+
+  def report(self) -> Dict[str, Any]:
+    with self._stats_lock:
+      return {
+        "candidato": str(self.model_path),
+        "k": self.top_k,
+        "enfileiradas": self.submitted,
+        "avaliadas": self.evaluated,
+        "descartadas": self.dropped,
+        "falhas": self.failures,
+        "spearmanMedio": _mean(self._correlations),
+        "topKOverlapMedio": _mean(self._overlaps),
+        "diferencaMediaAbsoluta": _mean(self._abs_diffs),
+        "latenciaCandidatoMs": _percentiles(self._candidate_ms),
+        "latenciaAtualMs": _percentiles(self._live_ms),
+      }
+
+  def _ensure_started(self) -> None:
+    if self._thread is not None:
+      return
+    with self._start_lock:
+      if self._thread is None:
+        self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+        self._thread.start()
+
+  def _load_model(self) -> MatchModelArtifact:
+    if self._model is None:
+      artifact = joblib.load(self.model_path)
+      if not isinstance(artifact, MatchModelArtifact):
+        artifact = MatchModelArtifact(feature_names=MATCH_FEATURE_COLUMNS.copy(), estimator=artifact)
+      self._model = artifact
+    return self._model
+
+  def _run(self) -> None:
+    while True:
+      item = self._queue.get()
+      if item is _STOP:
+        return
+      try:
+        self._evaluate(*item)
+      except Exception as exc:  # pragma: no cover - proteção runtime
+        with self._stats_lock:
+          self.failures += 1
+        logger.error("Falha na avaliação em sombra: %s", exc)
+
+  def _evaluate(self, payloads: List[Dict[str, float]], live_scores: List[float]) -> None:
+    model = self._load_model()
+    candidate_scores, candidate_seconds = _timed_batch_predict(model, payloads)
+    candidate_scores = np.clip(candidate_scores, 0.0, 1.0)
+    live_model = self._live_model_provider()
+    live_seconds = _timed_batch_predict(live_model, payloads)[1] if live_model is not None else None
+    live = np.asarray(live_scores, dtype=np.float64)
+    correlation = rank_correlation(live, candidate_scores)
+    with self._stats_lock:
+      self.evaluated += 1
+      if correlation is not None:
+        self._correlations.append(correlation)
+      self._overlaps.append(top_k_overlap(live, candidate_scores, self.top_k))
+      self._abs_diffs.append(float(np.mean(np.abs(live - candidate_scores))))
+      self._candidate_ms.append(candidate_seconds * 1000)
+      if live_seconds is not None:
+        self._live_ms.append(live_seconds * 1000)
+
+
+_EVALUATOR: Optional[ShadowEvaluator] = None
+_EVALUATOR_PID: Optional[int] = None
+_EVALUATOR_LOCK = threading.Lock()
+
+
+def get_shadow_evaluator() -> Optional[ShadowEvaluator]:
+  """Avaliador do processo atual, ou None quando `SHADOW_MODEL_PATH` não está definido."""
+  global _EVALUATOR, _EVALUATOR_PID
+  model_path = os.getenv(SHADOW_MODEL_ENV)
+  if not model_path or joblib is None or np is None:
+    return None
+  pid = os.getpid()
+  if _EVALUATOR is not None and _EVALUATOR_PID == pid:
+    return _EVALUATOR
+  with _EVALUATOR_LOCK:
+    if _EVALUATOR is None or _EVALUATOR_PID != pid:
+      _EVALUATOR = ShadowEvaluator(model_path)
+      _EVALUATOR_PID = pid
+  return _EVALUATOR
+
+
+def close_shadow_evaluator() -> None:
+  global _EVALUATOR, _EVALUATOR_PID
+  if _EVALUATOR is not None and _EVALUATOR_PID == os.getpid():
+    _EVALUATOR.close()
+  _EVALUATOR = None
+  _EVALUATOR_PID = None
+
+
+__all__ = [
+  "SHADOW_MODEL_ENV",
+  "ShadowEvaluator",
+  "close_shadow_evaluator",
+  "get_shadow_evaluator",
+  "rank_correlation",
+  "top_k_overlap",
+]
@@ -0,0 +1,66 @@
+"""Consultas top-K de similaridade de opinião sobre o catálogo em memória."""
+
+from typing import Dict, List, Sequence, Tuple
+
+from ..core.free_text import expand_free_text_criteria
+from ..core.preferences import aspect_weights, prefs_to_target
+from ..core.specs import build_normalized_criteria
+from ..core.vector_index import VECTOR_ASPECTS
+from ..schemas import Criterion
+from .catalog import Catalog
+from .scoring import derive_preferences
+
+
+def _to_similarity(distance: float, denom: float) -> float:
+  """Converte a distância L1 ponderada no mesmo score de `compute_opinion_similarity`."""
+  return max(0.0, 1 - min(1.0, distance / denom))
+
+
+def _rank(
+  catalog: Catalog,
+  neighbours: List[Tuple[float, int]],
+  denom: float,
+) -> List[Dict[str, object]]:
+  return [
+    {
+      "id": catalog.vector_index.device_ids[position],
+      "opinionSim": round(_to_similarity(distance, denom), 4),
+    }
+    for distance, position in neighbours
+  ]
+
+
+def top_k_by_preferences(
+  catalog: Catalog,
+  criterios: List[Criterion],
+  k: int,
+) -> List[Dict[str, object]]:
+  """Dispositivos do catálogo mais próximos do vetor alvo derivado dos critérios."""
+  structured_criteria = expand_free_text_criteria(build_normalized_criteria(criterios))
+  prefs, weights = derive_preferences(structured_criteria)
+  target = prefs_to_target(prefs)
+  w = aspect_weights(weights)
+  target_point = [target[aspect] for aspect in VECTOR_ASPECTS]
+  weight_vector = [w[aspect] for aspect in VECTOR_ASPECTS]
+  denom = sum(weight_vector) or 1.0
+  neighbours = catalog.vector_index.query(target_point, weight_vector, k)
+  return _rank(catalog, neighbours, denom)
+
+
+def similar_devices(
+  catalog: Catalog,
+  device_id: str,
+  k: int,
+  weights: Sequence[float] = (1.0, 1.0, 1.0, 1.0),
+) -> List[Dict[str, object]]:
+  """Vizinhos mais próximos de um dispositivo do catálogo (excluindo ele mesmo)."""
+  position = catalog.vector_index.position_of(device_id)
+  if position is None:
+    raise KeyError(device_id)
+  point = catalog.vector_index.points[position]
+  denom = sum(weights) or 1.0
+  neighbours = catalog.vector_index.query(point, weights, k, exclude=position)
+  return _rank(catalog, neighbours, denom)
+
+
+__all__ = ["similar_devices", "top_k_by_preferences"]
@@ -0,0 +1,37 @@
+"""Fábricas de dados compartilhadas pelos testes."""
+
+import random
+
+from recommendationService.schemas import (
+  AspectScores,
+  DeviceCharacteristic,
+  DeviceInput,
+)
+
+
+def build_random_devices(total, seed=7):
+  """Dispositivos determinísticos com specs variadas, alguns sem bateria e sem preço."""
+  rng = random.Random(seed)
+  dispositivos = []
+  for index in range(total):
+    caracteristicas = [
+      DeviceCharacteristic(tipo="ram", descricao=str(rng.choice([3, 4, 6, 8, 12]))),
+      DeviceCharacteristic(tipo="rom", descricao=f"{rng.choice([64, 128, 256])} GB"),
+      DeviceCharacteristic(tipo="processor", descricao=rng.choice(["Snapdragon 7", "Helio G85"])),
+    ]
+    if index % 4:
+      caracteristicas.append(DeviceCharacteristic(tipo="battery", descricao=str(rng.randint(3500, 6500))))
+    dispositivos.append(
+      DeviceInput(
+        id=f"device-{index}",
+        preco=rng.randint(700, 4000) if index % 5 else None,
+        caracteristicas=caracteristicas,
+        aspect_scores=AspectScores(
+          camera=round(rng.random(), 2),
+          bateria=round(rng.random(), 2),
+          preco=round(rng.random(), 2),
+          desempenho=round(rng.random(), 2),
+        ),
+      )
+    )
+  return dispositivos
@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from recommendationService.schemas import ReviewMetricScore
+from recommendationService.services.aspect_aggregates import (
+  AspectAggregateStore,
+  consolidate_snapshots,
+  snapshot_files,
+)
+
+DAY = 86400.0
+
+
+def review(device_id, metrica, score, timestamp=None):
+  return ReviewMetricScore(dispositivo_id=device_id, metrica=metrica, score=score, timestamp=timestamp)
+
+
+class AspectAggregateStoreTests(unittest.TestCase):
+  def test_counts_means_and_recency_weighting(self):
+    store = AspectAggregateStore(half_life_days=30, clock=lambda: 100 * DAY)
+    aggregates, ignored = store.ingest(
+      [
+        review("a", "qualidade-camera", 2.0, timestamp=10 * DAY),
+        review("a", "qualidade-camera", 5.0, timestamp=100 * DAY),
+        review("a", "durabilidade", 4.0),
+        review("b", "bateria", 0.8),
+      ]
+    )
+
+    self.assertEqual(ignored, 1)
+    a = aggregates["a"]
+    self.assertEqual(a["contagens"]["camera"], 2)
+    self.assertEqual(a["medias"]["camera"], 0.7)
+    # A nota antiga (3 meias-vidas atrás) pesa 1/8: (0.4/8 + 1.0) / (1/8 + 1).
+    self.assertAlmostEqual(a["aspect_scores"]["camera"], round((0.4 / 8 + 1.0) / 1.125, 4))
+    self.assertIsNone(a["aspect_scores"]["bateria"])
+    self.assertEqual(aggregates["b"]["aspect_scores"]["bateria"], 0.8)
+
+  def test_batches_are_incremental_and_order_independent(self):
+    reviews = [review("a", "duracao-bateria", score, timestamp=day * DAY) for day, score in enumerate([3, 4, 5, 2, 1])]
+    in_order = AspectAggregateStore(half_life_days=2)
+    shuffled = AspectAggregateStore(half_life_days=2)
+
+    in_order.ingest(reviews[:2])
+    in_order.ingest(reviews[2:])
+    shuffled.ingest([reviews[4], reviews[1], reviews[3], reviews[0], reviews[2]])
+
+    self.assertAlmostEqual(
+      in_order.get("a")["aspect_scores"]["bateria"], shuffled.get("a")["aspect_scores"]["bateria"], places=4
+    )
+    self.assertEqual(in_order.get("a")["contagens"]["bateria"], 5)
+
+  def test_snapshot_round_trip(self):
+    now = [0.0]
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp) / "aspects.json.gz"
+      store = AspectAggregateStore(snapshot_path=path, snapshot_seconds=60, clock=lambda: now[0])
+      store.ingest([review("a", "camera", 0.9), review("b", "custo-beneficio", 3.0)])
+      self.assertFalse(store.shard_path.exists())
+
+      now[0] = 61.0
+      store.ingest([review("a", "camera", 0.7)])
+      self.assertTrue(store.shard_path.exists())
+      self.assertFalse(store.dirty)
+
+      restored = AspectAggregateStore(snapshot_path=path)
+      self.assertEqual(len(restored), 2)
+      self.assertEqual(restored.get("a"), store.get("a"))
+      self.assertEqual(restored.get("b")["aspect_scores"]["preco"], 0.6)
+
+  def test_worker_shards_merge_without_double_counting(self):
+    reviews = [review("a", "camera", score, timestamp=day * DAY) for day, score in enumerate([0.2, 0.9, 0.5, 0.7])]
+    single = AspectAggregateStore(half_life_days=2)
+    single.ingest(reviews)
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp) / "aspects.json.gz"
+      # Dois workers, cada um com metade dos lotes, gravando no mesmo ASPECT_STORE_PATH.
+      first = AspectAggregateStore(half_life_days=2, snapshot_path=path)
+      second = AspectAggregateStore(half_life_days=2, snapshot_path=path)
+      first.ingest(reviews[::2])
+      second.ingest(reviews[1::2])
+      first.snapshot()
+      second.snapshot()
+      self.assertNotEqual(first.shard_path, second.shard_path)
+
+      self.assertEqual(consolidate_snapshots(path, half_life_days=2), 1)
+      self.assertEqual(snapshot_files(path), [path])
+      restarted = AspectAggregateStore(half_life_days=2, snapshot_path=path)
+      restarted.ingest([review("a", "camera", 1.0, timestamp=4 * DAY)])
+      restarted.snapshot()
+      reopened = AspectAggregateStore(half_life_days=2, snapshot_path=path)
+
+    single.ingest([review("a", "camera", 1.0, timestamp=4 * DAY)])
+    self.assertEqual(reopened.get("a"), single.get("a"))
+    self.assertEqual(reopened.get("a")["contagens"]["camera"], 5)
+
+  def test_timestamp_must_be_in_seconds(self):
+    with self.assertRaises(ValidationError):
+      review("a", "camera", 0.5, timestamp=1_760_000_000_000)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from recommendationService import matching
+from recommendationService.schemas import Criterion
+from recommendationService.services import catalog as catalog_module
+from recommendationService.services.catalog_snapshot import CatalogSnapshot, write_snapshot
+from recommendationService.tests.factories import build_random_devices
+
+
+class CatalogSnapshotTests(unittest.TestCase):
+  def setUp(self):
+    self.tempdir = tempfile.TemporaryDirectory()
+    self.path = Path(self.tempdir.name) / "catalog.mmcat"
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="processor", descricao="snapdragon"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+
+  def tearDown(self):
+    catalog_module.reset_catalog()
+    self.tempdir.cleanup()
+
+  def test_snapshot_scores_match_request_payload(self):
+    dispositivos = build_random_devices(120)
+    write_snapshot(dispositivos, self.path, "v1")
+    snapshot = CatalogSnapshot(self.path)
+
+    self.assertEqual(len(snapshot), 120)
+    self.assertEqual(snapshot.version, "v1")
+    for min_score in (None, 0.6):
+      expected = matching.score_devices_with_outcome(self.criterios, dispositivos, min_score=min_score)
+      outcome = matching.score_catalog_devices(self.criterios, snapshot, min_score=min_score)
+      self.assertEqual(outcome.scores, expected.scores)
+
+  def test_catalog_follows_atomic_replacement(self):
+    with mock.patch.dict(os.environ, {catalog_module.CATALOG_SNAPSHOT_ENV: str(self.path)}), \
+        mock.patch.object(catalog_module, "SNAPSHOT_REFRESH_INTERVAL", 0.0):
+      first = catalog_module.load_catalog(build_random_devices(10))
+      self.assertIsInstance(first, CatalogSnapshot)
+      self.assertIs(catalog_module.get_catalog(), first)
+
+      write_snapshot(build_random_devices(25, seed=3), self.path, "v2")
+      refreshed = catalog_module.get_catalog()
+
+    self.assertEqual(len(refreshed), 25)
+    self.assertEqual(refreshed.version, "v2")
+    self.assertEqual(first.device_id(0), "device-0")
+
+
+if __name__ == "__main__":
+  unittest.main()
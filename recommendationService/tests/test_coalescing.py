@@ -0,0 +1,105 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from recommendationService import main
+from recommendationService.schemas import ScoreRequest
+from recommendationService.services.coalescing import SingleFlight
+from recommendationService.services.scoring import score_devices_with_outcome
+
+
+def build_request(ram="8", formato="padrao"):
+  return ScoreRequest(
+    criterios=[{"tipo": "ram", "descricao": ram}],
+    dispositivos=[
+      {"id": f"d{index}", "caracteristicas": [{"tipo": "ram", "descricao": str(index % 12)}]}
+      for index in range(10)
+    ],
+    formato=formato,
+  )
+
+
+class SingleFlightTests(unittest.TestCase):
+  def test_concurrent_calls_share_one_computation(self):
+    flights = SingleFlight()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+      calls.append(1)
+      started.set()
+      release.wait()
+      return object()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+      leader = executor.submit(flights.do, "key", compute)
+      started.wait(1)
+      followers = [executor.submit(flights.do, "key", compute) for _ in range(7)]
+      while flights.stats()["coalescidas"] < 7:
+        time.sleep(0.001)
+      release.set()
+      results = [leader.result()] + [future.result() for future in followers]
+
+    self.assertEqual(len(calls), 1)
+    self.assertEqual(len({id(result) for result, _ in results}), 1)
+    self.assertEqual([shared for _, shared in results], [False] + [True] * 7)
+    self.assertEqual(flights.stats(), {"executadas": 1, "coalescidas": 7, "emAndamento": 0})
+
+  def test_error_reaches_every_waiter_and_key_is_released(self):
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+      started.set()
+      release.wait()
+      raise ValueError("falhou")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+      leader = executor.submit(flights.do, "key", failing)
+      started.wait(1)
+      follower = executor.submit(flights.do, "key", failing)
+      while flights.stats()["coalescidas"] < 1:
+        time.sleep(0.001)
+      release.set()
+      for future in (leader, follower):
+        with self.assertRaises(ValueError):
+          future.result()
+
+    self.assertEqual(flights.do("key", lambda: 1), (1, False))
+
+
+class EndpointCoalescingTests(unittest.TestCase):
+  def test_identical_concurrent_requests_run_scorer_once(self):
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def slow_score(*args):
+      calls.append(args)
+      time.sleep(0.2)
+      return score_devices_with_outcome(*args)
+
+    formatos = ["padrao", "compacto"] * 4
+
+    def request(formato):
+      barrier.wait()
+      return main.score_dispositivos(build_request(formato=formato))
+
+    with mock.patch.object(main, "_score_flights", SingleFlight()), \
+        mock.patch.object(main, "score_devices_with_outcome", side_effect=slow_score):
+      with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(request, formatos))
+      main.score_dispositivos(build_request(ram="4"))
+      stats = main._score_flights.stats()
+
+    self.assertEqual(len(calls), 2)
+    self.assertEqual(stats, {"executadas": 2, "coalescidas": 7, "emAndamento": 0})
+    standard = [response.scores for response in responses if hasattr(response, "scores")]
+    self.assertTrue(all(scores == standard[0] for scores in standard))
+
+
+if __name__ == "__main__":
+  unittest.main()
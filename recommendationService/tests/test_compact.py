@@ -0,0 +1,45 @@
+import unittest
+
+from recommendationService import matching
+from recommendationService.schemas import CompactScoreResponse, Criterion
+from recommendationService.services.compact import encode_compact_scores, expand_compact_scores
+from recommendationService.tests.factories import build_random_devices
+
+
+class CompactEncodingTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="battery", descricao="5000"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+    self.dispositivos = build_random_devices(60)
+
+  def test_round_trip_restores_full_scores(self):
+    scores = matching.score_devices(self.criterios, self.dispositivos)
+
+    compact = encode_compact_scores(scores)
+
+    self.assertEqual(expand_compact_scores(compact), scores)
+    self.assertEqual(len(compact["explicacoes"]), 1)
+    distinct = {text for item in scores for text in item["justificativas"]}
+    self.assertEqual(sorted(compact["justificativas"]), sorted(distinct))
+    serialized = CompactScoreResponse(**compact).model_dump()
+    self.assertEqual(expand_compact_scores(serialized), scores)
+
+  def test_round_trip_with_projected_fields(self):
+    scores = matching.score_devices(
+      self.criterios, self.dispositivos, fields=["matchScore", "justificativas"]
+    )
+
+    compact = encode_compact_scores(scores)
+
+    self.assertEqual(compact["colunas"], ["id", "matchScore", "justificativas"])
+    self.assertEqual(expand_compact_scores(compact), scores)
+
+  def test_empty_scores(self):
+    self.assertEqual(expand_compact_scores(encode_compact_scores([])), [])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,84 @@
+import time
+import unittest
+from unittest import mock
+
+from recommendationService import matching
+from recommendationService.schemas import Criterion
+from recommendationService.services import scoring
+from recommendationService.tests.factories import build_random_devices
+from recommendationService.utils.deadline import Deadline
+
+
+def slow_model(delay):
+  def predict(feature_payload, fallback):
+    time.sleep(delay)
+    return 1.0 - fallback
+
+  return predict
+
+
+class DeadlineScoringTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+
+  def test_without_deadline_keeps_full_response(self):
+    outcome = matching.score_devices_with_outcome(self.criterios, build_random_devices(5))
+
+    self.assertEqual(outcome.degradations, [])
+    self.assertEqual(len(outcome.scores), 5)
+    self.assertTrue(all(item["justificativas"] for item in outcome.scores))
+
+  def test_slow_model_falls_back_to_heuristic_score(self):
+    dispositivos = build_random_devices(20)
+    with mock.patch.object(scoring, "predict_match_score", side_effect=slow_model(0.02)):
+      outcome = matching.score_devices_with_outcome(
+        self.criterios, dispositivos, Deadline(0.1)
+      )
+      reference = matching.score_devices_with_outcome(self.criterios, dispositivos)
+
+    self.assertEqual(outcome.degradations, [scoring.DEGRADATION_HEURISTIC_SCORE])
+    self.assertEqual(len(outcome.scores), 20)
+    self.assertTrue(all(item["justificativas"] for item in outcome.scores))
+    self.assertNotEqual(
+      [item["id"] for item in outcome.scores],
+      [item["id"] for item in reference.scores],
+    )
+
+  def test_model_cost_is_projected_with_the_deadline_clock(self):
+    now = [0.0]
+
+    def predict(feature_payload, fallback):
+      now[0] += 3.0
+      return fallback
+
+    deadline = Deadline(10, clock=lambda: now[0])
+    with mock.patch.object(scoring, "predict_match_score", side_effect=predict) as model:
+      outcome = matching.score_devices_with_outcome(self.criterios, build_random_devices(10), deadline)
+
+    # Depois do primeiro dispositivo (3 s), os 9 restantes custariam 27 s com 7 s sobrando.
+    self.assertEqual(model.call_count, 1)
+    self.assertEqual(outcome.degradations, [scoring.DEGRADATION_HEURISTIC_SCORE])
+
+  def test_expired_deadline_returns_partial_ranking(self):
+    ticks = iter(range(100))
+    deadline = Deadline(2.5, clock=lambda: float(next(ticks)))
+
+    outcome = matching.score_devices_with_outcome(self.criterios, build_random_devices(10), deadline)
+
+    self.assertEqual(
+      outcome.degradations,
+      [
+        scoring.DEGRADATION_HEURISTIC_SCORE,
+        scoring.DEGRADATION_SKIPPED_JUSTIFICATIVAS,
+        scoring.DEGRADATION_PARTIAL_RANKING,
+      ],
+    )
+    self.assertLess(len(outcome.scores), 10)
+    self.assertTrue(all(item["justificativas"] == [] for item in outcome.scores))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from collections import Counter
+
+from recommendationService import matching
+from recommendationService.core.device_features import build_caracteristica_map, performance_level_from_ram
+from recommendationService.core.specs import get_device_price_from_map, price_level_from_value
+from recommendationService.schemas import Criterion
+from recommendationService.services.catalog import DeviceCatalog
+from recommendationService.tests.factories import build_random_devices
+from recommendationService.utils.numeric import parse_value
+
+
+class FacetTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+    self.dispositivos = build_random_devices(120, seed=13)
+
+  def expected_facets(self, ids):
+    by_id = {dispositivo.id: build_caracteristica_map(dispositivo) for dispositivo in self.dispositivos}
+    maps = [by_id[device_id] for device_id in ids]
+    ram = Counter(performance_level_from_ram(parse_value(m["ram"])) for m in maps if "ram" in m)
+    prices = [get_device_price_from_map(m) for m in maps]
+    preco = Counter(price_level_from_value(price) for price in prices if price is not None)
+    return ram, preco
+
+  def assert_facets(self, outcome):
+    ids = [item["id"] for item in outcome.scores]
+    ram, preco = self.expected_facets(ids)
+    self.assertEqual({level: count for level, count in outcome.facets["ram"].items() if count}, dict(ram))
+    self.assertEqual({level: count for level, count in outcome.facets["preco"].items() if count}, dict(preco))
+    self.assertEqual(sum(outcome.histogram["contagens"]), len(ids))
+    self.assertEqual(len(outcome.histogram["limites"]), len(outcome.histogram["contagens"]) + 1)
+
+  def test_facets_match_scalar_levels_over_ranked_set(self):
+    outcome = matching.score_devices_with_outcome(
+      self.criterios, self.dispositivos, min_score=0.5, facets=True
+    )
+
+    self.assertGreater(outcome.pruned, 0)
+    self.assert_facets(outcome)
+
+  def test_facets_cover_full_ranking_not_only_page(self):
+    catalog = DeviceCatalog(self.dispositivos)
+    outcome = matching.score_catalog_devices(self.criterios, catalog, limit=5, facets=True)
+    full = matching.score_catalog_devices(self.criterios, catalog)
+
+    self.assertEqual(len(outcome.scores), 5)
+    self.assertEqual(sum(outcome.histogram["contagens"]), len(full.scores))
+    _, preco = self.expected_facets([item["id"] for item in full.scores])
+    self.assertEqual(sum(outcome.facets["preco"].values()), sum(preco.values()))
+
+  def test_facets_are_opt_in(self):
+    outcome = matching.score_devices_with_outcome(self.criterios, self.dispositivos)
+
+    self.assertIsNone(outcome.facets)
+    self.assertIsNone(outcome.histogram)
+
+
+if __name__ == "__main__":
+  unittest.main()
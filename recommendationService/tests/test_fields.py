@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+
+from recommendationService import matching
+from recommendationService.schemas import Criterion, ScoreResponse
+from recommendationService.services import scoring
+from recommendationService.services.scoring import RequestDeviceSource
+from recommendationService.tests.factories import build_random_devices
+
+
+class FieldProjectionTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+    self.dispositivos = build_random_devices(30)
+
+  def test_listing_fields_skip_justificativas_and_explanation(self):
+    with mock.patch.object(scoring, "build_justificativas") as justificativas, \
+        mock.patch.object(scoring, "build_match_explanation") as explanation:
+      scores = matching.score_devices(
+        self.criterios, self.dispositivos, fields=["finalScore", "matchScore"]
+      )
+
+    justificativas.assert_not_called()
+    explanation.assert_not_called()
+    self.assertEqual(set(scores[0]), {"id", "finalScore", "matchScore"})
+    full = matching.score_devices(self.criterios, self.dispositivos)
+    self.assertEqual([item["id"] for item in scores], [item["id"] for item in full])
+    serialized = ScoreResponse(scores=scores).model_dump(exclude_unset=True)
+    self.assertEqual(set(serialized["scores"][0]), {"id", "finalScore", "matchScore"})
+
+  def test_explain_matches_full_response(self):
+    full = {item["id"]: item for item in matching.score_devices(self.criterios, self.dispositivos)}
+
+    explanation = matching.explain_device(
+      self.criterios, RequestDeviceSource(self.dispositivos), 4
+    )
+
+    expected = full[self.dispositivos[4].id]
+    self.assertEqual(explanation["justificativas"], expected["justificativas"])
+    self.assertEqual(explanation["matchExplanation"], expected["matchExplanation"])
+
+
+if __name__ == "__main__":
+  unittest.main()
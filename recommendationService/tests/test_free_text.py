@@ -0,0 +1,120 @@
+import unittest
+
+from recommendationService import matching
+from recommendationService.core.free_text import (
+  expand_free_text_criteria,
+  extract_free_text_criteria,
+)
+from recommendationService.core.specs import build_normalized_criteria
+from recommendationService.schemas import Criterion
+from recommendationService.tests.factories import build_random_devices
+
+
+def as_dict(extraction):
+  return {tipo: descricao for tipo, descricao, _ in extraction.criterios}
+
+
+class FreeTextExtractionTests(unittest.TestCase):
+  def test_units_phrases_and_levels(self):
+    extraction = extract_free_text_criteria(
+      "Quero celular com 6GB RAM, tela gigante, bateria que dure o dia todo e câmera frontal boa"
+    )
+
+    self.assertEqual(
+      as_dict(extraction),
+      {"ram": "6", "screen_size": "6.8", "battery": "5000", "front_camera": "32"},
+    )
+    self.assertTrue(extraction.confident)
+
+  def test_price_and_storage(self):
+    extraction = extract_free_text_criteria("até 2000 reais, 128gb de armazenamento e 5000mah")
+
+    self.assertEqual(
+      as_dict(extraction),
+      {"preco_intervalo": "0-2000", "rom": "128", "battery": "5000"},
+    )
+    self.assertEqual(as_dict(extract_free_text_criteria("entre 1500 e 2500")), {"preco_intervalo": "1500-2500"})
+    self.assertEqual(as_dict(extract_free_text_criteria("celular barato")), {"preco_intervalo": "0-1500"})
+
+  def test_thousands_separator_in_price(self):
+    extraction = extract_free_text_criteria("até R$ 1.500")
+
+    self.assertEqual(as_dict(extraction), {"preco_intervalo": "0-1500"})
+    self.assertEqual(as_dict(extract_free_text_criteria("acima de 2.500 reais")), {"preco_intervalo": "2500-99999"})
+
+  def test_quantities_attach_to_nearest_keyword(self):
+    extraction = extract_free_text_criteria("quero 8gb de ram e 128gb de armazenamento")
+
+    self.assertEqual(as_dict(extraction), {"ram": "8", "rom": "128"})
+    self.assertTrue(extraction.confident)
+    self.assertEqual(as_dict(extract_free_text_criteria("8gb ram 128gb armazenamento")), {"ram": "8", "rom": "128"})
+
+  def test_ambiguous_attribution_is_not_confident(self):
+    extraction = extract_free_text_criteria("ram 8gb armazenamento 128gb")
+
+    self.assertFalse(extraction.confident)
+
+  def test_decimal_comma_is_not_a_clause_break(self):
+    extraction = extract_free_text_criteria("tela de 6,7 polegadas e 120hz")
+
+    self.assertEqual(as_dict(extraction), {"screen_size": "6.7", "refresh_rate": "120"})
+
+  def test_unknown_text_is_not_confident(self):
+    extraction = extract_free_text_criteria("quero um celular azul bonito da samsung")
+
+    self.assertEqual(extraction.criterios, ())
+    self.assertFalse(extraction.confident)
+    partial = extract_free_text_criteria("bateria boa, cor azul, marca samsung e design bonito")
+    self.assertEqual(as_dict(partial), {"battery": "5000"})
+    self.assertFalse(partial.confident)
+
+  def test_memoized_by_normalized_text(self):
+    self.assertIs(
+      extract_free_text_criteria("Câmera  BOA"),
+      extract_free_text_criteria("camera boa"),
+    )
+
+  def test_explicit_criteria_take_precedence(self):
+    criterios = build_normalized_criteria([
+      Criterion(tipo="ram", descricao="12"),
+      Criterion(tipo="texto_livre", descricao="4gb de ram e bateria de 6000mah"),
+    ])
+
+    expanded = expand_free_text_criteria(criterios)
+
+    self.assertEqual([(c.tipo, c.descricao) for c in expanded], [("ram", "12"), ("battery", "6000")])
+
+  def test_low_confidence_extraction_does_not_change_scoring(self):
+    extraction = extract_free_text_criteria("jogar free fire")
+    self.assertEqual(as_dict(extraction), {"benchmark": "1000000"})
+    self.assertFalse(extraction.confident)
+
+    criterios = build_normalized_criteria([
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="texto_livre", descricao="jogar free fire"),
+    ])
+    self.assertEqual([(c.tipo, c.descricao) for c in expand_free_text_criteria(criterios)], [("ram", "8")])
+
+    dispositivos = build_random_devices(20)
+    self.assertEqual(
+      matching.score_devices(
+        [Criterion(tipo="ram", descricao="8"), Criterion(tipo="texto_livre", descricao="jogar free fire")], dispositivos
+      ),
+      matching.score_devices([Criterion(tipo="ram", descricao="8")], dispositivos),
+    )
+
+  def test_scoring_uses_free_text(self):
+    dispositivos = build_random_devices(20)
+    free_text = matching.score_devices(
+      [Criterion(tipo="texto_livre", descricao="8gb de ram e até 2000 reais")], dispositivos
+    )
+    structured = matching.score_devices(
+      [Criterion(tipo="ram", descricao="8"), Criterion(tipo="preco_intervalo", descricao="0-2000")],
+      dispositivos,
+    )
+
+    self.assertEqual(free_text, structured)
+
+
+if __name__ == "__main__":
+  unittest.main()
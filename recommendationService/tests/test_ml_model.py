@@ -0,0 +1,50 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from recommendationService.core import ml_model
+
+
+class _ConstantEstimator:
+  def predict(self, rows):
+    return [0.42 for _ in range(len(rows))]
+
+
+class ModelLoadingTests(unittest.TestCase):
+  def setUp(self):
+    self._previous = (ml_model._MODEL_CACHE, ml_model._MODEL_CACHE_PATH)
+    ml_model._MODEL_CACHE = None
+    ml_model._MODEL_CACHE_PATH = None
+
+  def tearDown(self):
+    ml_model._MODEL_CACHE, ml_model._MODEL_CACHE_PATH = self._previous
+
+  def test_concurrent_first_requests_load_artifact_once(self):
+    calls = []
+
+    def slow_load(path):
+      calls.append(path)
+      time.sleep(0.05)
+      return _ConstantEstimator()
+
+    barrier = threading.Barrier(16)
+    models = []
+
+    def worker():
+      barrier.wait()
+      models.append(ml_model.load_match_model())
+
+    with mock.patch.object(ml_model.joblib, "load", side_effect=slow_load):
+      threads = [threading.Thread(target=worker) for _ in range(16)]
+      for thread in threads:
+        thread.start()
+      for thread in threads:
+        thread.join()
+
+    self.assertEqual(len(calls), 1)
+    self.assertEqual(len({id(model) for model in models}), 1)
+
+
+if __name__ == "__main__":
+  unittest.main()
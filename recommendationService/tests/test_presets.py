@@ -0,0 +1,76 @@
+import unittest
+
+from recommendationService import matching
+from recommendationService.schemas import Criterion
+from recommendationService.services.catalog import DeviceCatalog
+from recommendationService.services.presets import PresetCache, PresetQuery
+from recommendationService.tests.factories import build_random_devices
+
+
+class PresetCacheTests(unittest.TestCase):
+  def setUp(self):
+    self.now = [0.0]
+    self.catalog = DeviceCatalog(build_random_devices(60, seed=19))
+    self.cache = PresetCache(
+      top_n=1,
+      max_age_seconds=100,
+      refresh_seconds=0,
+      half_life_seconds=600,
+      catalog_provider=lambda: self.catalog,
+      clock=lambda: self.now[0],
+    )
+    self.gamer = PresetQuery(criterios=[Criterion(tipo="ram", descricao="12"), Criterion(tipo="processor", descricao="snapdragon")])
+    self.budget = PresetQuery(criterios=[Criterion(tipo="preco_intervalo", descricao="0-1500")])
+
+  def record(self, key, query, times):
+    for _ in range(times):
+      self.cache.record(key, query)
+
+  def test_popular_presets_are_served_from_precomputed_ranking(self):
+    self.record("gamer", self.gamer, 4)
+    self.record("budget", self.budget, 3)
+    self.assertIsNone(self.cache.lookup("gamer"))
+
+    self.assertEqual(self.cache.refresh(), 1)
+    session = self.cache.lookup("gamer")
+
+    self.assertIsNotNone(session)
+    self.assertIsNone(self.cache.lookup("budget"))
+    full = matching.score_catalog_devices(self.gamer.criterios, self.catalog)
+    page = matching.page_ranking_session(session, offset=5, limit=10)
+    self.assertEqual(page.scores, full.scores[5:15])
+    self.assertTrue(all(item["justificativas"] for item in page.scores))
+    self.assertFalse(any(entry.justificativas for entry in session.entries))
+    stats = self.cache.stats()
+    self.assertEqual((stats["consultas"], stats["acertos"], stats["atualizacoes"]), (3, 1, 1))
+    self.assertEqual(stats["presets"][0]["dispositivos"], 60)
+
+  def test_catalog_change_and_age_invalidate_until_refresh(self):
+    self.record("gamer", self.gamer, 3)
+    self.cache.refresh()
+    self.catalog = DeviceCatalog(build_random_devices(30, seed=23))
+    self.assertIsNone(self.cache.lookup("gamer"))
+
+    self.record("gamer", self.gamer, 3)
+    self.assertEqual(self.cache.refresh(), 1)
+    self.assertEqual(len(self.cache.lookup("gamer").entries), 30)
+
+    self.now[0] = 60.0
+    self.record("gamer", self.gamer, 3)
+    self.assertEqual(self.cache.refresh(), 1)
+    self.now[0] = 170.0
+    self.assertIsNone(self.cache.lookup("gamer"))
+
+  def test_decay_retires_presets_that_stop_being_requested(self):
+    self.record("gamer", self.gamer, 4)
+    self.cache.refresh()
+    self.now[0] = 1200.0
+    self.cache.refresh()
+    self.cache.refresh()
+
+    self.assertIsNone(self.cache.lookup("gamer"))
+    self.assertEqual(self.cache.stats()["ativos"], 0)
+
+
+if __name__ == "__main__":
+  unittest.main()
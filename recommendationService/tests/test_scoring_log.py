@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from recommendationService import matching
+from recommendationService.core import ml_model
+from recommendationService.core.ml_model import MATCH_FEATURE_COLUMNS
+from recommendationService.schemas import Criterion
+from recommendationService.services import scoring, scoring_log
+from recommendationService.services.scoring_log import ScoringLogger, load_scoring_log, scoring_log_files
+from recommendationService.tests.factories import build_random_devices
+
+
+def row(device_id, score=0.5):
+  return (device_id, {column: 0.5 for column in MATCH_FEATURE_COLUMNS}, score, score)
+
+
+class ScoringLoggerTests(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.TemporaryDirectory()
+    self.addCleanup(self.tmp.cleanup)
+
+  def test_rotates_and_loads_into_dataframe(self):
+    logger = ScoringLogger(self.tmp.name, max_file_bytes=1)
+
+    for index in range(3):
+      self.assertTrue(logger.log("hash", [row(f"d{index}-a"), row(f"d{index}-b")]))
+    logger.close()
+
+    files = scoring_log_files(self.tmp.name)
+    self.assertEqual(len(files), 3)
+    self.assertFalse(any(name.endswith(".part") for name in os.listdir(self.tmp.name)))
+    with gzip.open(files[0], "rt", encoding="utf-8") as handle:
+      self.assertEqual(json.loads(handle.readline())["device_id"], "d0-a")
+    frame = load_scoring_log(self.tmp.name)
+    self.assertEqual(len(frame), 6)
+    for column in MATCH_FEATURE_COLUMNS + ["criteria_hash", "device_id", "heuristic_score", "model_score"]:
+      self.assertIn(column, frame.columns)
+
+  def test_full_queue_drops_without_blocking(self):
+    logger = ScoringLogger(self.tmp.name, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+    original = logger._write
+
+    def slow_write(*args):
+      started.set()
+      release.wait()
+      original(*args)
+
+    with mock.patch.object(logger, "_write", side_effect=slow_write):
+      self.assertTrue(logger.log("hash", [row("a")]))
+      started.wait(1)
+      self.assertTrue(logger.log("hash", [row("b")]))
+      self.assertFalse(logger.log("hash", [row("c")]))
+      release.set()
+      logger.close()
+
+    self.assertEqual(logger.dropped, 1)
+    self.assertEqual(list(load_scoring_log(self.tmp.name)["device_id"]), ["a", "b"])
+
+  def test_score_devices_logs_feature_rows(self):
+    criterios = [Criterion(tipo="ram", descricao="8")]
+    dispositivos = build_random_devices(5)
+    with mock.patch.dict(os.environ, {scoring_log.SCORING_LOG_DIR_ENV: self.tmp.name}):
+      scores = matching.score_devices(criterios, dispositivos)
+      scoring_log.close_scoring_logger()
+
+    frame = load_scoring_log(self.tmp.name)
+    self.assertEqual(sorted(frame["device_id"]), sorted(item["id"] for item in scores))
+    self.assertEqual(set(frame["criteria_hash"]), {scoring_log.compute_criteria_hash(criterios)})
+
+  def test_without_model_logs_no_model_score(self):
+    with mock.patch.object(ml_model, "load_match_model", return_value=None), \
+        mock.patch.object(scoring, "load_match_model", return_value=None), \
+        mock.patch.object(scoring, "get_shadow_evaluator") as get_shadow, \
+        mock.patch.dict(os.environ, {scoring_log.SCORING_LOG_DIR_ENV: self.tmp.name}):
+      matching.score_devices([Criterion(tipo="ram", descricao="8")], build_random_devices(5))
+      scoring_log.close_scoring_logger()
+
+    frame = load_scoring_log(self.tmp.name)
+    self.assertTrue(frame["model_score"].isna().all())
+    get_shadow.return_value.submit.assert_not_called()
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,69 @@
+import math
+import unittest
+
+import numpy as np
+
+from recommendationService.core.device_features import (
+  battery_level_from_numeric,
+  camera_level_from_numeric,
+  performance_level_from_benchmark,
+  performance_level_from_ram,
+)
+from recommendationService.core.preferences import level_to_score
+from recommendationService.core.scoring_rules import load_rules, parse_rules
+from recommendationService.core.specs import price_level_from_value
+
+
+def raw_rules(**overrides):
+  raw = {
+    "level_scores": {"basica": 0.3, "ok": 0.5, "boa": 0.75, "top": 0.9},
+    "level_tables": {"ram": {"breakpoints": [6, 8, 12], "levels": ["basica", "ok", "boa", "top"]}},
+    "criteria": {"ram": {"aspect": "desempenho", "numeric": "ram", "text": ["keywords"]}},
+    "spec_ramp": {"start": 0.7, "width": 0.3},
+  }
+  raw.update(overrides)
+  return raw
+
+
+class ScoringRulesTests(unittest.TestCase):
+  def test_wrappers_follow_breakpoints(self):
+    self.assertEqual(camera_level_from_numeric(19.9), "basica")
+    self.assertEqual(camera_level_from_numeric(20), "ok")
+    self.assertEqual(camera_level_from_numeric(64), "top")
+    self.assertEqual(battery_level_from_numeric(5000), "boa")
+    self.assertEqual(performance_level_from_ram(8), "boa")
+    self.assertEqual(performance_level_from_benchmark(599_999), "basica")
+    self.assertEqual(price_level_from_value(1000), "basica")
+    self.assertEqual(price_level_from_value(1000.01), "ok")
+    self.assertEqual(price_level_from_value(3500), "top")
+    self.assertEqual(performance_level_from_ram(math.nan), "basica")
+    self.assertEqual(price_level_from_value(math.nan), "top")
+
+  def test_vectorized_matches_scalar(self):
+    rules = load_rules()
+    values = [math.nan, 0.0, 20.0, 1000.0, 4999.0, 5000.0, 8.0, 256.0, 900_000.0, 3000.0, 3000.5]
+    for name, table in rules.level_tables.items():
+      expected = [table.index(value) for value in values]
+      self.assertEqual(table.indices(np.asarray(values)).tolist(), expected, name)
+      self.assertEqual(
+        rules.level_score_array(name, values).tolist(),
+        [level_to_score(table.levels[index]) for index in expected],
+      )
+
+  def test_spec_ramp_vectorized(self):
+    ramp = load_rules().spec_ramp
+    ratios = [0.5, 0.7, 0.85, 1.0, 1.2]
+    self.assertEqual(ramp.scores(ratios).tolist(), [ramp.score(ratio) for ratio in ratios])
+
+  def test_parse_rules_rejects_invalid_tables(self):
+    self.assertEqual(parse_rules(raw_rules()).level("ram", 12), "top")
+    with self.assertRaises(ValueError):
+      parse_rules(raw_rules(level_tables={"ram": {"breakpoints": [8, 6], "levels": ["a", "b", "c"]}}))
+    with self.assertRaises(ValueError):
+      parse_rules(raw_rules(level_tables={"ram": {"breakpoints": [6], "levels": ["a"]}}))
+    with self.assertRaises(ValueError):
+      parse_rules(raw_rules(criteria={"ram": {"aspect": "desempenho", "numeric": "inexistente"}}))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from recommendationService import matching
+from recommendationService.core.specs import build_normalized_criteria
+from recommendationService.schemas import Criterion, Perturbation
+from recommendationService.services.scoring import RequestDeviceSource
+from recommendationService.services.sensitivity import apply_perturbation, evaluate_sensitivity
+from recommendationService.tests.factories import build_random_devices
+
+
+class SensitivityTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="battery", descricao="5000"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+    self.dispositivos = build_random_devices(80, seed=11)
+
+  def evaluate(self, perturbations, **kwargs):
+    source = RequestDeviceSource(self.dispositivos)
+    return evaluate_sensitivity(self.criterios, source, range(len(self.dispositivos)), perturbations, **kwargs)
+
+  def assert_matches_full_scoring(self, top_k, criterios):
+    expected = matching.score_devices(criterios, self.dispositivos, fields=["finalScore"])[: len(top_k)]
+    self.assertEqual(
+      [(item["id"], item["finalScore"]) for item in top_k],
+      [(item["id"], item["finalScore"]) for item in expected],
+    )
+
+  def test_variants_match_scoring_the_perturbed_request(self):
+    perturbations = [
+      Perturbation(acao="ampliar_preco", valor=300),
+      Perturbation(acao="deslocar_preco", valor=500),
+      Perturbation(acao="remover_criterio", tipo="battery"),
+      Perturbation(acao="reduzir_alvo", tipo="ram", valor=2),
+    ]
+    result = self.evaluate(perturbations, k=15)
+
+    self.assert_matches_full_scoring(result["base"]["topK"], self.criterios)
+    expected_criteria = [
+      [self.criterios[0], self.criterios[1], Criterion(tipo="preco_intervalo", descricao="900-2300")],
+      [self.criterios[0], self.criterios[1], Criterion(tipo="preco_intervalo", descricao="1700-2500")],
+      [self.criterios[0], self.criterios[2]],
+      [Criterion(tipo="ram", descricao="6"), self.criterios[1], self.criterios[2]],
+    ]
+    for variant, criterios in zip(result["variantes"], expected_criteria):
+      self.assert_matches_full_scoring(variant["topK"], criterios)
+    self.assertGreater(result["variantes"][0]["melhoram"], 0)
+
+  def test_unchanged_criterion_columns_are_reused(self):
+    result = self.evaluate(
+      [
+        Perturbation(acao="ampliar_preco", valor=100),
+        Perturbation(acao="ampliar_preco", valor=200),
+        Perturbation(acao="remover_criterio", tipo="ram"),
+      ]
+    )
+
+    # 3 colunas do pedido original + 2 faixas de preço novas.
+    self.assertEqual(result["colunasCalculadas"], 5)
+
+  def test_min_score_counts_newly_qualified_devices(self):
+    result = self.evaluate([Perturbation(acao="ampliar_preco", valor=1000)], min_score=0.7)
+
+    self.assertIn("novosAcimaDoMinimo", result["variantes"][0])
+    self.assertGreaterEqual(result["variantes"][0]["novosAcimaDoMinimo"], 0)
+
+  def test_invalid_perturbations_raise(self):
+    criteria = build_normalized_criteria([Criterion(tipo="ram", descricao="8")])
+    with self.assertRaises(ValueError):
+      apply_perturbation(criteria, Perturbation(acao="ampliar_preco", valor=300))
+    with self.assertRaises(ValueError):
+      apply_perturbation(criteria, Perturbation(acao="remover_criterio", tipo="battery"))
+
+  def test_negative_values_only_allowed_when_shifting_price(self):
+    criteria = build_normalized_criteria([
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="preco_intervalo", descricao="1000-1500"),
+    ])
+    with self.assertRaises(ValueError):
+      apply_perturbation(criteria, Perturbation(acao="ampliar_preco", valor=-1000))
+    with self.assertRaises(ValueError):
+      apply_perturbation(criteria, Perturbation(acao="reduzir_alvo", tipo="ram", valor=-2))
+
+    shifted = apply_perturbation(criteria, Perturbation(acao="deslocar_preco", valor=-200))
+    self.assertEqual([c.descricao for c in shifted if c.tipo == "preco_intervalo"], ["800-1300"])
+
+
+if __name__ == "__main__":
+  unittest.main()
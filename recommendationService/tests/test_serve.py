@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from recommendationService import serve
+from recommendationService.core import ml_model
+
+
+class _ConstantEstimator:
+  def predict(self, rows):
+    return [0.42 for _ in range(len(rows))]
+
+
+class PreloadTests(unittest.TestCase):
+  def setUp(self):
+    self._previous = (ml_model._MODEL_CACHE, ml_model._MODEL_CACHE_PATH)
+    ml_model._MODEL_CACHE = None
+    ml_model._MODEL_CACHE_PATH = None
+    self._env = mock.patch.dict(os.environ)
+    self._env.start()
+    os.environ.pop(ml_model.MATCHING_MODEL_ENV, None)
+
+  def tearDown(self):
+    self._env.stop()
+    ml_model._MODEL_CACHE, ml_model._MODEL_CACHE_PATH = self._previous
+
+  def test_requests_after_preload_use_the_preloaded_model(self):
+    with tempfile.NamedTemporaryFile(suffix=".joblib") as handle:
+      with mock.patch.object(ml_model.joblib, "load", return_value=_ConstantEstimator()) as load, \
+          mock.patch.object(serve, "get_catalog"), mock.patch.object(serve.gc, "freeze"):
+        serve.preload(handle.name)
+        score = ml_model.predict_match_score({column: 0.5 for column in ml_model.MATCH_FEATURE_COLUMNS}, 0.1)
+
+      self.assertEqual(score, 0.42)
+      load.assert_called_once()
+      self.assertEqual(str(load.call_args.args[0]), handle.name)
+      self.assertEqual(ml_model.model_version(), ml_model.model_version(handle.name))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+from unittest import mock
+
+from recommendationService import matching
+from recommendationService.core.specs import score_criterion
+from recommendationService.schemas import Criterion
+from recommendationService.services import criterion_matrix, scoring
+from recommendationService.services.sessions import RankingSession, RankingSessionStore
+from recommendationService.tests.factories import build_random_devices
+
+
+def session_with(size):
+  return RankingSession(context=None, entries=[object()] * size, wanted=frozenset())
+
+
+class RankingSessionStoreTests(unittest.TestCase):
+  def test_ttl_expires_and_access_renews(self):
+    now = [0.0]
+    store = RankingSessionStore(ttl_seconds=10, clock=lambda: now[0])
+    token = store.put(session_with(3))
+
+    now[0] = 8.0
+    self.assertIsNotNone(store.get(token))
+    now[0] = 17.0
+    self.assertIsNotNone(store.get(token))
+    now[0] = 28.0
+    self.assertIsNone(store.get(token))
+    self.assertEqual(len(store), 0)
+
+  def test_memory_cap_evicts_least_recently_used(self):
+    store = RankingSessionStore(max_entries=10)
+    first = store.put(session_with(4))
+    second = store.put(session_with(4))
+    store.get(first)
+
+    third = store.put(session_with(4))
+
+    self.assertIsNotNone(store.get(first))
+    self.assertIsNone(store.get(second))
+    self.assertIsNotNone(store.get(third))
+    self.assertIsNone(store.put(session_with(11)))
+
+  def test_memory_cap_counts_matrix_rows(self):
+    store = RankingSessionStore(max_entries=10)
+    filtered_out = RankingSession(context=None, entries=[], wanted=frozenset(), matrix=[object()] * 8)
+    first = store.put(filtered_out)
+
+    second = store.put(session_with(4))
+
+    self.assertIsNone(store.get(first))
+    self.assertIsNotNone(store.get(second))
+
+
+  def test_tokens_identify_the_owning_worker(self):
+    now = [0.0]
+    worker = RankingSessionStore(ttl_seconds=10, clock=lambda: now[0], owner="101")
+    other = RankingSessionStore(owner="202")
+    token = worker.put(session_with(3))
+
+    now[0] = 20.0
+    self.assertIsNone(worker.get(token))
+    self.assertTrue(worker.owns(token))
+    self.assertIsNone(other.get(token))
+    self.assertFalse(other.owns(token))
+
+
+class RankingPaginationTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+    self.dispositivos = build_random_devices(40)
+
+  def test_pages_match_full_ranking_without_rescoring(self):
+    full = matching.score_devices(self.criterios, self.dispositivos)
+    store = RankingSessionStore()
+
+    first = matching.score_devices_with_outcome(
+      self.criterios, self.dispositivos, session_store=store, offset=0, limit=10
+    )
+    session = store.get(first.session)
+    with mock.patch.object(scoring, "score_device") as score_device, \
+        mock.patch.object(scoring, "build_justificativas", wraps=scoring.build_justificativas) as justificativas:
+      second = matching.page_ranking_session(session, offset=10, limit=10)
+
+    score_device.assert_not_called()
+    self.assertEqual(justificativas.call_count, 10)
+    self.assertEqual((first.total, second.total), (40, 40))
+    self.assertEqual(first.scores, full[:10])
+    self.assertEqual(second.scores, full[10:20])
+    self.assertEqual(matching.page_ranking_session(session, offset=35).scores, full[35:])
+
+
+class IncrementalRescoringTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="battery", descricao="5000"),
+      Criterion(tipo="processor", descricao="snapdragon"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+    self.dispositivos = build_random_devices(120, seed=17)
+
+  def test_edit_matches_full_recompute_and_reuses_unchanged_columns(self):
+    store = RankingSessionStore()
+    first = matching.score_devices_with_outcome(
+      self.criterios, self.dispositivos, min_score=0.6, session_store=store, limit=10
+    )
+    edited = [self.criterios[0], Criterion(tipo="battery", descricao="6000"), *self.criterios[2:]]
+
+    with mock.patch.object(criterion_matrix, "score_criterion", wraps=score_criterion) as counted:
+      outcome = matching.rescore_ranking_session(store.get(first.session), edited, store)
+
+    # A sessão só guarda os dispositivos que passaram pela poda do primeiro pedido.
+    matrix = store.get(first.session).matrix
+    self.assertGreater(first.pruned, 0)
+    self.assertEqual(len(matrix), len(self.dispositivos) - first.pruned)
+    candidates = [dispositivo for dispositivo in self.dispositivos if dispositivo.id in set(matrix.device_ids)]
+    full = matching.score_devices_with_outcome(edited, candidates, min_score=0.6)
+    self.assertEqual(outcome.scores, full.scores)
+    self.assertEqual(outcome.total, full.total)
+    # Só a coluna de bateria nova.
+    self.assertEqual(counted.call_count, len(matrix))
+    self.assertNotEqual(outcome.session, first.session)
+
+  def test_edits_leave_the_original_session_reusable(self):
+    store = RankingSessionStore()
+    token = matching.score_devices_with_outcome(self.criterios, self.dispositivos, session_store=store).session
+    original = store.get(token)
+    columns = original.matrix.columns_computed
+
+    matching.rescore_ranking_session(original, [Criterion(tipo="camera", descricao="boa")], store)
+    edited = [self.criterios[0], Criterion(tipo="battery", descricao="6000"), *self.criterios[2:]]
+    with mock.patch.object(criterion_matrix, "score_criterion", wraps=score_criterion) as counted:
+      outcome = matching.rescore_ranking_session(store.get(token), edited, store)
+
+    self.assertEqual(original.matrix.columns_computed, columns)
+    self.assertEqual(counted.call_count, len(self.dispositivos))
+    self.assertEqual(outcome.scores, matching.score_devices(edited, self.dispositivos))
+
+  def test_consecutive_edits_and_paging(self):
+    store = RankingSessionStore()
+    token = matching.score_devices_with_outcome(self.criterios, self.dispositivos, session_store=store).session
+    edits = [
+      self.criterios[:3],
+      [*self.criterios[:3], Criterion(tipo="preco_intervalo", descricao="800-1500")],
+      [Criterion(tipo="camera", descricao="boa"), *self.criterios[1:]],
+    ]
+    for edited in edits:
+      outcome = matching.rescore_ranking_session(store.get(token), edited, store, offset=5, limit=10)
+      token = outcome.session
+      self.assertEqual(outcome.scores, matching.score_devices(edited, self.dispositivos)[5:15])
+      page = matching.page_ranking_session(store.get(token), offset=100)
+      self.assertEqual(page.scores, matching.score_devices(edited, self.dispositivos)[100:])
+
+
+if __name__ == "__main__":
+  unittest.main()
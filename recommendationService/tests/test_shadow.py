@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import joblib
+
+from recommendationService import matching
+from recommendationService.core.ml_model import DEFAULT_MODEL_PATH, MATCH_FEATURE_COLUMNS, MatchModelArtifact
+from recommendationService.schemas import Criterion, ShadowReport
+from recommendationService.services import shadow
+from recommendationService.services.shadow import ShadowEvaluator, rank_correlation, top_k_overlap
+from recommendationService.tests.factories import build_random_devices
+
+
+class _ReversedEstimator:
+  def predict(self, frame):
+    return 1.0 - frame["spec_fit"].to_numpy()
+
+
+class RankingMetricTests(unittest.TestCase):
+  def test_rank_correlation_and_overlap(self):
+    self.assertAlmostEqual(rank_correlation([0.1, 0.5, 0.9], [1, 2, 3]), 1.0)
+    self.assertAlmostEqual(rank_correlation([0.1, 0.5, 0.9], [3, 2, 1]), -1.0)
+    self.assertIsNone(rank_correlation([0.5, 0.5], [0.1, 0.2]))
+    self.assertEqual(top_k_overlap([0.9, 0.8, 0.1, 0.0], [0.9, 0.1, 0.8, 0.0], 2), 0.5)
+
+
+class ShadowEvaluatorTests(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.TemporaryDirectory()
+    self.addCleanup(self.tmp.cleanup)
+    self.model_path = Path(self.tmp.name) / "candidate.joblib"
+    joblib.dump(_ReversedEstimator(), self.model_path)
+
+  def payloads(self, values):
+    return [dict.fromkeys(MATCH_FEATURE_COLUMNS, 0.5) | {"spec_fit": value} for value in values]
+
+  def test_records_disagreement_of_candidate(self):
+    live_model = MatchModelArtifact(feature_names=MATCH_FEATURE_COLUMNS.copy(), estimator=_ReversedEstimator())
+    evaluator = ShadowEvaluator(self.model_path, top_k=2, live_model_provider=lambda: live_model)
+
+    evaluator.submit(self.payloads([0.9, 0.6, 0.3, 0.1]), [0.9, 0.6, 0.3, 0.1])
+    evaluator.close()
+
+    report = ShadowReport(**evaluator.report())
+    self.assertEqual(report.avaliadas, 1)
+    self.assertAlmostEqual(report.spearmanMedio, -1.0)
+    self.assertEqual(report.topKOverlapMedio, 0.0)
+    # As duas latências vêm de um `predict` em lote sobre a mesma matriz.
+    self.assertIsNotNone(report.latenciaAtualMs.p50)
+    self.assertIsNotNone(report.latenciaCandidatoMs.p50)
+
+  def test_full_queue_drops_without_blocking(self):
+    evaluator = ShadowEvaluator(self.model_path, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+    original = evaluator._evaluate
+
+    def slow_evaluate(*args):
+      started.set()
+      release.wait()
+      original(*args)
+
+    with mock.patch.object(evaluator, "_evaluate", side_effect=slow_evaluate):
+      self.assertTrue(evaluator.submit(self.payloads([0.1, 0.2]), [0.1, 0.2]))
+      started.wait(1)
+      self.assertTrue(evaluator.submit(self.payloads([0.1, 0.2]), [0.1, 0.2]))
+      self.assertFalse(evaluator.submit(self.payloads([0.1, 0.2]), [0.1, 0.2]))
+      release.set()
+      evaluator.close()
+
+    self.assertEqual((evaluator.evaluated, evaluator.dropped), (2, 1))
+    self.assertEqual(evaluator.report()["enfileiradas"], 2)
+
+  def test_live_model_as_candidate_agrees_with_itself(self):
+    with mock.patch.dict(os.environ, {shadow.SHADOW_MODEL_ENV: str(DEFAULT_MODEL_PATH)}):
+      matching.score_devices([Criterion(tipo="ram", descricao="8")], build_random_devices(30))
+      evaluator = shadow.get_shadow_evaluator()
+      evaluator.close()
+      report = evaluator.report()
+      shadow.close_shadow_evaluator()
+
+    self.assertEqual(report["avaliadas"], 1)
+    self.assertAlmostEqual(report["spearmanMedio"], 1.0)
+    self.assertEqual(report["topKOverlapMedio"], 1.0)
+
+
+if __name__ == "__main__":
+  unittest.main()
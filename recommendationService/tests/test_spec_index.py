@@ -0,0 +1,49 @@
+import unittest
+
+from recommendationService import matching
+from recommendationService.core.device_features import build_caracteristica_map
+from recommendationService.core.spec_index import SpecRangeIndex
+from recommendationService.core.specs import build_normalized_criteria, score_specifications
+from recommendationService.schemas import Criterion
+from recommendationService.tests.factories import build_random_devices
+
+
+class SpecRangeIndexTests(unittest.TestCase):
+  def setUp(self):
+    self.criterios = [
+      Criterion(tipo="ram", descricao="8"),
+      Criterion(tipo="battery", descricao="5000"),
+      Criterion(tipo="processor", descricao="snapdragon"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+
+  def test_upper_bounds_never_underestimate_spec_fit(self):
+    dispositivos = build_random_devices(200)
+    normalized = build_normalized_criteria(self.criterios)
+    maps = [build_caracteristica_map(dispositivo) for dispositivo in dispositivos]
+
+    bounds = SpecRangeIndex.from_maps(maps).spec_fit_upper_bounds(normalized)
+
+    for caracteristicas_map, bound in zip(maps, bounds):
+      spec_fit, _ = score_specifications(normalized, caracteristicas_map)
+      self.assertGreaterEqual(bound + 1e-4, spec_fit)
+
+  def test_min_score_prunes_without_changing_surviving_results(self):
+    dispositivos = build_random_devices(200)
+
+    full = matching.score_devices_with_outcome(self.criterios, dispositivos)
+    pruned = matching.score_devices_with_outcome(self.criterios, dispositivos, min_score=0.6)
+
+    self.assertGreater(pruned.pruned, 0)
+    self.assertEqual(pruned.pruned + pruned.scored, len(dispositivos))
+    survivors = {item["id"] for item in pruned.scores}
+    expected = [item for item in full.scores if item["id"] in survivors]
+    self.assertEqual(pruned.scores, expected)
+    for item in full.scores:
+      heuristic = item["specFit"] * 0.7 + item["opinionSim"] * 0.3
+      if heuristic >= 0.6 + 1e-3:
+        self.assertIn(item["id"], survivors)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from recommendationService.core import ml_model
+from recommendationService.core.ml_model import (
+  DEFAULT_MODEL_PATH,
+  MATCH_FEATURE_COLUMNS,
+  build_feature_matrix,
+  build_feature_payload,
+)
+from recommendationService.core.types import DeviceVector
+from recommendationService import train_match_model as training
+
+
+class FeatureMatrixTests(unittest.TestCase):
+  def test_matrix_matches_payload_rows(self):
+    frame = training.synthesize_frame(50, seed=3)
+
+    matrix = build_feature_matrix(frame)
+
+    for index, row in enumerate(frame.itertuples(index=False)):
+      payload = build_feature_payload(
+        spec_fit=row.spec_fit,
+        opinion_sim=row.opinion_sim,
+        device_vector=DeviceVector("d", row.camera, row.bateria, row.preco, row.desempenho),
+        has_structured=bool(row.has_structured),
+        has_preference_targets=bool(row.has_preference_targets),
+        includes_price=bool(row.includes_price),
+        spec_weight=row.spec_weight,
+        reviews_weight=row.reviews_weight,
+      )
+      self.assertEqual(matrix[index].tolist(), [payload[name] for name in MATCH_FEATURE_COLUMNS])
+
+  def test_feature_cache_round_trip(self):
+    columns = training.build_training_columns(training.synthesize_frame(20), "target_score")
+    with tempfile.TemporaryDirectory() as tmp:
+      self.assertIsNone(training.load_feature_cache(Path(tmp) / "missing"))
+      training.save_feature_cache(Path(tmp) / "key", columns)
+      cached = training.load_feature_cache(Path(tmp) / "key")
+
+      self.assertEqual(set(cached), set(columns))
+      for name, values in columns.items():
+        np.testing.assert_array_equal(cached[name], values)
+
+
+class TrainingTests(unittest.TestCase):
+  def test_artifact_carries_metadata_and_loads(self):
+    columns = training.build_training_columns(training.synthesize_frame(400), "target_score")
+
+    artifact, metadata = training.train_and_evaluate(columns)
+
+    self.assertEqual(metadata["feature_names"], MATCH_FEATURE_COLUMNS)
+    self.assertEqual(set(metadata["metrics"]), {"model", "heuristic"})
+    self.assertIn("single_p95_ms", metadata["latency"])
+    model_metrics = metadata["metrics"]["model"]
+    self.assertGreater(model_metrics["r2"], 0.8)
+    self.assertLess(model_metrics["rmse"], 0.1)
+    self.assertLessEqual(model_metrics["mae"], model_metrics["rmse"])
+    previous = (ml_model._MODEL_CACHE, ml_model._MODEL_CACHE_PATH)
+    try:
+      with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.joblib"
+        joblib.dump(artifact, path)
+        loaded = ml_model.load_match_model(str(path))
+      self.assertEqual(loaded.metadata["trained_at"], metadata["trained_at"])
+      self.assertTrue(0.0 <= loaded.predict(dict.fromkeys(MATCH_FEATURE_COLUMNS, 0.5)) <= 1.0)
+    finally:
+      ml_model._MODEL_CACHE, ml_model._MODEL_CACHE_PATH = previous
+
+  def test_scoring_log_requires_explicit_target(self):
+    frame = training.synthesize_frame(200, seed=5).rename(columns={"target_score": "model_score"})
+    with tempfile.TemporaryDirectory() as tmp:
+      log_dir = Path(tmp) / "logs"
+      log_dir.mkdir()
+      frame.to_json(log_dir / "scoring-0001.jsonl.gz", orient="records", lines=True, compression="gzip")
+      model_path = Path(tmp) / "model.joblib"
+      base_args = ["--data-path", str(log_dir), "--model-path", str(model_path), "--no-cache"]
+
+      stderr = io.StringIO()
+      with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit):
+        training.main(base_args)
+      self.assertIn("--target-column", stderr.getvalue())
+      self.assertFalse(model_path.exists())
+
+      with contextlib.redirect_stdout(io.StringIO()):
+        training.main([*base_args, "--target-column", "model_score"])
+      self.assertEqual(joblib.load(model_path).metadata["train_rows"], 160)
+
+  def test_artifacts_without_metadata_still_load(self):
+    self.assertIsNone(joblib.load(DEFAULT_MODEL_PATH).metadata)
+
+
+if __name__ == "__main__":
+  unittest.main()
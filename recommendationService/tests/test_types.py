@@ -0,0 +1,34 @@
+import unittest
+
+from recommendationService.core.device_features import build_caracteristica_map
+from recommendationService.core.types import DeviceVector, DeviceVectorBatch
+from recommendationService.schemas import DeviceCharacteristic, DeviceInput
+
+
+class CompactTypesTests(unittest.TestCase):
+  def test_device_vector_batch_round_trips_vectors(self):
+    vectors = [
+      DeviceVector("a", camera=0.9, bateria=0.3),
+      DeviceVector("b", preco=0.75, desempenho=0.1),
+    ]
+
+    batch = DeviceVectorBatch.from_vectors(vectors)
+
+    self.assertEqual(len(batch), 2)
+    self.assertEqual(list(batch), vectors)
+    self.assertEqual(list(batch.preco), [0.5, 0.75])
+    self.assertFalse(hasattr(vectors[0], "__dict__"))
+
+  def test_caracteristica_keys_are_shared_between_devices(self):
+    first, second = (
+      build_caracteristica_map(
+        DeviceInput(id=device_id, caracteristicas=[DeviceCharacteristic(tipo=" RAM ", descricao="8")])
+      )
+      for device_id in ("a", "b")
+    )
+
+    self.assertIs(next(iter(first)), next(iter(second)))
+
+
+if __name__ == "__main__":
+  unittest.main()
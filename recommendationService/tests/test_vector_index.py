@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from recommendationService.core.preferences import compute_opinion_similarity
+from recommendationService.core.specs import build_normalized_criteria
+from recommendationService.core.types import DeviceVector
+from recommendationService.core.vector_index import DeviceVectorIndex
+from recommendationService.schemas import Criterion
+from recommendationService.services.catalog import DeviceCatalog
+from recommendationService.services.scoring import derive_preferences
+from recommendationService.services.similarity import similar_devices, top_k_by_preferences
+from recommendationService.tests.factories import build_random_devices
+
+
+class DeviceVectorIndexTests(unittest.TestCase):
+  def test_weighted_query_matches_brute_force(self):
+    rng = random.Random(3)
+    vectors = [
+      DeviceVector(f"d{index}", rng.random(), rng.random(), rng.random(), rng.random())
+      for index in range(500)
+    ]
+    index = DeviceVectorIndex(vectors)
+    target = [0.9, 0.3, 0.5, 0.75]
+    weights = [2.0, 1.0, 3.0, 1.0]
+
+    result = index.query(target, weights, 15)
+
+    brute = sorted(
+      (sum(w * abs(p - t) for w, p, t in zip(weights, point, target)), position)
+      for position, point in enumerate(index.points)
+    )[:15]
+    self.assertEqual([position for _, position in result], [position for _, position in brute])
+
+  def test_top_k_by_preferences_matches_opinion_similarity(self):
+    catalog = DeviceCatalog(build_random_devices(300, seed=11))
+    criterios = [
+      Criterion(tipo="main_camera", descricao="64"),
+      Criterion(tipo="preco_intervalo", descricao="1200-2000"),
+    ]
+
+    result = top_k_by_preferences(catalog, criterios, 10)
+
+    structured = build_normalized_criteria(criterios)
+    prefs, weights = derive_preferences(structured)
+    expected = sorted(
+      (round(compute_opinion_similarity(vector, prefs, weights), 4) for vector in catalog.vectors),
+      reverse=True,
+    )[:10]
+    self.assertEqual([item["opinionSim"] for item in result], expected)
+
+  def test_similar_devices_excludes_reference_device(self):
+    catalog = DeviceCatalog(build_random_devices(100, seed=11))
+
+    result = similar_devices(catalog, "device-5", 5)
+
+    self.assertEqual(len(result), 5)
+    self.assertNotIn("device-5", [item["id"] for item in result])
+    with self.assertRaises(KeyError):
+      similar_devices(catalog, "desconhecido", 5)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,288 @@
+"""CLI de treino e avaliação offline do modelo de matching.
+
+Fontes aceitas em `--data-path` (pode ser repetido):
+
+  *.csv                  base tabular descrita no README (features + `target_score`)
+  *.jsonl.gz / diretório arquivos do log de scoring (`SCORING_LOG_DIR`)
+
+O alvo padrão é `target_score`. Logs de scoring não trazem rótulos: `model_score`
+e `heuristic_score` são saídas do próprio serviço, e treinar sobre elas só
+ensina o candidato a imitá-las. Sem `target_score`, o CLI para com um erro;
+para treinar sobre uma dessas colunas, passe `--target-column` explicitamente.
+
+Com `--synthetic N`, gera N exemplos sintéticos no lugar (ou além) dos arquivos.
+A matriz `MATCH_FEATURE_COLUMNS` é montada de forma vetorizada e guardada em
+`--cache-dir` como uma coluna `.npy` por feature; execuções seguintes com as
+mesmas fontes reabrem as colunas via mmap sem reler CSV/JSON.
+
+Exemplo:
+  python -m recommendationService.train_match_model --data-path data/matching_dataset.csv
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .core.ml_model import DEFAULT_MODEL_PATH, MATCH_FEATURE_COLUMNS, MatchModelArtifact, build_feature_matrix
+from .services.scoring_log import load_scoring_log, scoring_log_files
+
+DEFAULT_TARGET_COLUMN = "target_score"
+BASELINE_COLUMN = "heuristic_score"
+# Colunas do log de scoring produzidas pelo próprio serviço (não são rótulos).
+SERVICE_SCORE_COLUMNS = ("model_score", BASELINE_COLUMN)
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "models" / ".feature_cache"
+LATENCY_SAMPLES = 200
+
+# Combinações de pesos produzidas por `build_scoring_context`:
+# (has_structured, has_preference_targets, includes_price) -> (spec_weight, reviews_weight)
+_WEIGHT_PROFILES = (
+  (1.0, 1.0, 1.0, 0.7, 0.3),
+  (1.0, 1.0, 0.0, 0.6, 0.4),
+  (1.0, 0.0, 0.0, 1.0, 0.0),
+  (1.0, 0.0, 1.0, 1.0, 0.0),
+  (0.0, 1.0, 0.0, 0.0, 1.0),
+)
+
+
+def _source_files(paths: Sequence[str]) -> List[Path]:
+  files: List[Path] = []
+  for raw in paths:
+    path = Path(raw)
+    files.extend(scoring_log_files(path) if path.is_dir() else [path])
+  return files
+
+
+def load_training_frame(paths: Sequence[str]) -> pd.DataFrame:
+  """Concatena CSVs e arquivos do log de scoring num único DataFrame."""
+  frames = []
+  for path in _source_files(paths):
+    if path.name.endswith(".jsonl.gz"):
+      frames.append(load_scoring_log(path))
+    else:
+      frames.append(pd.read_csv(path))
+  if not frames:
+    raise ValueError("Nenhum arquivo de treino encontrado")
+  return pd.concat(frames, ignore_index=True)
+
+
+def synthesize_frame(total: int, seed: int = 42) -> pd.DataFrame:
+  """Exemplos sintéticos com as mesmas combinações de pesos do serviço."""
+  rng = np.random.default_rng(seed)
+  profiles = np.asarray(_WEIGHT_PROFILES)[rng.integers(0, len(_WEIGHT_PROFILES), total)]
+  has_structured, has_prefs, includes_price, spec_weight, reviews_weight = profiles.T
+  spec_fit = np.where(has_structured == 1.0, rng.beta(2.0, 1.5, total), 0.5)
+  vectors = rng.beta(3.0, 2.0, (total, 4))
+  opinion_sim = np.clip(1 - np.abs(vectors - rng.uniform(0.3, 0.9, (total, 4))).mean(axis=1), 0, 1)
+  heuristic = (spec_fit * spec_weight + opinion_sim * reviews_weight) / (spec_weight + reviews_weight)
+  # O alvo premia quem atende bem às specs e tem boa avaliação ao mesmo tempo.
+  target = heuristic + 0.1 * (spec_fit * opinion_sim - 0.5) + rng.normal(0, 0.03, total)
+  return pd.DataFrame({
+    "spec_fit": spec_fit,
+    "opinion_sim": opinion_sim,
+    "camera": vectors[:, 0],
+    "bateria": vectors[:, 1],
+    "preco": vectors[:, 2],
+    "desempenho": vectors[:, 3],
+    "has_structured": has_structured,
+    "has_preference_targets": has_prefs,
+    "includes_price": includes_price,
+    "spec_weight": spec_weight,
+    "reviews_weight": reviews_weight,
+    BASELINE_COLUMN: heuristic,
+    DEFAULT_TARGET_COLUMN: np.clip(target, 0, 1),
+  })
+
+
+def feature_cache_key(paths: Sequence[str], synthetic: int, seed: int, target_column: str) -> str:
+  """Identifica a matriz pelas fontes (caminho, tamanho, mtime) e parâmetros."""
+  parts = [f"{path.resolve()}:{path.stat().st_size}:{path.stat().st_mtime_ns}" for path in _source_files(paths)]
+  parts.extend([f"synthetic={synthetic}:{seed}", f"target={target_column}", ",".join(MATCH_FEATURE_COLUMNS)])
+  return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def save_feature_cache(directory: Path, columns: Dict[str, np.ndarray]) -> None:
+  """Grava uma coluna `.npy` por nome; `meta.json` por último marca o cache como completo."""
+  directory.mkdir(parents=True, exist_ok=True)
+  for name, values in columns.items():
+    np.save(directory / f"{name}.npy", np.ascontiguousarray(values))
+  (directory / "meta.json").write_text(json.dumps({"columns": list(columns), "rows": len(next(iter(columns.values())))}))
+
+
+def load_feature_cache(directory: Path) -> Optional[Dict[str, np.ndarray]]:
+  """Reabre as colunas em mmap, ou None se o cache não existir."""
+  meta_path = directory / "meta.json"
+  if not meta_path.exists():
+    return None
+  meta = json.loads(meta_path.read_text())
+  return {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in meta["columns"]}
+
+
+def check_default_target(frame: pd.DataFrame) -> None:
+  """Falha com uma mensagem clara quando os dados não trazem `target_score` rotulado."""
+  if DEFAULT_TARGET_COLUMN in frame.columns and frame[DEFAULT_TARGET_COLUMN].notna().any():
+    return
+  present = [column for column in SERVICE_SCORE_COLUMNS if column in frame.columns]
+  if present:
+    raise ValueError(
+      f"os dados (logs de scoring) não têm {DEFAULT_TARGET_COLUMN} rotulado; "
+      f"{', '.join(present)} são saídas do próprio serviço e treinar sobre elas só imita o modelo atual. "
+      f"Junte rótulos como {DEFAULT_TARGET_COLUMN} ou passe --target-column explicitamente."
+    )
+  raise ValueError(f"os dados não têm a coluna alvo {DEFAULT_TARGET_COLUMN}; use --target-column")
+
+
+def build_training_columns(frame: pd.DataFrame, target_column: str) -> Dict[str, np.ndarray]:
+  """Matriz de features (coluna a coluna), alvo e, quando houver, o baseline heurístico."""
+  missing = [column for column in MATCH_FEATURE_COLUMNS + [target_column] if column not in frame.columns]
+  if missing:
+    raise ValueError(f"Colunas ausentes nos dados de treino: {', '.join(missing)}")
+  frame = frame.dropna(subset=[target_column])
+  matrix = build_feature_matrix(frame)
+  columns = {name: matrix[:, index] for index, name in enumerate(MATCH_FEATURE_COLUMNS)}
+  columns[DEFAULT_TARGET_COLUMN] = frame[target_column].to_numpy(dtype=np.float64)
+  if BASELINE_COLUMN in frame.columns and target_column != BASELINE_COLUMN:
+    columns[BASELINE_COLUMN] = frame[BASELINE_COLUMN].to_numpy(dtype=np.float64)
+  return columns
+
+
+def build_estimator(seed: int) -> Pipeline:
+  """Mesma arquitetura do artefato em produção."""
+  return Pipeline([
+    ("scaler", StandardScaler()),
+    (
+      "regressor",
+      HistGradientBoostingRegressor(learning_rate=0.08, max_depth=6, max_iter=400, random_state=seed),
+    ),
+  ])
+
+
+def _regression_metrics(target: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+  return {
+    "mae": float(mean_absolute_error(target, predicted)),
+    "rmse": float(np.sqrt(mean_squared_error(target, predicted))),
+    "r2": float(r2_score(target, predicted)),
+  }
+
+
+def benchmark_latency(artifact: MatchModelArtifact, features: np.ndarray, samples: int = LATENCY_SAMPLES) -> Dict[str, float]:
+  """Latência de `MatchModelArtifact.predict` (caminho do serviço) e do predict em lote."""
+  rows = features[:samples]
+  timings = []
+  for row in rows:
+    payload = dict(zip(artifact.feature_names, row.tolist()))
+    started = time.perf_counter()
+    artifact.predict(payload)
+    timings.append(time.perf_counter() - started)
+  timings_ms = np.asarray(timings) * 1000
+  frame = pd.DataFrame(features, columns=artifact.feature_names)
+  started = time.perf_counter()
+  artifact.estimator.predict(frame)
+  batch_seconds = time.perf_counter() - started
+  return {
+    "single_p50_ms": float(np.percentile(timings_ms, 50)),
+    "single_p95_ms": float(np.percentile(timings_ms, 95)),
+    "batch_per_row_us": float(batch_seconds / max(len(features), 1) * 1e6),
+  }
+
+
+def train_and_evaluate(
+  columns: Dict[str, np.ndarray],
+  test_size: float = 0.2,
+  seed: int = 42,
+) -> Tuple[MatchModelArtifact, Dict[str, object]]:
+  """Treina no split de treino e avalia no de teste (inclui baseline heurístico)."""
+  features = np.column_stack([columns[name] for name in MATCH_FEATURE_COLUMNS])
+  target = np.asarray(columns[DEFAULT_TARGET_COLUMN])
+  indices = np.arange(len(target))
+  train_idx, test_idx = train_test_split(indices, test_size=test_size, random_state=seed)
+  estimator = build_estimator(seed)
+  started = time.perf_counter()
+  estimator.fit(pd.DataFrame(features[train_idx], columns=MATCH_FEATURE_COLUMNS), target[train_idx])
+  fit_seconds = time.perf_counter() - started
+
+  test_frame = pd.DataFrame(features[test_idx], columns=MATCH_FEATURE_COLUMNS)
+  metrics: Dict[str, object] = {"model": _regression_metrics(target[test_idx], estimator.predict(test_frame))}
+  if BASELINE_COLUMN in columns:
+    metrics["heuristic"] = _regression_metrics(target[test_idx], np.asarray(columns[BASELINE_COLUMN])[test_idx])
+
+  artifact = MatchModelArtifact(feature_names=MATCH_FEATURE_COLUMNS.copy(), estimator=estimator)
+  artifact.metadata = {
+    "feature_names": MATCH_FEATURE_COLUMNS.copy(),
+    "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    "train_rows": int(len(train_idx)),
+    "test_rows": int(len(test_idx)),
+    "fit_seconds": round(fit_seconds, 3),
+    "sklearn_version": sklearn.__version__,
+    "metrics": metrics,
+    "latency": benchmark_latency(artifact, features[test_idx]),
+  }
+  return artifact, artifact.metadata
+
+
+def main(argv=None) -> None:
+  parser = argparse.ArgumentParser(description="Treina e avalia o modelo de matching.")
+  parser.add_argument("--data-path", action="append", default=[], help="CSV, arquivo .jsonl.gz ou diretório do log de scoring.")
+  parser.add_argument("--synthetic", type=int, default=0, help="Quantidade de exemplos sintéticos a gerar.")
+  parser.add_argument(
+    "--target-column",
+    default=None,
+    help=(
+      "Coluna alvo (padrão: target_score). Logs de scoring não têm rótulos; "
+      "model_score/heuristic_score só são aceitos quando passados aqui explicitamente."
+    ),
+  )
+  parser.add_argument("--model-path", default=str(DEFAULT_MODEL_PATH))
+  parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR))
+  parser.add_argument("--no-cache", action="store_true", help="Ignora e não grava o cache de features.")
+  parser.add_argument("--test-size", type=float, default=0.2)
+  parser.add_argument("--seed", type=int, default=42)
+  args = parser.parse_args(argv)
+  if not args.data_path and not args.synthetic:
+    parser.error("informe --data-path e/ou --synthetic")
+
+  target_column = args.target_column or DEFAULT_TARGET_COLUMN
+  cache_key = feature_cache_key(args.data_path, args.synthetic, args.seed, target_column)
+  cache_dir = Path(args.cache_dir) / cache_key
+  columns = None if args.no_cache else load_feature_cache(cache_dir)
+  if columns is None:
+    frames = []
+    if args.data_path:
+      frames.append(load_training_frame(args.data_path))
+    if args.synthetic:
+      frames.append(synthesize_frame(args.synthetic, args.seed))
+    frame = pd.concat(frames, ignore_index=True)
+    if args.target_column is None:
+      try:
+        check_default_target(frame)
+      except ValueError as exc:
+        parser.error(str(exc))
+    columns = build_training_columns(frame, target_column)
+    if not args.no_cache:
+      save_feature_cache(cache_dir, columns)
+  else:
+    print(f"Features carregadas do cache {cache_dir}")
+
+  artifact, metadata = train_and_evaluate(columns, args.test_size, args.seed)
+  model_path = Path(args.model_path)
+  model_path.parent.mkdir(parents=True, exist_ok=True)
+  joblib.dump(artifact, model_path)
+  print(f"Modelo salvo em {model_path}")
+  print(json.dumps({key: metadata[key] for key in ("train_rows", "test_rows", "metrics", "latency")}, indent=2))
+
+
+if __name__ == "__main__":
+  main()
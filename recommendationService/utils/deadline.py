@@ -0,0 +1,32 @@
+"""Controle de orçamento de tempo (deadline) por requisição."""
+
+import time
+from typing import Callable, Optional
+
+
+class Deadline:
+  """Orçamento de tempo relativo, medido com relógio monotônico."""
+
+  def __init__(self, budget_seconds: float, clock: Callable[[], float] = time.monotonic):
+    self._clock = clock
+    self.started_at = clock()
+    self.expires_at = self.started_at + max(0.0, float(budget_seconds))
+
+  @classmethod
+  def from_millis(cls, budget_ms: Optional[float]) -> Optional["Deadline"]:
+    """Cria o deadline a partir de milissegundos, ou None quando não informado."""
+    if budget_ms is None:
+      return None
+    return cls(float(budget_ms) / 1000.0)
+
+  def elapsed(self) -> float:
+    """Tempo decorrido (segundos) desde a criação do deadline."""
+    return self._clock() - self.started_at
+
+  def remaining(self) -> float:
+    """Tempo restante (segundos); nunca negativo."""
+    return max(0.0, self.expires_at - self._clock())
+
+  def expired(self) -> bool:
+    """Indica se o orçamento de tempo já foi consumido."""
+    return self._clock() >= self.expires_at